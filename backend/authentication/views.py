@@ -7,6 +7,7 @@ from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from firebase_admin import auth
 from .models import User, ResearchInterest
+from django_backend.db_router import replica_reads
 import logging
 logger = logging.getLogger(__name__)
 # Create your views here.
@@ -307,6 +308,7 @@ def update_profile(request):
         return Response({"error": str(e)}, status=500)
     
 @api_view(['GET'])
+@replica_reads
 def get_research_interests(request):
     try:
         interests = ResearchInterest.objects.all().order_by('name')
@@ -0,0 +1,109 @@
+# backend/django_backend/db_router.py
+
+"""
+Read replica routing.
+
+With a 'replica' database configured (DATABASE_REPLICA_SERVICE_NAME, or
+DATABASE_REPLICA_NAME for a second SQLite file), views decorated with
+@replica_reads run their reads against it. Every write, and every read
+anywhere else, goes to the primary.
+
+A replica lags behind the primary, so a user who has just saved something
+would not see it in their next poll. ReplicaPinMiddleware notices requests
+that wrote and pins that user's reads to the primary for
+REPLICA_PIN_SECONDS. The pin is kept in the 'shared' cache, which every
+gunicorn worker reads (a table on the primary, or Redis), not in the
+per-process default cache, so it holds whichever worker serves the next
+request. The frontend calls the API cross-origin without cookies, so a
+cookie would not come back. Once a request has written, its own remaining
+reads use the primary too.
+
+To try it with SQLite, copy db.sqlite3 to replica.sqlite3 and run with
+DATABASE_REPLICA_NAME=replica.sqlite3. The copy only changes when copied
+again, which makes lag easy to see.
+"""
+
+from contextvars import ContextVar
+from functools import wraps
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+
+REPLICA = 'replica'
+
+# app label of DatabaseCache's table, cache entries are read and written on the primary without pinning anyone
+CACHE_APP_LABEL = 'django_cache'
+
+_state = ContextVar('replica_routing', default=None)
+
+
+class RoutingState:
+    __slots__ = ('read_only', 'wrote')
+
+    def __init__(self):
+        self.read_only = False
+        self.wrote = False
+
+
+def replica_configured():
+    return REPLICA in settings.DATABASES
+
+
+def pin_key(user_id):
+    return f'replica_pin:{user_id}'
+
+
+def is_pinned(user):
+    """Whether user wrote within REPLICA_PIN_SECONDS"""
+    return bool(caches['shared'].get(pin_key(user.id)))
+
+
+def replica_reads(view):
+    """
+    Read from the replica in this view, unless its user wrote within
+    REPLICA_PIN_SECONDS. Goes under @api_view, so request.user is the
+    authenticated user.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        state = _state.get()
+        if state is not None and replica_configured():
+            user = request.user
+            state.read_only = not (user.is_authenticated and is_pinned(user))
+        return view(request, *args, **kwargs)
+    return wrapper
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is not None and state.read_only and not state.wrote and model._meta.app_label != CACHE_APP_LABEL:
+            return REPLICA
+        return None
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None and model._meta.app_label != CACHE_APP_LABEL:
+            state.wrote = True
+        # explicitly, or saving an instance read from the replica would write there
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # both aliases hold the same data
+        return True
+
+
+class ReplicaPinMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = RoutingState()
+        # not reset afterwards, streamed responses run their queries after this returns
+        _state.set(state)
+        response = self.get_response(request)
+        if state.wrote and replica_configured():
+            user = getattr(request, 'user', None)
+            if user is not None and user.is_authenticated:
+                caches['shared'].set(pin_key(user.id), True, settings.REPLICA_PIN_SECONDS)
+        return response
@@ -0,0 +1,127 @@
+# backend/django_backend/health.py
+
+"""
+Liveness and readiness probes.
+
+/health/live/ only says the process answers requests. It touches nothing
+else, so a database outage doesn't get every pod restarted.
+
+/health/ready/ checks what a request needs: a database query, a cache
+round trip and a LiveKit API call, which also proves the credentials work.
+The checks run concurrently and all give up at one deadline,
+HEALTH_CHECK_TIMEOUT_SECONDS. Any failure answers 503 so OpenShift stops
+routing to the pod. A check that hangs keeps its thread, but is not started
+again until it returns, so a stuck dependency can't pile up threads.
+
+The result is reused for HEALTH_CACHE_SECONDS, and probes that arrive while
+a check is running wait for it, so aggressive probing costs at most one
+round of checks per worker per interval.
+"""
+
+import asyncio
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.http import HttpResponse, JsonResponse
+
+
+def check_database():
+    try:
+        with connections['default'].cursor() as cursor:
+            cursor.execute('SELECT 1')
+    finally:
+        # the connection belongs to this pool thread, don't leave it open
+        connections.close_all()
+
+
+def check_cache():
+    key = f'health:{uuid.uuid4().hex}'
+    cache.set(key, 1, timeout=10)
+    try:
+        if cache.get(key) != 1:
+            raise RuntimeError('value written to the cache could not be read back')
+    finally:
+        cache.delete(key)
+
+
+def check_livekit():
+    if settings.LIVEKIT_STUB:
+        return 'stub'
+    from livekit import api
+    from livestream.views import get_livekit_client
+
+    async def list_rooms():
+        async with get_livekit_client() as client:
+            await client.room.list_rooms(api.ListRoomsRequest())
+
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(asyncio.wait_for(list_rooms(), settings.HEALTH_CHECK_TIMEOUT_SECONDS))
+    finally:
+        loop.close()
+
+
+CHECKS = {
+    'database': check_database,
+    'cache': check_cache,
+    'livekit': check_livekit,
+}
+
+_executor = ThreadPoolExecutor(max_workers=len(CHECKS), thread_name_prefix='health')
+_running = {}
+_lock = threading.Lock()
+_last = None
+_last_at = 0.0
+
+
+def _timed(check):
+    started = time.perf_counter()
+    detail = check()
+    return detail, (time.perf_counter() - started) * 1000
+
+
+def run_checks():
+    """{name: {'ok': bool, ...}} for every check, within one shared timeout"""
+    deadline = time.monotonic() + settings.HEALTH_CHECK_TIMEOUT_SECONDS
+    for name, check in CHECKS.items():
+        future = _running.get(name)
+        if future is None or future.done():
+            _running[name] = _executor.submit(_timed, check)
+
+    results = {}
+    for name in CHECKS:
+        try:
+            detail, ms = _running[name].result(timeout=max(deadline - time.monotonic(), 0))
+            results[name] = {'ok': True, 'ms': round(ms, 1)}
+            if detail:
+                results[name]['detail'] = detail
+        except TimeoutError:
+            results[name] = {'ok': False, 'error': 'timed out'}
+        except Exception as e:
+            print(f"Readiness check {name} failed: {e!r}")
+            results[name] = {'ok': False, 'error': type(e).__name__}
+    return results
+
+
+def readiness():
+    """Cached result of run_checks(), refreshed by one caller at a time"""
+    global _last, _last_at
+    with _lock:
+        if _last is None or time.monotonic() - _last_at >= settings.HEALTH_CACHE_SECONDS:
+            _last = run_checks()
+            _last_at = time.monotonic()
+        return _last
+
+
+def live(request):
+    return HttpResponse("OK", status=200)
+
+
+def ready(request):
+    checks = readiness()
+    ok = all(result['ok'] for result in checks.values())
+    return JsonResponse({'status': 'ok' if ok else 'unavailable', 'checks': checks}, status=200 if ok else 503)
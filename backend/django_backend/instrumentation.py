@@ -0,0 +1,230 @@
+# backend/django_backend/instrumentation.py
+
+"""
+Per-request cost accounting.
+
+RequestTimingMiddleware times every request and installs an execute_wrapper
+on each database connection, so it sees every query the request runs and
+how long it took. Code that calls an external service wraps the call in
+external_call('<service>') and that time is charged to the request as
+well. The totals are sent back in a Server-Timing header (shown in the
+browser's network panel) and added to per-view histograms kept by this
+process, see timings_snapshot(), and to the Prometheus metrics in
+django_backend.metrics.
+
+Streaming responses run most of their queries while the body is sent,
+after the view has returned. Their content is wrapped so the accounting
+continues chunk by chunk, and the request is recorded once the response is
+closed. The Server-Timing header has gone out before that, so for them it
+only covers the view and says so.
+
+The overhead is a couple of perf_counter() calls per query and per request,
+so it stays on in production. SERVER_TIMING_HEADER=False keeps the numbers
+but stops sending them to clients.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.db import connections
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from django_backend.metrics import observe_request
+
+# upper bounds, the last bucket catches everything above
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, float('inf'))
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, float('inf'))
+
+_current = ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    __slots__ = ('db_count', 'db_time', 'external')
+
+    def __init__(self):
+        self.db_count = 0
+        self.db_time = 0.0
+        self.external = {}
+
+    def db_wrapper(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.db_count += 1
+
+    @property
+    def external_time(self):
+        return sum(self.external.values())
+
+    def server_timing(self, total, streaming=False):
+        metrics = [f'db;dur={self.db_time * 1000:.1f};desc="{self.db_count} queries"']
+        metrics += [f'{service};dur={seconds * 1000:.1f}' for service, seconds in self.external.items()]
+        app = max(total - self.db_time - self.external_time, 0.0)
+        metrics += [f'app;dur={app * 1000:.1f}', f'total;dur={total * 1000:.1f}']
+        if streaming:
+            metrics.append('stream;desc="body not included"')
+        return ', '.join(metrics)
+
+
+@contextmanager
+def accounting(timings):
+    """Charge the queries and external calls made in the block to timings"""
+    token = _current.set(timings)
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timings.db_wrapper))
+            yield
+    finally:
+        _current.reset(token)
+
+
+class TimedStream:
+    """Streaming content that charges each chunk's queries to its request, and calls finish once closed"""
+
+    def __init__(self, content, timings, finish):
+        self.content = iter(content)
+        self.timings = timings
+        self.finish = finish
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        with accounting(self.timings):
+            return next(self.content)
+
+    def close(self):
+        # the server closes the response after the last chunk, or when the client goes away
+        finish, self.finish = self.finish, None
+        if finish is not None:
+            finish()
+
+
+@contextmanager
+def external_call(service):
+    """Charge the time spent in the block to service on the current request, if there is one"""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.external[service] = timings.external.get(service, 0.0) + time.perf_counter() - started
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'sum')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def snapshot(self):
+        return {
+            'buckets': [str(bound) if bound != float('inf') else '+Inf' for bound in self.buckets],
+            'counts': list(self.counts),
+            'count': sum(self.counts),
+            'sum': round(self.sum, 3),
+        }
+
+
+class ViewStats:
+    __slots__ = ('requests', 'errors', 'total_ms', 'db_ms', 'queries', 'external_ms')
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.total_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.db_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.queries = Histogram(QUERY_BUCKETS)
+        self.external_ms = {}
+
+
+_lock = threading.Lock()
+_views = {}
+
+
+def record(view, timings, total, status_code):
+    with _lock:
+        stats = _views.get(view)
+        if stats is None:
+            stats = _views[view] = ViewStats()
+        stats.requests += 1
+        stats.errors += status_code >= 500
+        stats.total_ms.observe(total * 1000)
+        stats.db_ms.observe(timings.db_time * 1000)
+        stats.queries.observe(timings.db_count)
+        for service, seconds in timings.external.items():
+            histogram = stats.external_ms.get(service)
+            if histogram is None:
+                histogram = stats.external_ms[service] = Histogram(LATENCY_BUCKETS_MS)
+            histogram.observe(seconds * 1000)
+
+
+def timings_snapshot():
+    """Per-view request counts and histograms collected by this process since it started"""
+    with _lock:
+        return {
+            view: {
+                'requests': stats.requests,
+                'errors': stats.errors,
+                'total_ms': stats.total_ms.snapshot(),
+                'db_ms': stats.db_ms.snapshot(),
+                'queries': stats.queries.snapshot(),
+                'external_ms': {service: histogram.snapshot() for service, histogram in stats.external_ms.items()},
+            }
+            for view, stats in _views.items()
+        }
+
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match else 'unmatched'
+
+
+class RequestTimingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = RequestTimings()
+        started = time.perf_counter()
+        with accounting(timings):
+            response = self.get_response(request)
+        view = view_name(request)
+
+        def finish():
+            total = time.perf_counter() - started
+            record(view, timings, total, response.status_code)
+            observe_request(view, request.method, response.status_code, timings, total)
+
+        # all views here are sync, an async stream is left unwrapped
+        streaming = response.streaming and not response.is_async
+        if settings.SERVER_TIMING_HEADER:
+            response['Server-Timing'] = timings.server_timing(time.perf_counter() - started, streaming)
+        if streaming:
+            response.streaming_content = TimedStream(response.streaming_content, timings, finish)
+        else:
+            finish()
+        return response
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def request_timings(request):
+    """Histograms of this worker only, each gunicorn worker keeps its own"""
+    return Response(timings_snapshot())
@@ -0,0 +1,164 @@
+# backend/django_backend/metrics.py
+
+"""
+Prometheus metrics, served at /metrics.
+
+Under gunicorn every worker is a separate process, so counters and
+histograms use prometheus_client's multiprocess mode: each worker writes its
+values to memory mapped files in PROMETHEUS_MULTIPROC_DIR (set up by
+gunicorn.conf.py) and a scrape adds up the files of all workers. Without
+that variable, e.g. under runserver, the process's own registry is served.
+
+Per request (from RequestTimingMiddleware):
+    http_requests_total, http_request_duration_seconds,
+    http_request_db_queries, http_request_db_duration_seconds
+Elsewhere:
+    db_connections_open                 connections kept open between requests, summed over live workers
+    db_pool_connections_idle, db_pool_connections_max, db_pool_requests_waiting
+                                        psycopg pool usage, with DATABASE_POOL_MAX_SIZE set
+    cache_lookups_total                 hits and misses of the search, doi and unpaywall caches
+    livekit_rpc_duration_seconds        LiveKit server API calls, by function
+    livekit_webhooks_in_progress        webhooks being handled right now, LiveKit's backlog here
+    livekit_webhook_events_total        webhooks received, by event
+Read from the database on each scrape:
+    livestream_active_rooms, livestream_participants, livestream_anonymous_viewers
+
+Ratios are left to the queries, e.g. the search cache hit ratio is
+rate(cache_lookups_total{cache="search",result="hit"}[5m]) / rate(cache_lookups_total{cache="search"}[5m])
+and the share of the pools in use is
+(db_connections_open - db_pool_connections_idle) / db_pool_connections_max.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from functools import wraps
+from django.conf import settings
+from django.core.signals import request_finished
+from django.db import connections
+from django.db.models import Count
+from django.dispatch import receiver
+from django.http import HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+)
+from prometheus_client.core import GaugeMetricFamily
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+REQUESTS = Counter('http_requests_total', 'Requests handled', ['view', 'method', 'status'])
+REQUEST_DURATION = Histogram('http_request_duration_seconds', 'Time to build the response', ['view'],
+                             buckets=SECONDS_BUCKETS)
+REQUEST_QUERIES = Histogram('http_request_db_queries', 'SQL queries run per request', ['view'],
+                            buckets=QUERY_BUCKETS)
+REQUEST_DB_DURATION = Histogram('http_request_db_duration_seconds', 'Time spent in SQL per request', ['view'],
+                                buckets=SECONDS_BUCKETS)
+DB_CONNECTIONS = Gauge('db_connections_open', 'Database connections held open', ['alias'],
+                       multiprocess_mode='livesum')
+DB_POOL_IDLE = Gauge('db_pool_connections_idle', 'Pooled connections free for the next request', ['alias'],
+                     multiprocess_mode='livesum')
+DB_POOL_MAX = Gauge('db_pool_connections_max', 'Connections the pools may open', ['alias'],
+                    multiprocess_mode='livesum')
+DB_POOL_WAITING = Gauge('db_pool_requests_waiting', 'Requests waiting for a pooled connection', ['alias'],
+                        multiprocess_mode='livesum')
+CACHE_LOOKUPS = Counter('cache_lookups_total', 'Cache lookups', ['cache', 'result'])
+LIVEKIT_RPC = Histogram('livekit_rpc_duration_seconds', 'LiveKit server API calls', ['call', 'outcome'],
+                        buckets=SECONDS_BUCKETS)
+WEBHOOKS_IN_PROGRESS = Gauge('livekit_webhooks_in_progress', 'LiveKit webhooks being handled',
+                             multiprocess_mode='livesum')
+WEBHOOK_EVENTS = Counter('livekit_webhook_events_total', 'LiveKit webhooks received', ['event'])
+
+
+def observe_request(view, method, status, timings, total):
+    REQUESTS.labels(view, method, str(status)).inc()
+    REQUEST_DURATION.labels(view).observe(total)
+    REQUEST_QUERIES.labels(view).observe(timings.db_count)
+    REQUEST_DB_DURATION.labels(view).observe(timings.db_time)
+
+
+@receiver(request_finished)
+def count_open_connections(sender, **kwargs):
+    # connected after django.db's close_old_connections, so this sees what outlives the request
+    for connection in connections.all(initialized_only=True):
+        pool = getattr(connection, 'pool', None)
+        if pool is None:
+            DB_CONNECTIONS.labels(connection.alias).set(int(connection.connection is not None))
+            continue
+        stats = pool.get_stats()
+        DB_CONNECTIONS.labels(connection.alias).set(stats['pool_size'])
+        DB_POOL_IDLE.labels(connection.alias).set(stats['pool_available'])
+        DB_POOL_MAX.labels(connection.alias).set(stats['pool_max'])
+        DB_POOL_WAITING.labels(connection.alias).set(stats.get('requests_waiting', 0))
+
+
+def cache_lookup(cache, hit):
+    CACHE_LOOKUPS.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+@contextmanager
+def livekit_rpc(call):
+    started = time.perf_counter()
+    outcome = 'error'
+    try:
+        yield
+        outcome = 'ok'
+    finally:
+        LIVEKIT_RPC.labels(call, outcome).observe(time.perf_counter() - started)
+
+
+def tracks_webhooks(view):
+    """Count a webhook view's requests in progress"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        WEBHOOKS_IN_PROGRESS.inc()
+        try:
+            return view(*args, **kwargs)
+        finally:
+            WEBHOOKS_IN_PROGRESS.dec()
+    return wrapper
+
+
+def webhook_event(event):
+    WEBHOOK_EVENTS.labels(event or 'unknown').inc()
+
+
+class LivestreamCollector:
+    """Room and participant counts, read from the database when scraped"""
+
+    def collect(self):
+        from livestream.models import AnonymousViewer, Participant, Room
+        from livestream.presence import idle_cutoff
+
+        rooms = GaugeMetricFamily('livestream_active_rooms', 'Rooms marked active')
+        rooms.add_metric([], Room.objects.filter(is_active=True).count())
+        yield rooms
+
+        cutoff = idle_cutoff()
+        participants = GaugeMetricFamily('livestream_participants', 'Participants in active rooms', labels=['role'])
+        counts = dict(
+            Participant.objects.filter(room__is_active=True, last_active__gte=cutoff)
+            .values_list('role').annotate(count=Count('id')).order_by()
+        )
+        for role in ('host', 'moderator', 'guest', 'viewer'):
+            participants.add_metric([role], counts.get(role, 0))
+        yield participants
+
+        anonymous = GaugeMetricFamily('livestream_anonymous_viewers', 'Logged out viewers in active rooms')
+        anonymous.add_metric([], AnonymousViewer.objects.filter(room__is_active=True, last_active__gte=cutoff).count())
+        yield anonymous
+
+
+def metrics(request):
+    """Prometheus text format. Protected by METRICS_TOKEN as a bearer token when that is set."""
+    if settings.METRICS_TOKEN and request.headers.get('Authorization') != f'Bearer {settings.METRICS_TOKEN}':
+        return HttpResponse('Unauthorized', status=401)
+
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    database = CollectorRegistry()
+    database.register(LivestreamCollector())
+    return HttpResponse(generate_latest(registry) + generate_latest(database), content_type=CONTENT_TYPE_LATEST)
@@ -18,6 +18,8 @@ from pathlib import Path
 from dotenv import load_dotenv
 import os
 import json
+import importlib.util
+from django.core.exceptions import ImproperlyConfigured
 
 load_dotenv()
 
@@ -49,9 +51,13 @@ INSTALLED_APPS = [
     'authentication',
     'livestream',
     'papers',
+    'ops',
 ]
 
 MIDDLEWARE = [
+    # first, so its timings cover every other middleware
+    'django_backend.instrumentation.RequestTimingMiddleware',
+    'django_backend.db_router.ReplicaPinMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -63,6 +69,17 @@ MIDDLEWARE = [
     'whitenoise.middleware.WhiteNoiseMiddleware',
 ]
 
+# Send each request's DB, external call and total time back in a Server-Timing header
+SERVER_TIMING_HEADER = os.getenv('SERVER_TIMING_HEADER', 'True').lower() in ('1', 'true', 'yes')
+
+# When set, /metrics requires "Authorization: Bearer <METRICS_TOKEN>"
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+
+# Deadline for the database, cache and LiveKit checks behind /health/ready/
+HEALTH_CHECK_TIMEOUT_SECONDS = float(os.getenv('HEALTH_CHECK_TIMEOUT_SECONDS', '2'))
+# How long a readiness result is reused before the checks run again
+HEALTH_CACHE_SECONDS = float(os.getenv('HEALTH_CACHE_SECONDS', '5'))
+
 # Static files configuration
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
@@ -130,6 +147,24 @@ WSGI_APPLICATION = 'django_backend.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
+# Seconds a worker keeps its PostgreSQL connection open for the next request, 0 closes it after every request
+DATABASE_CONN_MAX_AGE = int(os.getenv('DATABASE_CONN_MAX_AGE', '60'))
+# Check a kept connection still works before a request uses it, so a database restart doesn't fail requests
+DATABASE_CONN_HEALTH_CHECKS = os.getenv('DATABASE_CONN_HEALTH_CHECKS', 'True').lower() in ('1', 'true', 'yes')
+# Use a psycopg 3 connection pool of up to this many connections per worker instead, 0 to keep it off.
+# Needs psycopg[binary,pool] installed, and replaces DATABASE_CONN_MAX_AGE
+DATABASE_POOL_MAX_SIZE = int(os.getenv('DATABASE_POOL_MAX_SIZE', '0'))
+# Connections the pool opens up front and keeps open
+DATABASE_POOL_MIN_SIZE = int(os.getenv('DATABASE_POOL_MIN_SIZE', '1'))
+# Seconds a request waits for a free pooled connection before failing
+DATABASE_POOL_TIMEOUT = float(os.getenv('DATABASE_POOL_TIMEOUT', '10'))
+# Host of a PostgreSQL read replica for the views marked @replica_reads, see django_backend.db_router
+DATABASE_REPLICA_SERVICE_NAME = os.getenv('DATABASE_REPLICA_SERVICE_NAME')
+# Or, without PostgreSQL, a second SQLite file to stand in for the replica
+DATABASE_REPLICA_NAME = os.getenv('DATABASE_REPLICA_NAME')
+# Seconds a user's reads stay on the primary after they write, longer than the replica usually lags
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', '5'))
+
 # Database configuration
 if os.environ.get('DATABASE_SERVICE_NAME'):
     # PostgreSQL configuration for OpenShift
@@ -141,8 +176,28 @@ if os.environ.get('DATABASE_SERVICE_NAME'):
             'PASSWORD': os.environ.get('DATABASE_PASSWORD', 'django'),
             'HOST': os.environ.get('DATABASE_SERVICE_NAME', 'localhost'),
             'PORT': os.environ.get('DATABASE_PORT', '5432'),
+            'CONN_MAX_AGE': DATABASE_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': DATABASE_CONN_HEALTH_CHECKS,
         }
     }
+    if DATABASE_POOL_MAX_SIZE:
+        # Django falls back to psycopg2 without psycopg 3, and would only fail on the first query
+        if not (importlib.util.find_spec('psycopg') and importlib.util.find_spec('psycopg_pool')):
+            raise ImproperlyConfigured("DATABASE_POOL_MAX_SIZE needs psycopg[binary,pool] installed")
+        # the pool takes the connection back after each request, Django refuses a pool with CONN_MAX_AGE
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS'] = {'pool': {
+            'min_size': DATABASE_POOL_MIN_SIZE,
+            'max_size': DATABASE_POOL_MAX_SIZE,
+            'timeout': DATABASE_POOL_TIMEOUT,
+        }}
+    if DATABASE_REPLICA_SERVICE_NAME:
+        DATABASES['replica'] = {
+            **DATABASES['default'],
+            'HOST': DATABASE_REPLICA_SERVICE_NAME,
+            'OPTIONS': dict(DATABASES['default'].get('OPTIONS', {})),
+            'TEST': {'MIRROR': 'default'},
+        }
 else:
     # SQLite configuration for local development
     DATABASES = {
@@ -151,6 +206,35 @@ else:
             'NAME': BASE_DIR / 'db.sqlite3',
         }
     }
+    if DATABASE_REPLICA_NAME:
+        DATABASES['replica'] = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / DATABASE_REPLICA_NAME,
+            'TEST': {'MIRROR': 'default'},
+        }
+
+DATABASE_ROUTERS = ['django_backend.db_router.ReplicaRouter']
+
+# Redis for the shared cache, e.g. redis://redis:6379/1 (needs the redis package). Without it the shared
+# cache is a table in the default database, created by the ops app's migration
+SHARED_CACHE_REDIS_URL = os.getenv('SHARED_CACHE_REDIS_URL')
+
+# 'default' is per process, each gunicorn worker has its own. State every worker has to agree on, like
+# replica pins and search results, goes in 'shared'
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'shared_cache',
+    },
+}
+if SHARED_CACHE_REDIS_URL:
+    CACHES['shared'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': SHARED_CACHE_REDIS_URL,
+    }
 
 
 # Password validation
@@ -228,13 +312,52 @@ AUTH_PASSWORD_VALIDATORS = [
 LIVEKIT_API_KEY = os.getenv('LIVEKIT_API_KEY')
 LIVEKIT_API_SECRET = os.getenv('LIVEKIT_API_SECRET')
 LIVEKIT_API_URL = os.getenv('LIVEKIT_API_URL')
+# Talk to the in-process fake LiveKit server in livestream.livekit_stub instead, for load tests
+LIVEKIT_STUB = os.getenv('LIVEKIT_STUB', '').lower() in ('1', 'true', 'yes')
+# Lifetime of LiveKit access tokens handed to clients
+LIVEKIT_TOKEN_TTL_SECONDS = int(os.getenv('LIVEKIT_TOKEN_TTL_SECONDS', str(6 * 60 * 60)))
+# A reconnect within this window gets the token already signed for the same identity, room and grants
+LIVEKIT_TOKEN_REUSE_SECONDS = int(os.getenv('LIVEKIT_TOKEN_REUSE_SECONDS', '300'))
+
+# Each worker writes buffered presence heartbeats to Participant.last_active this often
+PRESENCE_FLUSH_SECONDS = int(os.getenv('PRESENCE_FLUSH_SECONDS', '15'))
+# Participants without a heartbeat for this long count as gone
+PRESENCE_IDLE_SECONDS = int(os.getenv('PRESENCE_IDLE_SECONDS', '120'))
 
 # SerpAPI settings
 SERPAPI_KEY = os.getenv('SERPAPI_KEY')
+# Seconds a search waits for SerpAPI before giving up, keep below GUNICORN_GRACEFUL_TIMEOUT
+SERPAPI_TIMEOUT = float(os.getenv('SERPAPI_TIMEOUT', '20'))
+
+# SerpAPI plan limits, enforced account-wide by papers.quota (free plan: 100 searches/month)
+SERPAPI_MONTHLY_QUOTA = int(os.getenv('SERPAPI_MONTHLY_QUOTA', '100'))
+SERPAPI_BURST = int(os.getenv('SERPAPI_BURST', '5'))
+SERPAPI_RATE_PER_MINUTE = float(os.getenv('SERPAPI_RATE_PER_MINUTE', '12'))
+SERPAPI_MAX_WAIT = float(os.getenv('SERPAPI_MAX_WAIT', '8'))
+
+# How long identical searches are answered from cache without spending quota
+SEARCH_CACHE_TTL = int(os.getenv('SEARCH_CACHE_TTL', str(60*60*6)))
 
 # Email required for Unpaywall API access
 UNPAYWALL_EMAIL = os.getenv('UNPAYWALL_EMAIL')
 
+# Upstream API base URLs, bench_search points these at its local fixture server
+SERPAPI_URL = os.getenv('SERPAPI_URL', 'https://serpapi.com')
+CROSSREF_API_URL = os.getenv('CROSSREF_API_URL', 'https://api.crossref.org')
+UNPAYWALL_API_URL = os.getenv('UNPAYWALL_API_URL', 'https://api.unpaywall.org')
+
+# Max extracts accepted by the bulk save and delete endpoints
+EXTRACT_BULK_MAX_ITEMS = int(os.getenv('EXTRACT_BULK_MAX_ITEMS', '500'))
+
+# Estimated text similarity at which two extracts count as near-duplicates
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv('NEAR_DUPLICATE_THRESHOLD', '0.8'))
+
+# Where build_related_index writes the memory-mapped vectors every worker reads
+RELATED_INDEX_DIR = os.getenv('RELATED_INDEX_DIR', os.path.join(BASE_DIR, 'related_index'))
+
+# Paper rows whose Unpaywall data is older than this are re-enriched
+PAPER_REFRESH_DAYS = int(os.getenv('PAPER_REFRESH_DAYS', '30'))
+
 
 # Add REST Framework settings
 REST_FRAMEWORK = {
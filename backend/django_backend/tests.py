@@ -0,0 +1,89 @@
+# backend/django_backend/tests.py
+
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.db import DEFAULT_DB_ALIAS
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework.test import APIClient
+from .db_router import ReplicaPinMiddleware, _state, replica_reads
+from .instrumentation import RequestTimingMiddleware
+
+User = get_user_model()
+
+
+@mock.patch('django_backend.db_router.replica_configured', return_value=True)
+class ReplicaPinTests(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.user = User.objects.create(username='writer', email='writer@example.com')
+
+    def write(self, user):
+        def view(request):
+            request.user.save()
+            return HttpResponse()
+        request = self.factory.post('/')
+        request.user = user
+        return ReplicaPinMiddleware(view)(request)
+
+    def reads_replica(self, user):
+        @replica_reads
+        def view(request):
+            return HttpResponse(str(_state.get().read_only))
+        request = self.factory.get('/')
+        request.user = user
+        return ReplicaPinMiddleware(view)(request).content == b'True'
+
+    def test_unpinned_reads_use_replica(self, configured):
+        self.assertTrue(self.reads_replica(self.user))
+
+    def test_pin_belongs_to_its_user(self, configured):
+        self.write(self.user)
+        other = User.objects.create(username='reader', email='reader@example.com')
+        self.assertFalse(self.reads_replica(self.user))
+        self.assertTrue(self.reads_replica(other))
+
+    # reads routed to the primary under the replica's name, only the routing decision matters here
+    @mock.patch('django_backend.db_router.REPLICA', DEFAULT_DB_ALIAS)
+    def test_pin_reaches_another_worker_without_cookies(self, configured):
+        # the frontend calls the API from another origin with a bearer token and no cookies
+        writer = APIClient(HTTP_ORIGIN='http://localhost:3000')
+        writer.force_authenticate(self.user)
+        response = writer.post('/api/papers/extracts/save/', {'title': 'Pinned', 'extract': 'text'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(response.cookies)
+
+        # served by a worker whose own cache never saw the write
+        cache.clear()
+        reader = APIClient(HTTP_ORIGIN='http://localhost:3000')
+        reader.force_authenticate(self.user)
+        self.assertEqual(reader.get('/api/papers/extracts/').status_code, 200)
+        self.assertFalse(_state.get().read_only)
+
+        caches['shared'].clear()
+        self.assertEqual(reader.get('/api/papers/extracts/').status_code, 200)
+        self.assertTrue(_state.get().read_only)
+
+
+@override_settings(SERVER_TIMING_HEADER=True)
+class RequestTimingTests(TestCase):
+    def setUp(self):
+        User.objects.create(username='counted', email='counted@example.com')
+
+    def test_streamed_queries_are_counted(self):
+        def rows():
+            for _ in range(3):
+                yield f'{User.objects.count()}\n'
+
+        def view(request):
+            return StreamingHttpResponse(rows())
+
+        with mock.patch('django_backend.instrumentation.observe_request') as observe:
+            response = RequestTimingMiddleware(view)(RequestFactory().get('/'))
+            self.assertIn('body not included', response['Server-Timing'])
+            self.assertEqual(b''.join(response.streaming_content), b'1\n1\n1\n')
+            observe.assert_not_called()
+            response.close()
+        timings = observe.call_args.args[3]
+        self.assertEqual(timings.db_count, 3)
@@ -5,6 +5,9 @@ from django.urls import path, include
 from authentication import views
 from django.conf import settings
 from django.http import HttpResponse
+from django_backend import health
+from django_backend.instrumentation import request_timings
+from django_backend.metrics import metrics
 
 def health_check(request):
     return HttpResponse("OK", status=200)
@@ -17,6 +20,10 @@ urlpatterns = [
     path('api/livestream/', include('livestream.urls')),
     path('api/papers/', include('papers.urls')),
     path('health/', health_check, name='health_check'),
+    path('health/live/', health.live, name='health_live'),
+    path('health/ready/', health.ready, name='health_ready'),
+    path('debug/timings/', request_timings, name='request_timings'),
+    path('metrics', metrics, name='metrics'),
 ]
 
 
@@ -0,0 +1,124 @@
+# backend/gunicorn.conf.py
+
+"""
+gunicorn settings, picked up automatically from the working directory, so
+.s2i/bin/run only passes the bind address. Everything here can be changed
+per deployment through environment variables:
+
+    GUNICORN_WORKER_CLASS   gthread (default), sync, or uvicorn to serve
+                            django_backend.asgi (needs uvicorn-worker installed)
+    GUNICORN_WORKERS        processes, default 2 * CPUs + 1
+    GUNICORN_THREADS        threads per gthread worker, default 4
+    GUNICORN_MAX_REQUESTS   requests before a worker is replaced, default 1000, 0 never
+    GUNICORN_PRELOAD        import the app once before forking, default on
+    GUNICORN_TIMEOUT        seconds before a silent worker is killed, default 60
+    GUNICORN_GRACEFUL_TIMEOUT
+                            seconds in-flight requests get to finish on shutdown, default 25
+
+With sync workers one slow SerpAPI or LiveKit call holds a whole process.
+gthread workers keep serving from their other threads meanwhile, which is
+why they are the default. Under uvicorn Django hands every request to a
+thread of its own, as all views are sync, and it can't keep database
+connections between requests. Compare them with manage.py bench_server.
+
+CPUs means the container's CPU limit, not the node's CPU count.
+
+Workers share Prometheus metrics through files in PROMETHEUS_MULTIPROC_DIR
+(see django_backend.metrics). The directory is emptied once when the
+master starts, not on HUP reloads while workers are still writing there,
+and a worker's files are marked dead when it exits so its live gauges stop
+counting.
+
+Exiting workers also write out the presence heartbeats they still buffer
+(see livestream.presence).
+"""
+
+import math
+import os
+import shutil
+
+# created here rather than in on_starting, a preloaded app opens its metric files before that hook runs.
+# This file is read again on every HUP reload, so emptying it waits for on_starting
+multiproc_dir = os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/prometheus_multiproc')
+os.makedirs(multiproc_dir, exist_ok=True)
+
+
+def cpu_limit():
+    """CPUs this container may use: its cgroup CPU quota if it has one, else the CPUs it may run on"""
+    for quota_file, period_file in (('/sys/fs/cgroup/cpu.max', None),
+                                    ('/sys/fs/cgroup/cpu/cpu.cfs_quota_us', '/sys/fs/cgroup/cpu/cpu.cfs_period_us')):
+        try:
+            with open(quota_file) as f:
+                values = f.read().split()
+            if period_file:
+                with open(period_file) as f:
+                    values.append(f.read().strip())
+            quota, period = values
+            if quota not in ('max', '-1'):
+                return max(math.ceil(int(quota) / int(period)), 1)
+        except (OSError, ValueError):
+            continue
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+cpus = cpu_limit()
+
+if os.getenv('GUNICORN_WORKER_CLASS', 'gthread') == 'uvicorn':
+    worker_class = 'uvicorn_worker.UvicornWorker'
+    wsgi_app = 'django_backend.asgi:application'
+    # every ASGI request runs in a new thread, kept connections would pile up until the database refuses more.
+    # DATABASE_POOL_MAX_SIZE is the way to reuse them here
+    os.environ.setdefault('DATABASE_CONN_MAX_AGE', '0')
+else:
+    worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+    wsgi_app = 'django_backend.wsgi:application'
+
+workers = int(os.getenv('GUNICORN_WORKERS', str(2 * cpus + 1)))
+# gunicorn turns sync workers into gthread ones when threads > 1
+threads = int(os.getenv('GUNICORN_THREADS', '4')) if worker_class == 'gthread' else 1
+
+# replace workers now and then so slow leaks can't grow forever, jittered so they don't all restart at once
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '1000'))
+max_requests_jitter = max_requests // 10
+
+# replacement workers are forked from a master that already imported Django, so they start in milliseconds
+preload_app = os.getenv('GUNICORN_PRELOAD', 'True').lower() in ('1', 'true', 'yes')
+
+# a search may run the SerpAPI call (SERPAPI_TIMEOUT) and then CrossRef lookups, give it room
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '60'))
+# above SERPAPI_TIMEOUT so in-flight searches finish, below OpenShift's 30s termination grace period
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '25'))
+
+# heartbeat files on tmpfs, a slow overlay filesystem can make workers look dead
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+
+def on_starting(server):
+    # files left by the previous server's workers; the preloaded app's own stay open and are recreated per worker
+    for entry in os.scandir(multiproc_dir):
+        if entry.is_dir(follow_symlinks=False):
+            shutil.rmtree(entry.path, ignore_errors=True)
+        else:
+            os.remove(entry.path)
+
+
+def when_ready(server):
+    server.log.info(
+        f"{workers} {worker_class} workers x {threads} threads for {cpus} CPUs, "
+        f"max_requests={max_requests} preload={preload_app} timeout={timeout}s graceful_timeout={graceful_timeout}s"
+    )
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def worker_exit(server, worker):
+    # presence heartbeats buffered since the worker's last flush, see livestream.presence
+    from livestream.presence import flush_pending
+    flush_pending()
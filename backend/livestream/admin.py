@@ -1,7 +1,7 @@
 # backend/livestream/admin.py
 
 from django.contrib import admin
-from .models import Room, Participant
+from .models import AnonymousViewer, Room, Participant, RoomArchive
 
 class ParticipantInline(admin.TabularInline):
     model = Participant
@@ -37,6 +37,19 @@ class ParticipantAdmin(admin.ModelAdmin):
         return obj.can_broadcast()
     can_broadcast.boolean = True
     can_broadcast.short_description = 'Can Broadcast'
-    
 
 
+@admin.register(AnonymousViewer)
+class AnonymousViewerAdmin(admin.ModelAdmin):
+    list_display = ('name', 'identity', 'room', 'joined_at', 'last_active')
+    search_fields = ('name', 'identity', 'room__name')
+    readonly_fields = ('joined_at', 'last_active')
+
+
+@admin.register(RoomArchive)
+class RoomArchiveAdmin(admin.ModelAdmin):
+    list_display = ('name', 'room_key', 'host', 'started_at', 'finished_at', 'participant_count', 'extract_count')
+    search_fields = ('name', 'room_key', 'host__username')
+    exclude = ('data',)
+    readonly_fields = ('room', 'room_key', 'name', 'host', 'started_at', 'finished_at',
+                       'participant_count', 'extract_count', 'created_at')
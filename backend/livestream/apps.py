@@ -6,3 +6,6 @@ from django.apps import AppConfig
 class LivestreamConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'livestream'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,162 @@
+# backend/livestream/archive.py
+
+"""
+Session history for rooms.
+
+While a room runs, joins and role changes are appended to RoomEvent by
+signals, and leaves by leave_room(). When the room ends close_room() removes
+its participants and folds the events and shared extracts into one
+compressed RoomArchive row, then drops the events, so the hot Participant
+and RoomEvent tables only ever hold rooms that are live.
+
+A host's room row is reused every time they open it again, so each of those
+sessions gets an archive of its own, covering Room.session_started_at up to
+the close.
+
+Archive data is zlib compressed JSON. Times are whole seconds from the
+session's start:
+
+    {
+      "version": 1,
+      "started_at": "<iso>",
+      "users": {"<user id>": "<username>"},
+      "attendance": [[user_id, role, start, end], ...],
+      "roles": [[at, user_id, role], ...],
+      "extracts": [[at, id, shared_by_id, title, authors, doi, link, pdf_link, page_number, extract], ...]
+    }
+"""
+
+import json
+import zlib
+from django.db import transaction
+from django.utils import timezone
+from .models import AnonymousViewer, Participant, RoomArchive, RoomEvent, SharedExtract
+
+ARCHIVE_VERSION = 1
+
+# a rejoin within this many seconds continues the previous attendance interval
+MERGE_GAP_SECONDS = 60
+
+
+def leave_room(room, users):
+    """Record a leave for each user's participant row in room, then delete the rows. Returns the number removed."""
+    participants = list(
+        Participant.objects.filter(room=room, user__in=users).values('user_id', 'user__username', 'role')
+    )
+    if not participants:
+        return 0
+    now = timezone.now()
+    RoomEvent.objects.bulk_create([
+        RoomEvent(room=room, user_id=p['user_id'], username=p['user__username'], kind=RoomEvent.LEAVE,
+                  role=p['role'], at=now)
+        for p in participants
+    ])
+    Participant.objects.filter(room=room, user_id__in=[p['user_id'] for p in participants]).delete()
+    return len(participants)
+
+
+def close_room(room, finished_at=None):
+    """
+    End a room: mark it inactive, remove every participant and anonymous
+    viewer and write the archive of its current session. Safe to call more
+    than once, later calls return that session's existing archive.
+    """
+    finished_at = finished_at or timezone.now()
+    with transaction.atomic():
+        if room.is_active:
+            room.is_active = False
+            room.save(update_fields=['is_active'])
+        leave_room(room, Participant.objects.filter(room=room).values('user_id'))
+        # anonymous viewers are not part of the archive
+        AnonymousViewer.objects.filter(room=room).delete()
+
+        existing = RoomArchive.objects.filter(room=room, started_at=room.session_started_at).first()
+        if existing is not None:
+            RoomEvent.objects.filter(room=room).delete()
+            return existing
+        archive = build_archive(room, finished_at)
+        archive.save()
+        RoomEvent.objects.filter(room=room).delete()
+        return archive
+
+
+def _seconds(start, moment):
+    return max(int((moment - start).total_seconds()), 0)
+
+
+def _attendance(events, started_at, finished_at):
+    """Per user [start, end] intervals from the event log, rejoins within MERGE_GAP_SECONDS merged"""
+    open_since = {}
+    intervals = []
+    for event in events:
+        key = event['user_id']
+        if event['kind'] == RoomEvent.JOIN:
+            open_since.setdefault(key, (event['at'], event['role']))
+        elif event['kind'] == RoomEvent.LEAVE:
+            joined = open_since.pop(key, None)
+            # participants from before events were recorded only have a leave
+            start, role = joined if joined else (started_at, event['role'])
+            intervals.append([key, role, _seconds(started_at, start), _seconds(started_at, event['at'])])
+    for key, (start, role) in open_since.items():
+        intervals.append([key, role, _seconds(started_at, start), _seconds(started_at, finished_at)])
+
+    intervals.sort(key=lambda interval: (interval[0], interval[2]))
+    merged = []
+    for interval in intervals:
+        previous = merged[-1] if merged else None
+        if previous and previous[0] == interval[0] and interval[2] - previous[3] <= MERGE_GAP_SECONDS:
+            previous[3] = max(previous[3], interval[3])
+        else:
+            merged.append(interval)
+    return merged
+
+
+def build_archive(room, finished_at):
+    started_at = room.session_started_at
+    # events of earlier sessions are deleted when they close, anything older is left over from one
+    events = list(RoomEvent.objects.filter(room=room, at__gte=started_at).order_by('at', 'id').values(
+        'user_id', 'username', 'kind', 'role', 'at'
+    ))
+    users = {str(event['user_id']): event['username'] for event in events}
+
+    extracts = list(
+        SharedExtract.objects.filter(room=room, shared_at__gte=started_at, shared_at__lte=finished_at)
+        .with_content().order_by('shared_at', 'id').values_list(
+            'shared_at', 'id', 'shared_by_id', 'shared_by__username', 'content_title', 'content_authors',
+            'content_doi', 'content_link', 'content_pdf_link', 'content_page_number', 'content_extract'
+        )
+    )
+    for row in extracts:
+        users.setdefault(str(row[2]), row[3])
+
+    attendance = _attendance(events, started_at, finished_at)
+    data = {
+        'version': ARCHIVE_VERSION,
+        'started_at': started_at.isoformat(),
+        'users': users,
+        'attendance': attendance,
+        'roles': [
+            [_seconds(started_at, event['at']), event['user_id'], event['role']]
+            for event in events if event['kind'] == RoomEvent.ROLE
+        ],
+        'extracts': [
+            [_seconds(started_at, row[0]), row[1], row[2], *row[4:]]
+            for row in extracts
+        ],
+    }
+    return RoomArchive(
+        room=room,
+        room_key=room.room_id,
+        name=room.name or '',
+        host_id=room.host_id,
+        started_at=started_at,
+        finished_at=finished_at,
+        participant_count=len({interval[0] for interval in attendance}),
+        extract_count=len(extracts),
+        data=zlib.compress(json.dumps(data, separators=(',', ':')).encode(), 9),
+    )
+
+
+def load_archive(archive):
+    """Decompressed archive data, see the module docstring for the layout"""
+    return json.loads(zlib.decompress(bytes(archive.data)))
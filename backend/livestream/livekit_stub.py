@@ -0,0 +1,167 @@
+# backend/livestream/livekit_stub.py
+
+"""
+In-process stand-in for the LiveKit server, for load tests and for running
+the backend without LiveKit credentials.
+
+FakeLiveKitAPI has the shape the views use of livekit.api.LiveKitAPI: an
+async context manager whose .room offers create_room, delete_room,
+list_participants and remove_participant. Every client talks to one
+module-level FakeServer, so a room created in one request is there for the
+next. join() and leave() play the part of browsers connecting over WebRTC.
+
+Like the real server, the stub reports room and participant changes as
+webhook events. They are queued rather than sent from inside the RPC, since
+LiveKit delivers webhooks asynchronously too. deliver_webhooks() hands the
+queue to whatever should receive them, e.g. the loadtest harness posting to
+the webhook view.
+
+Set LIVEKIT_STUB=True for get_livekit_client() to return the stub. State
+lives in the process, so serve with a single worker when using it.
+"""
+
+import asyncio
+import threading
+import time
+import uuid
+from google.protobuf.json_format import MessageToDict
+from livekit.api import ListParticipantsResponse, ParticipantInfo, Room
+
+
+class FakeServer:
+    def __init__(self, rpc_latency=0.0):
+        # seconds every RPC waits, to stand in for the network round trip
+        self.rpc_latency = rpc_latency
+        self.rooms = {}
+        self.participants = {}
+        self.outbox = []
+        self.rpc_count = 0
+        self._lock = threading.Lock()
+
+    def reset(self, rpc_latency=None):
+        with self._lock:
+            self.rooms.clear()
+            self.participants.clear()
+            self.outbox.clear()
+            self.rpc_count = 0
+            if rpc_latency is not None:
+                self.rpc_latency = rpc_latency
+
+    def _emit(self, event, room, participant=None):
+        payload = {
+            'event': event,
+            'id': f"EV_{uuid.uuid4().hex[:12]}",
+            'createdAt': int(time.time()),
+            'room': MessageToDict(room),
+        }
+        if participant is not None:
+            payload['participant'] = MessageToDict(participant)
+        self.outbox.append(payload)
+
+    def _room(self, name):
+        room = self.rooms.get(name)
+        if room is None:
+            room = Room(sid=f"RM_{uuid.uuid4().hex[:12]}", name=name, creation_time=int(time.time()))
+            self.rooms[name] = room
+            self.participants[name] = {}
+            self._emit('room_started', room)
+        return room
+
+    def create_room(self, request):
+        with self._lock:
+            room = self._room(request.name)
+            room.empty_timeout = request.empty_timeout
+            room.max_participants = request.max_participants
+            room.metadata = request.metadata
+            created = Room()
+            created.CopyFrom(room)
+            return created
+
+    def delete_room(self, name):
+        with self._lock:
+            room = self.rooms.pop(name, None)
+            if room is None:
+                return
+            for participant in self.participants.pop(name, {}).values():
+                self._emit('participant_left', room, participant)
+            self._emit('room_finished', room)
+
+    def list_participants(self, name):
+        with self._lock:
+            return list(self.participants.get(name, {}).values())
+
+    def join(self, name, identity, display_name=''):
+        """A client connects with a token for room name. Rooms are created on first join, as in LiveKit."""
+        with self._lock:
+            room = self._room(name)
+            participant = ParticipantInfo(
+                sid=f"PA_{uuid.uuid4().hex[:12]}", identity=identity, name=display_name,
+                state=ParticipantInfo.State.ACTIVE, joined_at=int(time.time())
+            )
+            self.participants[name][identity] = participant
+            room.num_participants = len(self.participants[name])
+            self._emit('participant_joined', room, participant)
+            return participant
+
+    def leave(self, name, identity):
+        with self._lock:
+            participant = self.participants.get(name, {}).pop(identity, None)
+            if participant is None:
+                return False
+            room = self.rooms[name]
+            room.num_participants = len(self.participants[name])
+            self._emit('participant_left', room, participant)
+            return True
+
+    def take_webhooks(self):
+        with self._lock:
+            events, self.outbox = self.outbox, []
+            return events
+
+
+server = FakeServer()
+
+
+def deliver_webhooks(handler):
+    """Pass every queued webhook event to handler(event), oldest first. Returns how many were sent."""
+    events = server.take_webhooks()
+    for event in events:
+        handler(event)
+    return len(events)
+
+
+class FakeRoomService:
+    async def _rpc(self):
+        server.rpc_count += 1
+        if server.rpc_latency:
+            await asyncio.sleep(server.rpc_latency)
+
+    async def create_room(self, request):
+        await self._rpc()
+        return server.create_room(request)
+
+    async def delete_room(self, request):
+        await self._rpc()
+        server.delete_room(request.room)
+
+    async def list_participants(self, request):
+        await self._rpc()
+        return ListParticipantsResponse(participants=server.list_participants(request.room))
+
+    async def remove_participant(self, request):
+        await self._rpc()
+        server.leave(request.room, request.identity)
+
+
+class FakeLiveKitAPI:
+    def __init__(self, *args, **kwargs):
+        self.room = FakeRoomService()
+
+    async def aclose(self):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
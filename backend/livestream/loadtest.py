@@ -0,0 +1,186 @@
+# backend/livestream/loadtest.py
+
+"""
+Load generator for the livestream API, run against livestream.livekit_stub.
+
+Requests go through django.test.Client, so URL routing, middleware and DRF
+authentication are all part of what is measured, only the network is not.
+A run plays out the life of N rooms:
+
+1. each host creates a room and connects to it
+2. M viewers per room look at the room list, ask for a token and connect,
+   a share of them logged out
+3. for a number of rounds every viewer polls the participant list and
+   sends a presence heartbeat, and now and then reloads the room list
+4. the viewers disconnect and the host deletes the room
+
+Every webhook the stub queues while that happens is posted to the webhook
+view, as LiveKit would. Recorder keeps latency and query count per view.
+"""
+
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from .livekit_stub import deliver_webhooks, server
+from .models import RoomArchive
+
+User = get_user_model()
+
+API = '/api/livestream'
+
+
+class Recorder:
+    """Latency and query counts per label, safe to share between threads"""
+
+    def __init__(self):
+        self.samples = {}
+        self.errors = {}
+        self.rpc_count = 0
+        self._lock = threading.Lock()
+
+    def call(self, label, method, path, **kwargs):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = method(path, **kwargs)
+            elapsed = time.perf_counter() - started
+        with self._lock:
+            self.samples.setdefault(label, []).append((elapsed, len(queries)))
+            if response.status_code >= 500:
+                self.errors[label] = self.errors.get(label, 0) + 1
+        return response
+
+    def summary(self):
+        """One dict per label with count, errors, latency percentiles in ms, queries per request and serial req/s"""
+        rows = []
+        for label, samples in sorted(self.samples.items()):
+            latencies = np.array([sample[0] for sample in samples])
+            queries = np.array([sample[1] for sample in samples])
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+            rows.append({
+                'label': label,
+                'count': len(samples),
+                'errors': self.errors.get(label, 0),
+                'p50': p50,
+                'p95': p95,
+                'p99': p99,
+                'queries': float(queries.mean()),
+                'per_second': len(samples) / latencies.sum(),
+            })
+        return rows
+
+
+class Viewer:
+    def __init__(self, user=None, name=''):
+        self.user = user
+        self.name = name
+        self.client = Client()
+        if user is not None:
+            self.client.force_login(user)
+        self.identity = None
+        self.token = None
+
+
+def run_load(rooms=5, viewers=20, polls=10, anonymous_share=0.5, lobby_every=5, threads=1, rpc_latency=0.0):
+    """Play out the scenario in the module docstring and return (Recorder, wall seconds)"""
+    server.reset(rpc_latency=rpc_latency)
+    recorder = Recorder()
+    tag = uuid.uuid4().hex[:8]
+    anonymous_per_room = int(round(viewers * anonymous_share))
+
+    users = User.objects.bulk_create(
+        [User(username=f'loadtest-{tag}-host-{r}', email=f'{tag}-host-{r}@loadtest.local') for r in range(rooms)]
+        + [User(username=f'loadtest-{tag}-{r}-{v}', email=f'{tag}-{r}-{v}@loadtest.local')
+           for r in range(rooms) for v in range(viewers - anonymous_per_room)]
+    )
+    hosts = [Viewer(user, user.username) for user in users[:rooms]]
+    audiences = []
+    logged_in = iter(users[rooms:])
+    for r in range(rooms):
+        audience = [Viewer(next(logged_in), '') for _ in range(viewers - anonymous_per_room)]
+        audience += [Viewer(None, f'Guest {r}-{v}') for v in range(anonymous_per_room)]
+        for viewer in audience:
+            viewer.name = viewer.name or viewer.user.username
+        audiences.append(audience)
+    room_ids = [str(host.user.id) for host in hosts]
+    webhook_client = Client()
+
+    def post_webhook(event):
+        recorder.call(
+            'webhook', webhook_client.post, f'{API}/webhook/',
+            data=json.dumps(event), content_type='application/json', HTTP_AUTHORIZATION='Bearer loadtest'
+        )
+
+    def connect(viewer, room_id, role):
+        params = {'role': role} if viewer.user else {'username': viewer.name}
+        response = recorder.call('get_room_token', viewer.client.get, f'{API}/rooms/{room_id}/token/', data=params)
+        if response.status_code == 200:
+            viewer.identity = response.json()['identity']
+            viewer.token = response.json()['token']
+            server.join(room_id, viewer.identity, viewer.name)
+
+    def join(viewer, room_id):
+        recorder.call('room_list', viewer.client.get, f'{API}/rooms/')
+        connect(viewer, room_id, 'viewer')
+
+    def poll(viewer, room_id, round_number):
+        recorder.call('room_participants', viewer.client.get, f'{API}/rooms/{room_id}/participants/')
+        recorder.call(
+            'heartbeat', viewer.client.post, f'{API}/rooms/{room_id}/heartbeat/',
+            data=json.dumps({} if viewer.user else {'token': viewer.token}), content_type='application/json'
+        )
+        if lobby_every and round_number % lobby_every == 0:
+            recorder.call('room_list', viewer.client.get, f'{API}/rooms/')
+
+    def leave(viewer, room_id):
+        if viewer.identity:
+            server.leave(room_id, viewer.identity)
+
+    def each_viewer(work, *args):
+        tasks = [(viewer, room_id) for audience, room_id in zip(audiences, room_ids) for viewer in audience]
+        if threads <= 1:
+            for viewer, room_id in tasks:
+                work(viewer, room_id, *args)
+        else:
+            def run(task):
+                try:
+                    work(task[0], task[1], *args)
+                finally:
+                    connections.close_all()
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                list(pool.map(run, tasks))
+        deliver_webhooks(post_webhook)
+
+    started = time.perf_counter()
+    try:
+        for host, room_id in zip(hosts, room_ids):
+            recorder.call(
+                'create_room', host.client.post, f'{API}/rooms/create/',
+                data=json.dumps({'name': f'Load test {tag} {room_id}'}), content_type='application/json'
+            )
+            connect(host, room_id, 'host')
+        deliver_webhooks(post_webhook)
+
+        each_viewer(join)
+        for round_number in range(1, polls + 1):
+            each_viewer(poll, round_number)
+        each_viewer(leave)
+
+        for host, room_id in zip(hosts, room_ids):
+            recorder.call('delete_room', host.client.delete, f'{API}/rooms/{room_id}/delete/')
+        deliver_webhooks(post_webhook)
+        elapsed = time.perf_counter() - started
+    finally:
+        for viewer in hosts + [viewer for audience in audiences for viewer in audience]:
+            viewer.client.logout()
+        RoomArchive.objects.filter(room_key__in=room_ids).delete()
+        User.objects.filter(pk__in=[user.pk for user in users]).delete()
+        recorder.rpc_count = server.rpc_count
+        server.reset()
+    return recorder, elapsed
@@ -0,0 +1,68 @@
+# backend/livestream/management/commands/bench_room_tokens.py
+
+import time
+import uuid
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+from livestream.models import Room
+from livestream.views import get_room_token
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Measure get_room_token throughput in tokens per second for first joins and rejoins"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50, help='Authenticated users joining the room')
+        parser.add_argument('--rejoins', type=int, default=20, help='Rejoins per user after the first join')
+        parser.add_argument('--role', default='guest', help='Role every user asks for')
+
+    def handle(self, *args, **options):
+        if not settings.LIVEKIT_API_KEY or not settings.LIVEKIT_API_SECRET:
+            raise CommandError('LIVEKIT_API_KEY and LIVEKIT_API_SECRET must be set, any values will do')
+
+        tag = uuid.uuid4().hex[:8]
+        host = User.objects.create(username=f'token-bench-host-{tag}', email=f'host-{tag}@bench.local')
+        room = Room.objects.create(room_id=f'token-bench-{tag}', host=host, name='token bench')
+        users = User.objects.bulk_create([
+            User(username=f'token-bench-{tag}-{i}', email=f'{tag}-{i}@bench.local')
+            for i in range(options['users'])
+        ])
+        self.factory = APIRequestFactory()
+
+        try:
+            self.run_phase('first join', room, users, 1, options['role'])
+            self.run_phase('rejoin', room, users, options['rejoins'], options['role'])
+            # a zero reuse window signs every token, as before tokens were reused
+            with override_settings(LIVEKIT_TOKEN_REUSE_SECONDS=0):
+                self.run_phase('rejoin, no token reuse', room, users, options['rejoins'], options['role'])
+            self.run_phase('anonymous join', room, [None] * options['users'], 1, 'viewer')
+        finally:
+            room.delete()
+            User.objects.filter(username__in=[user.username for user in users] + [host.username]).delete()
+
+    def run_phase(self, label, room, users, rounds, role):
+        path = f'/api/livestream/rooms/{room.room_id}/token/'
+        count = 0
+        with CaptureQueriesContext(connection) as queries:
+            started = time.monotonic()
+            for _ in range(rounds):
+                for user in users:
+                    request = self.factory.get(path, {'role': role})
+                    if user is not None:
+                        force_authenticate(request, user=user)
+                    response = get_room_token(request, room_id=room.room_id)
+                    if response.status_code != 200:
+                        raise CommandError(f"{label}: {response.status_code} {response.data}")
+                    count += 1
+            elapsed = time.monotonic() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{label:<24} {count:>6} tokens in {elapsed:.2f}s  "
+            f"{count / elapsed:>8.0f} tokens/s  {len(queries) / count:.2f} queries/token"
+        ))
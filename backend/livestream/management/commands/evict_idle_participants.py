@@ -0,0 +1,63 @@
+# backend/livestream/management/commands/evict_idle_participants.py
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from livestream.archive import close_room, leave_room
+from livestream.models import AnonymousViewer, Participant, Room
+from livestream.presence import idle_cutoff
+
+
+class Command(BaseCommand):
+    help = "Remove participants and anonymous viewers whose heartbeats stopped more than PRESENCE_IDLE_SECONDS ago"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--idle-seconds', type=int, default=None,
+                            help=f'Defaults to PRESENCE_IDLE_SECONDS ({settings.PRESENCE_IDLE_SECONDS})')
+        parser.add_argument('--close-abandoned', action='store_true',
+                            help='Also close and archive rooms whose host has gone idle')
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be removed')
+
+    def handle(self, *args, **options):
+        cutoff = idle_cutoff(options['idle_seconds'])
+        idle = (
+            Participant.objects.filter(last_active__lt=cutoff)
+            .values_list('room_id', 'user_id', 'role')
+            .order_by('room_id')
+        )
+
+        by_room = {}
+        abandoned = set()
+        for room_pk, user_id, role in idle.iterator(chunk_size=2000):
+            if role == 'host':
+                abandoned.add(room_pk)
+            else:
+                by_room.setdefault(room_pk, []).append(user_id)
+
+        idle_anonymous = AnonymousViewer.objects.filter(last_active__lt=cutoff)
+
+        if options['dry_run']:
+            self.stdout.write(
+                f"Would remove {sum(len(users) for users in by_room.values())} idle participants "
+                f"from {len(by_room)} rooms and {idle_anonymous.count()} anonymous viewers, "
+                f"{len(abandoned)} rooms have an idle host"
+            )
+            return
+
+        anonymous_removed, _ = idle_anonymous.delete()
+
+        rooms = Room.objects.in_bulk(set(by_room) | abandoned)
+        removed = 0
+        for room_pk, user_ids in by_room.items():
+            removed += leave_room(rooms[room_pk], user_ids)
+
+        closed = 0
+        if options['close_abandoned']:
+            for room_pk in abandoned:
+                close_room(rooms[room_pk])
+                closed += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Removed {removed} idle participants from {len(by_room)} rooms and {anonymous_removed} anonymous viewers"
+            + (f", closed {closed} abandoned rooms" if options['close_abandoned'] else
+               f", {len(abandoned)} rooms have an idle host (use --close-abandoned)")
+        ))
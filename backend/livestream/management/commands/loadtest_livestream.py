@@ -0,0 +1,57 @@
+# backend/livestream/management/commands/loadtest_livestream.py
+
+import contextlib
+import os
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from livestream.loadtest import run_load
+
+
+class Command(BaseCommand):
+    help = "Simulate rooms with viewers joining, polling and leaving against a fake LiveKit server and report latency per view"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rooms', type=int, default=5)
+        parser.add_argument('--viewers', type=int, default=20, help='Viewers per room')
+        parser.add_argument('--polls', type=int, default=10, help='Polling rounds while viewers are in the room')
+        parser.add_argument('--anonymous', type=float, default=0.5, help='Share of viewers that are logged out')
+        parser.add_argument('--lobby-every', type=int, default=5, help='Viewers reload the room list every this many rounds')
+        parser.add_argument('--threads', type=int, default=1, help='Concurrent viewers')
+        parser.add_argument('--rpc-latency', type=float, default=0.0, help='Seconds each fake LiveKit RPC takes')
+        parser.add_argument('--show-view-output', action='store_true', help="Keep the views' own print output")
+
+    def handle(self, *args, **options):
+        # the stub ignores credentials but tokens still have to be signed
+        overrides = {
+            'LIVEKIT_STUB': True,
+            'LIVEKIT_API_KEY': settings.LIVEKIT_API_KEY or 'loadtest',
+            'LIVEKIT_API_SECRET': settings.LIVEKIT_API_SECRET or 'loadtest-secret-loadtest-secret-00',
+        }
+        with override_settings(**overrides), open(os.devnull, 'w') as devnull:
+            quiet = contextlib.nullcontext() if options['show_view_output'] else contextlib.redirect_stdout(devnull)
+            with quiet:
+                recorder, elapsed = run_load(
+                    rooms=options['rooms'],
+                    viewers=options['viewers'],
+                    polls=options['polls'],
+                    anonymous_share=options['anonymous'],
+                    lobby_every=options['lobby_every'],
+                    threads=options['threads'],
+                    rpc_latency=options['rpc_latency'],
+                )
+
+        rows = recorder.summary()
+        self.stdout.write(
+            f"{'view':<18} {'count':>7} {'errors':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+            f"{'queries':>8} {'req/s':>8}"
+        )
+        for row in rows:
+            self.stdout.write(
+                f"{row['label']:<18} {row['count']:>7} {row['errors']:>6} {row['p50']:>8.1f} {row['p95']:>8.1f} "
+                f"{row['p99']:>8.1f} {row['queries']:>8.1f} {row['per_second']:>8.0f}"
+            )
+        total = sum(row['count'] for row in rows)
+        self.stdout.write(self.style.SUCCESS(
+            f"{total} requests in {elapsed:.1f}s, {total / elapsed:.0f} req/s overall, {recorder.rpc_count} LiveKit RPCs"
+        ))
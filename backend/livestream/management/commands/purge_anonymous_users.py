@@ -0,0 +1,48 @@
+# backend/livestream/management/commands/purge_anonymous_users.py
+
+import time
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from livestream.presence import idle_cutoff
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Delete the anonymous-<uuid> User rows that room tokens used to create for logged out viewers"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Users deleted per batch')
+        parser.add_argument('--pause', type=float, default=0.0, help='Seconds to sleep between batches')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the users that would be deleted')
+
+    def handle(self, *args, **options):
+        # viewers still sending heartbeats keep their rows until they go idle
+        anonymous = (
+            User.objects.filter(username__startswith='anonymous-', email__endswith='@anonymous.user')
+            .exclude(room_participations__last_active__gte=idle_cutoff())
+        )
+
+        if options['dry_run']:
+            self.stdout.write(f"Would delete {anonymous.count()} anonymous users")
+            return
+
+        started = time.monotonic()
+        deleted = 0
+        last_pk = 0
+        while True:
+            ids = list(
+                anonymous.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:options['batch_size']]
+            )
+            if not ids:
+                break
+            last_pk = ids[-1]
+            # cascades to their Participant rows
+            User.objects.filter(pk__in=ids).delete()
+            deleted += len(ids)
+            self.stdout.write(f"Deleted {deleted} anonymous users")
+            if options['pause']:
+                time.sleep(options['pause'])
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} anonymous users in {elapsed:.1f}s"))
@@ -0,0 +1,20 @@
+# Generated by Django 5.1 on 2026-10-19 06:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('livestream', '0010_sharedextract_page_number'),
+        ('papers', '0003_paper'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sharedextract',
+            name='paper',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='shared_extracts', to='papers.paper'),
+        ),
+    ]
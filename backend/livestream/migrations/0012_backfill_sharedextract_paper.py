@@ -0,0 +1,49 @@
+from django.db import migrations
+
+DOI_PREFIXES = ('https://doi.org/', 'http://doi.org/', 'https://dx.doi.org/', 'http://dx.doi.org/', 'doi:')
+
+
+def normalize_doi(doi):
+    doi = (doi or '').strip().lower()
+    for prefix in DOI_PREFIXES:
+        if doi.startswith(prefix):
+            doi = doi[len(prefix):]
+    return doi or None
+
+
+def backfill_shared_extract_papers(apps, schema_editor):
+    """Link shared extracts to the Paper for their DOI, creating missing Papers"""
+    Paper = apps.get_model('papers', 'Paper')
+    SharedExtract = apps.get_model('livestream', 'SharedExtract')
+
+    shared = SharedExtract.objects.exclude(doi__isnull=True).exclude(doi='').only('id', 'doi', 'title', 'authors')
+    papers = {}
+    for extract in shared.iterator(chunk_size=2000):
+        doi = normalize_doi(extract.doi)
+        if doi and doi not in papers:
+            papers[doi] = Paper(doi=doi, title=extract.title[:500], authors=extract.authors[:500])
+
+    Paper.objects.bulk_create(papers.values(), batch_size=1000, ignore_conflicts=True)
+    paper_ids = dict(Paper.objects.values_list('doi', 'id'))
+
+    batch = []
+    for extract in shared.iterator(chunk_size=2000):
+        extract.paper_id = paper_ids.get(normalize_doi(extract.doi))
+        batch.append(extract)
+        if len(batch) >= 1000:
+            SharedExtract.objects.bulk_update(batch, ['paper'])
+            batch = []
+    if batch:
+        SharedExtract.objects.bulk_update(batch, ['paper'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('livestream', '0011_sharedextract_paper'),
+        ('papers', '0004_backfill_papers'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_shared_extract_papers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.1 on 2026-10-19 06:17
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('livestream', '0012_backfill_sharedextract_paper'),
+        ('papers', '0007_extract_minhash'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sharedextract',
+            index=models.Index(fields=['room', 'shared_at', 'id'], name='sharedextract_room_feed'),
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.1 on 2026-10-19 06:19
+
+from django.db import migrations, models
+
+REFERENCED_FIELDS = ('title', 'authors', 'doi', 'link', 'pdf_link', 'extract', 'page_number')
+
+# what a row shared by reference stores in each referenced field
+BLANK = {'title': '', 'authors': '', 'doi': None, 'link': '', 'pdf_link': '', 'extract': '', 'page_number': None}
+
+
+def drop_copied_text(apps, schema_editor):
+    """
+    Blank the copied fields of shared extracts that are identical to the
+    PaperExtract they came from, so they read through original_extract.
+    Rows that were edited before sharing keep their own copy.
+    """
+    SharedExtract = apps.get_model('livestream', 'SharedExtract')
+
+    shared = (
+        SharedExtract.objects.filter(original_extract__isnull=False).exclude(extract='')
+        .select_related('original_extract').only('id', *REFERENCED_FIELDS, *[f'original_extract__{field}' for field in REFERENCED_FIELDS])
+    )
+    batch = []
+    for row in shared.iterator(chunk_size=2000):
+        original = row.original_extract
+        if all((getattr(row, field) or '') == (getattr(original, field) or '') for field in REFERENCED_FIELDS):
+            for field, value in BLANK.items():
+                setattr(row, field, value)
+            batch.append(row)
+        if len(batch) >= 1000:
+            SharedExtract.objects.bulk_update(batch, REFERENCED_FIELDS)
+            batch = []
+    if batch:
+        SharedExtract.objects.bulk_update(batch, REFERENCED_FIELDS)
+
+
+def restore_copied_text(apps, schema_editor):
+    SharedExtract = apps.get_model('livestream', 'SharedExtract')
+
+    shared = SharedExtract.objects.filter(original_extract__isnull=False, extract='').select_related('original_extract')
+    batch = []
+    for row in shared.iterator(chunk_size=2000):
+        for field in REFERENCED_FIELDS:
+            setattr(row, field, getattr(row.original_extract, field))
+        batch.append(row)
+        if len(batch) >= 1000:
+            SharedExtract.objects.bulk_update(batch, REFERENCED_FIELDS)
+            batch = []
+    if batch:
+        SharedExtract.objects.bulk_update(batch, REFERENCED_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('livestream', '0013_sharedextract_room_feed_index'),
+        ('papers', '0007_extract_minhash'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='sharedextract',
+            name='extract',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AlterField(
+            model_name='sharedextract',
+            name='title',
+            field=models.CharField(blank=True, max_length=500),
+        ),
+        migrations.RunPython(drop_copied_text, restore_copied_text),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.1 on 2026-10-19 06:20
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('livestream', '0014_sharedextract_by_reference'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoomArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('room_key', models.CharField(db_index=True, max_length=100)),
+                ('name', models.CharField(blank=True, max_length=100)),
+                ('started_at', models.DateTimeField()),
+                ('finished_at', models.DateTimeField()),
+                ('participant_count', models.PositiveIntegerField(default=0)),
+                ('extract_count', models.PositiveIntegerField(default=0)),
+                ('data', models.BinaryField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('host', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_rooms', to=settings.AUTH_USER_MODEL)),
+                ('room', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archive', to='livestream.room')),
+            ],
+            options={
+                'ordering': ['-finished_at'],
+                'indexes': [models.Index(fields=['host', '-finished_at'], name='roomarchive_host_recent')],
+            },
+        ),
+        migrations.CreateModel(
+            name='RoomEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.BigIntegerField()),
+                ('username', models.CharField(max_length=150)),
+                ('kind', models.CharField(choices=[('join', 'Joined'), ('leave', 'Left'), ('role', 'Role changed')], max_length=5)),
+                ('role', models.CharField(blank=True, max_length=10)),
+                ('at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='livestream.room')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['room', 'at'], name='roomevent_room_at')],
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.1 on 2026-10-19 06:25
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('livestream', '0015_room_events_and_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnonymousViewer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('identity', models.CharField(max_length=64, unique=True)),
+                ('name', models.CharField(max_length=150)),
+                ('joined_at', models.DateTimeField(auto_now_add=True)),
+                ('last_active', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='anonymous_viewers', to='livestream.room')),
+            ],
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.1 on 2026-10-19 06:55
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery
+
+
+def backfill_session_start(apps, schema_editor):
+    """The current session began when the room was created, or after the last archived one ended"""
+    Room = apps.get_model('livestream', 'Room')
+    RoomArchive = apps.get_model('livestream', 'RoomArchive')
+    Room.objects.update(session_started_at=F('created_at'))
+    latest = RoomArchive.objects.filter(room=OuterRef('pk')).order_by('-finished_at').values('finished_at')[:1]
+    Room.objects.filter(archive__isnull=False).update(session_started_at=Subquery(latest))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('livestream', '0016_anonymous_viewer'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='room',
+            name='session_started_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(backfill_session_start, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='roomarchive',
+            name='room',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archives', to='livestream.room'),
+        ),
+    ]
@@ -1,7 +1,9 @@
 # backend/livestream/models.py
 
 from django.db import models
+from django.db.models import Case, F, Q, When
 from django.conf import settings
+from django.utils import timezone
 
 class Room(models.Model):
     name = models.CharField(max_length=100, unique=True, null=True, blank=True)
@@ -9,6 +11,8 @@ class Room(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     host = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='hosted_rooms')
     is_active = models.BooleanField(default=True)
+    # start of the current session, the row is reused each time its host opens the room again
+    session_started_at = models.DateTimeField(default=timezone.now)
     metadata = models.JSONField(default=dict, blank=True)
     research_interests = models.ManyToManyField('authentication.ResearchInterest', blank=True, related_name='rooms')
 
@@ -44,6 +48,13 @@ class Participant(models.Model):
     class Meta:
         unique_together = ('room', 'user')
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # remembered so saves can tell a role change apart (see signals.record_participant_save)
+        instance._loaded_role = instance.__dict__.get('role')
+        return instance
+    
     def __str__(self):
         return f"{self.user.username} - {self.get_role_display()} in {self.room.name}"
     
@@ -67,24 +78,127 @@ class Participant(models.Model):
         """Check if this participant has moderation privileges"""
         return self.role in ['host', 'moderator']
 
+class AnonymousViewer(models.Model):
+    """
+    A logged out viewer in a room. Lives only as long as the viewer keeps
+    sending heartbeats, evict_idle_participants deletes it after
+    PRESENCE_IDLE_SECONDS, and it is never a User row.
+    """
+    room = models.ForeignKey(Room, on_delete=models.CASCADE, related_name='anonymous_viewers')
+    # the LiveKit identity handed out with the token, "anonymous-<uuid>"
+    identity = models.CharField(max_length=64, unique=True)
+    name = models.CharField(max_length=150)
+    joined_at = models.DateTimeField(auto_now_add=True)
+    last_active = models.DateTimeField(default=timezone.now, db_index=True)
+    
+    def __str__(self):
+        return f"{self.name} (anonymous) in {self.room.name}"
+
+# Fields a SharedExtract reads from its original_extract when it is shared by
+# reference. Those rows store the foreign key only and leave these blank.
+REFERENCED_FIELDS = ('title', 'authors', 'doi', 'link', 'pdf_link', 'extract', 'page_number')
+
+BY_REFERENCE = Q(original_extract__isnull=False, extract='')
+
+
+class SharedExtractQuerySet(models.QuerySet):
+    def with_content(self):
+        """Annotate content_<field> for each REFERENCED_FIELDS entry, joined from original_extract where shared by reference"""
+        return self.annotate(**{
+            f'content_{field}': Case(When(BY_REFERENCE, then=F(f'original_extract__{field}')), default=F(field))
+            for field in REFERENCED_FIELDS
+        })
+
+
 class SharedExtract(models.Model):
     room = models.ForeignKey(Room, on_delete=models.CASCADE, related_name='shared_extracts')
     shared_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='shared_extracts')
-    title = models.CharField(max_length=500)
+    title = models.CharField(max_length=500, blank=True)
     authors = models.CharField(max_length=500, blank=True)
     doi = models.CharField(max_length=100, blank=True, null=True)
     link = models.URLField(max_length=1000, blank=True)
     pdf_link = models.URLField(max_length=1000, blank=True)
-    extract = models.TextField()
+    extract = models.TextField(blank=True)
     page_number = models.CharField(max_length=20, blank=True, null=True)
+    paper = models.ForeignKey('papers.Paper', null=True, blank=True, on_delete=models.SET_NULL, related_name='shared_extracts')
     original_extract = models.ForeignKey('papers.PaperExtract', null=True, blank=True, on_delete=models.SET_NULL, related_name='shared_instances')
     shared_at = models.DateTimeField(auto_now_add=True)
     
+    objects = SharedExtractQuerySet.as_manager()
+    
     class Meta:
         ordering = ['shared_at']
+        indexes = [
+            # keyset reads of a room's feed in either direction
+            models.Index(fields=['room', 'shared_at', 'id'], name='sharedextract_room_feed'),
+        ]
     
     def __str__(self):
-        return f"Extract '{self.title}' shared by {self.shared_by.username} in {self.room.name}"
+        return f"Extract '{self.content('title')}' shared by {self.shared_by.username} in {self.room.name}"
+    
+    @property
+    def is_reference(self):
+        """True when the text lives on original_extract rather than on this row"""
+        return self.original_extract_id is not None and not self.extract
+    
+    def content(self, field):
+        """Value of a REFERENCED_FIELDS entry, from original_extract for rows shared by reference"""
+        source = self.original_extract if self.is_reference else self
+        return getattr(source, field)
 
 
 
+
+
+class RoomEvent(models.Model):
+    """
+    Joins, leaves and role changes of a running room. Only kept until the room
+    ends, when livestream.archive folds them into its RoomArchive.
+    """
+    JOIN = 'join'
+    LEAVE = 'leave'
+    ROLE = 'role'
+    KIND_CHOICES = [
+        (JOIN, 'Joined'),
+        (LEAVE, 'Left'),
+        (ROLE, 'Role changed'),
+    ]
+    
+    room = models.ForeignKey(Room, on_delete=models.CASCADE, related_name='events')
+    user_id = models.BigIntegerField()
+    username = models.CharField(max_length=150)
+    kind = models.CharField(max_length=5, choices=KIND_CHOICES)
+    role = models.CharField(max_length=10, blank=True)
+    at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['room', 'at'], name='roomevent_room_at'),
+        ]
+
+
+class RoomArchive(models.Model):
+    """
+    Compressed history of one session of a room: attendance intervals, role
+    changes and the shared extract timeline. Written once when the session ends.
+    """
+    room = models.ForeignKey(Room, null=True, blank=True, on_delete=models.SET_NULL, related_name='archives')
+    room_key = models.CharField(max_length=100, db_index=True)
+    name = models.CharField(max_length=100, blank=True)
+    host = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, on_delete=models.SET_NULL, related_name='archived_rooms')
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField()
+    participant_count = models.PositiveIntegerField(default=0)
+    extract_count = models.PositiveIntegerField(default=0)
+    # zlib compressed JSON, see livestream.archive
+    data = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-finished_at']
+        indexes = [
+            models.Index(fields=['host', '-finished_at'], name='roomarchive_host_recent'),
+        ]
+    
+    def __str__(self):
+        return f"Archive of {self.name or self.room_key} ({self.finished_at:%Y-%m-%d})"
@@ -0,0 +1,134 @@
+# backend/livestream/presence.py
+
+"""
+Participant presence from client heartbeats.
+
+A heartbeat only touches an in-process set. A background thread in each
+worker, started by its first heartbeat, flushes what it has collected to
+Participant.last_active every PRESENCE_FLUSH_SECONDS, in one UPDATE per
+batch of participants, so the database sees a handful of writes per
+interval however many viewers are polling, and a worker that stops getting
+requests still writes what it holds. last_active is therefore accurate to
+the flush interval, which is well inside PRESENCE_IDLE_SECONDS, the age at
+which evict_idle_participants removes a participant. Anonymous viewers are
+buffered the same way by identity and written to
+AnonymousViewer.last_active.
+
+Whatever is left is flushed when the worker exits, from gunicorn's
+worker_exit hook or, under other servers, at interpreter exit.
+"""
+
+import atexit
+import os
+import threading
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.db import connections
+from django.db.models import Q
+from django.utils import timezone
+from .models import AnonymousViewer, Participant
+
+FLUSH_BATCH_SIZE = 500
+
+_lock = threading.Lock()
+_pending = set()
+_pending_anonymous = set()
+# process the flush thread was started in, a forked worker starts its own
+_flusher_pid = None
+
+
+def heartbeat(room_pk, user_id):
+    """Note that user is present in room, written at this worker's next flush"""
+    _buffer(_pending, (room_pk, user_id))
+
+
+def anonymous_heartbeat(identity):
+    """Note that the anonymous viewer with this LiveKit identity is still watching"""
+    _buffer(_pending_anonymous, identity)
+
+
+def _buffer(pending, item):
+    global _flusher_pid
+    with _lock:
+        pending.add(item)
+        if _flusher_pid == os.getpid():
+            return
+        _flusher_pid = os.getpid()
+    threading.Thread(target=_flush_periodically, name='presence-flush', daemon=True).start()
+
+
+def _flush_periodically():
+    while True:
+        time.sleep(settings.PRESENCE_FLUSH_SECONDS)
+        with _lock:
+            batch, anonymous = _take()
+        if not batch and not anonymous:
+            continue
+        try:
+            flush(batch, anonymous)
+        except Exception as e:
+            print(f"Error flushing presence heartbeats: {str(e)}")
+            # kept for the next round rather than lost
+            with _lock:
+                _pending.update(batch)
+                _pending_anonymous.update(anonymous)
+        finally:
+            # this thread's own connection, kept connections would stay open for good
+            connections.close_all()
+
+
+def _take():
+    """Empty both buffers, the caller holds _lock"""
+    batch, anonymous = list(_pending), list(_pending_anonymous)
+    _pending.clear()
+    _pending_anonymous.clear()
+    return batch, anonymous
+
+
+def flush(batch, anonymous=()):
+    """
+    Set last_active to now for every (room pk, user id) pair in batch and
+    every anonymous identity. Returns rows updated.
+    """
+    now = timezone.now()
+    updated = 0
+    for start in range(0, len(batch), FLUSH_BATCH_SIZE):
+        match = Q()
+        for room_pk, user_id in batch[start:start + FLUSH_BATCH_SIZE]:
+            match |= Q(room_id=room_pk, user_id=user_id)
+        # update() skips auto_now, last_active is set explicitly
+        updated += Participant.objects.filter(match).update(last_active=now)
+    anonymous = list(anonymous)
+    for start in range(0, len(anonymous), FLUSH_BATCH_SIZE):
+        updated += AnonymousViewer.objects.filter(
+            identity__in=anonymous[start:start + FLUSH_BATCH_SIZE]
+        ).update(last_active=now)
+    return updated
+
+
+def flush_pending():
+    """Write everything buffered in this process now, e.g. from tests or at shutdown"""
+    with _lock:
+        batch, anonymous = _take()
+    if not batch and not anonymous:
+        return 0
+    return flush(batch, anonymous)
+
+
+@atexit.register
+def _flush_at_exit():
+    try:
+        flush_pending()
+    except Exception as e:
+        print(f"Error flushing presence heartbeats at exit: {str(e)}")
+
+
+def idle_cutoff(idle_seconds=None):
+    if idle_seconds is None:
+        idle_seconds = settings.PRESENCE_IDLE_SECONDS
+    return timezone.now() - timedelta(seconds=idle_seconds)
+
+
+def is_online(participant, cutoff=None):
+    return participant.last_active >= (cutoff or idle_cutoff())
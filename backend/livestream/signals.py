@@ -0,0 +1,37 @@
+# backend/livestream/signals.py
+
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from papers.models import PaperExtract
+from .models import REFERENCED_FIELDS, Participant, Room, RoomEvent, SharedExtract
+from .tokens import forget_room
+
+
+@receiver(pre_delete, sender=PaperExtract)
+def copy_referenced_content(sender, instance, **kwargs):
+    """Extracts shared by reference keep their text once the PaperExtract they point at is gone"""
+    SharedExtract.objects.filter(original_extract=instance, extract='').update(
+        **{field: getattr(instance, field) for field in REFERENCED_FIELDS}
+    )
+
+
+@receiver(post_save, sender=Participant)
+def record_participant_save(sender, instance, created, **kwargs):
+    """Log joins and role changes for the room archive, saves that change nothing write no event"""
+    if created:
+        kind = RoomEvent.JOIN
+    elif getattr(instance, '_loaded_role', instance.role) != instance.role:
+        kind = RoomEvent.ROLE
+    else:
+        return
+    RoomEvent.objects.create(
+        room_id=instance.room_id, user_id=instance.user_id, username=instance.user.username,
+        kind=kind, role=instance.role
+    )
+    instance._loaded_role = instance.role
+
+
+@receiver(post_save, sender=Room)
+@receiver(post_delete, sender=Room)
+def drop_cached_room_info(sender, instance, **kwargs):
+    forget_room(instance.room_id)
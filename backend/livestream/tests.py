@@ -1,5 +1,159 @@
 # backend/livestream/tests.py
 
-from django.test import TestCase
+import time
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+from . import presence, views
+from .archive import close_room, load_archive
+from .models import AnonymousViewer, Participant, Room, RoomArchive, SharedExtract
+from .presence import flush_pending, heartbeat
+from .tokens import _room_key, mint, room_info
 
-# Create your tests here.
+User = get_user_model()
+
+
+@override_settings(LIVEKIT_STUB=True)
+class RoomSessionArchiveTests(TestCase):
+    def setUp(self):
+        self.host = User.objects.create(username='host', email='host@example.com')
+        self.factory = APIRequestFactory()
+
+    def open_room(self, name):
+        request = self.factory.post('/api/livestream/rooms/create/', {'name': name}, format='json')
+        force_authenticate(request, user=self.host)
+        response = views.create_room(request)
+        self.assertIn(response.status_code, (200, 201))
+        return Room.objects.get(room_id=str(self.host.id))
+
+    def run_session(self, name, username, title):
+        room = self.open_room(name)
+        guest = User.objects.create(username=username, email=f'{username}@example.com')
+        Participant.objects.create(room=room, user=guest, role='viewer')
+        SharedExtract.objects.create(room=room, shared_by=guest, title=title, extract=title)
+        return close_room(room), guest
+
+    def test_reopened_room_archives_each_session(self):
+        first, first_guest = self.run_session('First', 'alice', 'first extract')
+        second, second_guest = self.run_session('Second', 'bob', 'second extract')
+
+        self.assertNotEqual(first.id, second.id)
+        self.assertEqual(RoomArchive.objects.filter(room_key=str(self.host.id)).count(), 2)
+        self.assertEqual(second.name, 'Second')
+
+        sessions = (
+            (first, first_guest, second_guest, 'first extract'),
+            (second, second_guest, first_guest, 'second extract'),
+        )
+        for archive, guest, other_guest, title in sessions:
+            data = load_archive(archive)
+            self.assertEqual([extract[3] for extract in data['extracts']], [title])
+            attendees = {interval[0] for interval in data['attendance']}
+            self.assertIn(guest.id, attendees)
+            self.assertNotIn(other_guest.id, attendees)
+
+    def test_close_twice_returns_the_same_archive(self):
+        room = self.open_room('Only')
+        archive = close_room(room)
+        self.assertEqual(close_room(room).id, archive.id)
+        self.assertEqual(RoomArchive.objects.count(), 1)
+
+
+class StaleRoomInfoTests(TransactionTestCase):
+    """room_info entries another worker cached before the room was deleted, which this worker's signals never dropped"""
+
+    def setUp(self):
+        cache.clear()
+        self.host = User.objects.create(username='host', email='host@example.com')
+        self.viewer = User.objects.create(username='viewer', email='viewer@example.com')
+        self.room = Room.objects.create(room_id='stale', name='Stale', host=self.host)
+        self.factory = APIRequestFactory()
+
+    def delete_room_elsewhere(self):
+        stale = room_info('stale')
+        self.room.delete()
+        cache.set(_room_key('stale'), stale)
+
+    def get_token(self, user=None):
+        request = self.factory.get('/api/livestream/token/stale/')
+        if user is not None:
+            force_authenticate(request, user=user)
+        return views.get_room_token(request, 'stale')
+
+    @override_settings(LIVEKIT_API_KEY='devkey', LIVEKIT_API_SECRET='devsecret-devsecret-devsecret-devsecret')
+    def test_deleted_room_is_not_found(self):
+        self.delete_room_elsewhere()
+        for user in (self.viewer, None):
+            self.assertEqual(self.get_token(user).status_code, 404)
+        self.assertIsNone(cache.get(_room_key('stale')))
+
+    @override_settings(LIVEKIT_API_KEY='devkey', LIVEKIT_API_SECRET='devsecret-devsecret-devsecret-devsecret')
+    def test_recreated_room_is_joined(self):
+        self.delete_room_elsewhere()
+        room = Room.objects.create(room_id='stale', name='Stale again', host=self.host)
+        cache.set(_room_key('stale'), (self.room.pk, self.host.id))
+
+        self.assertEqual(self.get_token(self.viewer).status_code, 200)
+        self.assertTrue(Participant.objects.filter(room=room, user=self.viewer).exists())
+        cache.set(_room_key('stale'), (self.room.pk, self.host.id))
+        self.assertEqual(self.get_token().status_code, 200)
+        self.assertEqual(AnonymousViewer.objects.filter(room=room).count(), 1)
+
+
+@override_settings(PRESENCE_FLUSH_SECONDS=0.05)
+class PresenceFlushTests(TransactionTestCase):
+    # a worker without a flush thread yet, one started by an earlier test still sleeps the default interval
+    @mock.patch.object(presence, '_flusher_pid', None)
+    def test_idle_worker_flushes_its_buffer(self):
+        host = User.objects.create(username='host', email='host@example.com')
+        room = Room.objects.create(room_id='presence', host=host)
+        participant = Participant.objects.create(room=room, user=host, role='host')
+        seen = participant.last_active
+
+        # one heartbeat and then no more requests, nothing else would flush it
+        heartbeat(room.pk, host.id)
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            participant.refresh_from_db()
+            if participant.last_active > seen:
+                break
+            time.sleep(0.05)
+        self.assertGreater(participant.last_active, seen)
+
+
+@override_settings(LIVEKIT_API_KEY='devkey', LIVEKIT_API_SECRET='devsecret-devsecret-devsecret-devsecret')
+class AnonymousHeartbeatTests(TestCase):
+    def setUp(self):
+        host = User.objects.create(username='host', email='host@example.com')
+        self.room = Room.objects.create(room_id='watched', host=host)
+        self.viewer = AnonymousViewer.objects.create(room=self.room, identity='anonymous-viewer', name='Guest')
+        AnonymousViewer.objects.filter(pk=self.viewer.pk).update(last_active=self.room.created_at)
+        self.factory = APIRequestFactory()
+
+    def send(self, body):
+        request = self.factory.post('/api/livestream/rooms/watched/heartbeat/', body, format='json')
+        return views.participant_heartbeat(request, 'watched')
+
+    def last_active(self):
+        flush_pending()
+        return AnonymousViewer.objects.get(pk=self.viewer.pk).last_active
+
+    def test_heartbeat_with_the_viewers_token(self):
+        token = mint('anonymous-viewer', 'Guest', 'watched', False, reuse=False)
+        self.assertEqual(self.send({'token': token}).status_code, 204)
+        self.assertGreater(self.last_active(), self.room.created_at)
+
+    def test_unsigned_identity_is_refused(self):
+        forged = mint('anonymous-viewer', 'Guest', 'watched', False, reuse=False)[:-2] + 'xx'
+        for body in ({'identity': 'anonymous-viewer'}, {'token': forged}):
+            self.assertEqual(self.send(body).status_code, 401)
+        with override_settings(LIVEKIT_API_SECRET='another-secret-another-secret-another'):
+            other = mint('anonymous-viewer', 'Guest', 'watched', False, reuse=False)
+        self.assertEqual(self.send({'token': other}).status_code, 401)
+        self.assertEqual(self.last_active(), self.room.created_at)
+
+    def test_token_for_another_room_is_refused(self):
+        token = mint('anonymous-viewer', 'Guest', 'elsewhere', False, reuse=False)
+        self.assertEqual(self.send({'token': token}).status_code, 401)
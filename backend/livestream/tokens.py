@@ -0,0 +1,131 @@
+# backend/livestream/tokens.py
+
+"""
+LiveKit access tokens for room joins.
+
+Clients ask for a token on every connect, and reconnects are frequent (role
+changes, page reloads, flaky networks). Each of the costly steps is skipped
+when nothing changed since the last join:
+
+- room_info() caches room_id -> (pk, host id), signals drop the entry when
+  the room is saved or deleted. The cache is per worker, so other workers
+  can hold a stale entry until it expires; joining_room() notices when the
+  room is gone by the participant write failing and looks it up again
+- sync_participant() only writes when the participant row is missing or
+  its role actually changes
+- mint() hands out the token already signed for the same identity, name,
+  room and grants for LIVEKIT_TOKEN_REUSE_SECONDS. Tokens live for
+  LIVEKIT_TOKEN_TTL_SECONDS, far longer, so a reused one still has most of
+  its life left.
+
+Anonymous viewers have no session to authenticate later requests with, so
+they send back the token they were given and anonymous_identity() checks
+its signature before trusting the identity in it.
+"""
+
+import hashlib
+from datetime import timedelta
+import jwt
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from livekit.api import AccessToken, TokenVerifier, VideoGrants
+from .models import Participant, Room
+
+ROOM_INFO_CACHE_SECONDS = 300
+
+
+def _room_key(room_id):
+    return f"room_info_{room_id}"
+
+
+def room_info(room_id):
+    """(pk, host id) of the room, or None when there is no such room"""
+    key = _room_key(room_id)
+    info = cache.get(key)
+    if info is None:
+        info = Room.objects.filter(room_id=room_id).values_list('id', 'host_id').first()
+        if info is None:
+            return None
+        cache.set(key, tuple(info), ROOM_INFO_CACHE_SECONDS)
+    return info
+
+
+def forget_room(room_id):
+    cache.delete(_room_key(room_id))
+
+
+def joining_room(room_id, join):
+    """
+    Call join(room_pk, host_id), which may create rows pointing at the room,
+    each in a savepoint of its own. When a create fails on the foreign key the
+    cached room_info was stale, deleted or recreated by a request another
+    worker served, so it is dropped and join runs once more on the room as it
+    is now. Raises Room.DoesNotExist when there is no such room.
+    """
+    for attempt in range(2):
+        info = room_info(room_id)
+        if info is None:
+            raise Room.DoesNotExist
+        try:
+            return join(*info)
+        except IntegrityError:
+            forget_room(room_id)
+            if attempt:
+                raise
+
+
+def sync_participant(room_pk, user, role):
+    """
+    Make sure user has a participant row in the room with role. A repeat
+    join with the same role is a single SELECT. Hosts are never downgraded.
+    """
+    participant = Participant.objects.filter(room_id=room_pk, user=user).first()
+    if participant is None:
+        # a savepoint only around the write, the IntegrityError when the room is gone leaves the caller usable
+        with transaction.atomic():
+            return Participant.objects.create(room_id=room_pk, user=user, role=role)
+    if participant.role not in ('host', role):
+        participant.role = role
+        participant.save(update_fields=['role'])
+    return participant
+
+
+def mint(identity, name, room_id, room_admin, can_publish=True, reuse=True):
+    """Signed JWT for joining room_id. With reuse, an identical token signed recently is returned instead."""
+    grants = (identity, name, room_id, bool(room_admin), bool(can_publish))
+    key = 'livekit_token_' + hashlib.md5(repr((settings.LIVEKIT_API_KEY, *grants)).encode()).hexdigest()
+    if reuse:
+        jwt = cache.get(key)
+        if jwt is not None:
+            return jwt
+
+    token = (
+        AccessToken(api_key=settings.LIVEKIT_API_KEY, api_secret=settings.LIVEKIT_API_SECRET)
+        .with_identity(identity)
+        .with_name(name)
+        .with_ttl(timedelta(seconds=settings.LIVEKIT_TOKEN_TTL_SECONDS))
+        .with_grants(VideoGrants(
+            room=room_id,
+            room_join=True,
+            room_admin=room_admin,
+            can_publish=can_publish,
+            can_subscribe=True,
+            can_publish_data=True
+        ))
+    )
+    jwt = token.to_jwt()
+    if reuse:
+        cache.set(key, jwt, min(settings.LIVEKIT_TOKEN_REUSE_SECONDS, settings.LIVEKIT_TOKEN_TTL_SECONDS // 2))
+    return jwt
+
+
+def anonymous_identity(token, room_id):
+    """The anonymous identity a token minted here for room_id was issued to, None for any other token"""
+    try:
+        claims = TokenVerifier(settings.LIVEKIT_API_KEY, settings.LIVEKIT_API_SECRET).verify(token)
+    except jwt.PyJWTError:
+        return None
+    if claims.video.room != room_id or not claims.identity.startswith('anonymous-'):
+        return None
+    return claims.identity
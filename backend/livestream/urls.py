@@ -8,6 +8,7 @@ urlpatterns = [
     path('rooms', views.room_list, name='room_list'),  
     path('rooms/create/', views.create_room, name='create_room'),
     path('rooms/create', views.create_room, name='create_room'),  
+    path('rooms/archives/', views.room_archives, name='room_archives'),
     path('rooms/<str:room_id>/', views.room_detail, name='room_detail'),
     path('rooms/<str:room_id>', views.room_detail, name='room_detail'),  
     path('rooms/<str:room_id>/token/', views.get_room_token, name='get_room_token'),
@@ -24,5 +25,7 @@ urlpatterns = [
     path('rooms/<str:room_id>/shared-extracts/', views.get_room_extracts, name='get_room_extracts'),
     path('rooms/<str:room_id>/shared-extracts', views.get_room_extracts, name='get_room_extracts'),
     path('rooms/<str:room_id>/share-extract/', views.share_extract_in_room, name='share_extract_in_room'),
+    path('rooms/<str:room_id>/archive/', views.room_archive, name='room_archive'),
+    path('rooms/<str:room_id>/heartbeat/', views.participant_heartbeat, name='participant_heartbeat'),
     path('rooms/<str:room_id>/share-extract', views.share_extract_in_room, name='share_extract_in_room'),
 ]
@@ -12,15 +12,24 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from django.conf import settings
+from django.contrib.auth import get_user_model
 from django.views.decorators.csrf import csrf_exempt
 from livekit import api
-from livekit.api import AccessToken, VideoGrants
 # Import the correct proto modules
 from livekit.api.room_service import CreateRoomRequest, DeleteRoomRequest, ListParticipantsRequest
-from .models import Room, Participant, SharedExtract
+from .models import AnonymousViewer, Room, Participant, RoomArchive, SharedExtract
+from .archive import close_room, leave_room, load_archive
+from django_backend.db_router import replica_reads
+from django_backend.instrumentation import external_call
+from django_backend.metrics import livekit_rpc, tracks_webhooks, webhook_event
+from .presence import anonymous_heartbeat, heartbeat
+from .tokens import anonymous_identity, joining_room, mint, room_info, sync_participant
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.db import transaction
 from django.db.models import Q
 from papers.models import PaperExtract
+from papers.enrichment import get_or_create_paper
 
 # Add simple test endpoint
 @api_view(['GET', 'POST'])
@@ -35,6 +44,8 @@ def test_endpoint(request):
         'data': request.data if request.method == 'POST' else None
     })
 
+User = get_user_model()
+
 # Get LiveKit config from settings
 LIVEKIT_API_URL = getattr(settings, 'LIVEKIT_API_URL', None)
 LIVEKIT_API_KEY = getattr(settings, 'LIVEKIT_API_KEY', None)
@@ -46,13 +57,18 @@ def sync_livekit(async_func):
     def wrapper(*args, **kwargs):
         loop = asyncio.new_event_loop()
         try:
-            return loop.run_until_complete(async_func(*args, **kwargs))
+            with external_call('livekit'), livekit_rpc(async_func.__name__):
+                return loop.run_until_complete(async_func(*args, **kwargs))
         finally:
             loop.close()
     return wrapper
 
 # Function to get a new LiveKit API client for each request
 def get_livekit_client():
+    if settings.LIVEKIT_STUB:
+        # load test only, kept out of production imports
+        from .livekit_stub import FakeLiveKitAPI
+        return FakeLiveKitAPI()
     return api.LiveKitAPI(
         url=LIVEKIT_API_URL,
         api_key=LIVEKIT_API_KEY,
@@ -61,6 +77,7 @@ def get_livekit_client():
 
 @api_view(['GET'])
 @permission_classes([AllowAny])  # Temporarily allow any user for testing
+@replica_reads
 def room_list(request):
     """List all active rooms"""
     print("Fetching room list")
@@ -119,6 +136,7 @@ def room_detail(request, room_id):
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@replica_reads
 def room_participants(request, room_id):
     """Get participants for a specific room with their roles"""
     try:
@@ -164,6 +182,18 @@ def room_participants(request, room_id):
                 'isCurrentUser': is_current_user
             })
         
+        for viewer in AnonymousViewer.objects.filter(room=room).only('id', 'identity', 'name', 'joined_at', 'last_active'):
+            participants_data.append({
+                'id': f"anonymous-{viewer.id}",
+                'userId': viewer.identity,
+                'username': viewer.name,
+                'role': 'viewer',
+                'joinedAt': viewer.joined_at,
+                'lastActive': viewer.last_active,
+                'isCurrentUser': False,
+                'isAnonymous': True
+            })
+        
         # If current user isn't in participants yet, add them temporarily
         if user.is_authenticated and not any(p['userId'] == user.id for p in participants_data):
             # Try once more to determine role if there isnt one
@@ -244,14 +274,9 @@ def delete_room(request, room_id):
             print(f"Error with LiveKit room deletion: {str(e)}")
             # Continue with local deletion even if LiveKit deletion fails
         
-        # Remove all participants from database
-        participant_count = Participant.objects.filter(room=room).count()
-        Participant.objects.filter(room=room).delete()
-        print(f"Removed {participant_count} participants from database")
-        
-        # Mark as inactive and then delete from database
-        room.is_active = False
-        room.save()
+        # Remove all participants and keep the session history, then delete from database
+        archive = close_room(room)
+        print(f"Archived room with {archive.participant_count} participants")
         room.delete()
         print(f"Room {room_id} deleted from database")
         
@@ -298,6 +323,8 @@ def create_room(request):
                 print(f"Reactivating existing room {room_id}")
                 existing_room.is_active = True
                 existing_room.name = name
+                # a new session, archived separately from the earlier ones when it closes
+                existing_room.session_started_at = timezone.now()
                 existing_room.save()
                 
                 # update research interests
@@ -393,8 +420,6 @@ def create_room(request):
 def get_room_token(request, room_id):
     """Generate a LiveKit token with appropriate permissions based on role"""
     try:
-        room = Room.objects.get(room_id=room_id)
-        
         user = request.user
         
         # Get requested role and username from query params
@@ -406,83 +431,35 @@ def get_room_token(request, room_id):
         if requested_role not in valid_roles:
             requested_role = 'viewer'
         
-        
-        if user.is_authenticated:
-            if requested_role == 'host' and room.host != user:
-                requested_role = 'viewer'
-                print(f"User requested 'host' role but is not the host - downgraded to viewer")
-            else:
-                print(f"User requested role '{requested_role}' - verified")
+        def join(room_pk, host_id):
+            if user.is_authenticated:
+                role = requested_role
+                if role == 'host' and host_id != user.id:
+                    role = 'viewer'
+                    print(f"User requested 'host' role but is not the host - downgraded to viewer")
                 
-            participant, created = Participant.objects.get_or_create(
-                room=room,
-                user=user,
-                defaults={'role': requested_role}
-            )
+                # no write at all when a participant rejoins with the role they already have
+                sync_participant(room_pk, user, role)
+                return role, str(user.id), user.username
             
-            if participant.role != 'host':
-                participant.role = requested_role
-                participant.save()
-                
-            identity = str(user.id)
-            name = user.username
-        else:
             # Anonymous users always get viewer role
-            requested_role = 'viewer'
             identity = f"anonymous-{uuid.uuid4()}"
-            
-            if username:
-                name = username
-            else:
-                name = f"Viewer-{identity[:8]}"
-            
-            # Create a temporary user for the anonymous participant
-            from django.contrib.auth import get_user_model
-            User = get_user_model()
-            temp_user, created = User.objects.get_or_create(
-                username=identity,
-                defaults={
-                    'email': f"{identity}@anonymous.user"
-                }
-            )
-            
-            # Then create the participant with the temporary user
-            participant, created = Participant.objects.get_or_create(
-                room=room,
-                user=temp_user,
-                defaults={'role': 'viewer'}
-            )
+            name = username or f"Viewer-{identity[:8]}"
+            # anonymous viewers get a short lived row of their own, not a User
+            with transaction.atomic():
+                AnonymousViewer.objects.create(room_id=room_pk, identity=identity, name=name)
+            return 'viewer', identity, name
         
-        # Create token with appropriate permissions
-        token = AccessToken(
-            api_key=LIVEKIT_API_KEY,
-            api_secret=LIVEKIT_API_SECRET
-        )
-        
-        token.with_identity(identity)
-        token.with_name(name)
+        requested_role, identity, name = joining_room(room_id, join)
         
         can_publish = True
         room_admin = requested_role == 'host'
         
-        print(f"DEBUG PERMISSIONS: role={requested_role}, can_publish={can_publish}, room_admin={room_admin}")
-        
-        grants = VideoGrants(
-            room=room_id,
-            room_join=True,
-            room_admin=room_admin,
-            can_publish=can_publish,
-            can_subscribe=True,
-            can_publish_data=True
-        )
-        
-        # Admin rights already set above
-        print(f"Final token permissions: can_publish={grants.can_publish}, room_admin={grants.room_admin}")
-        
-        token.with_grants(grants)
+        # anonymous identities are new on every call, so their tokens are never reused
+        jwt = mint(identity, name, room_id, room_admin, can_publish, reuse=user.is_authenticated)
         
         return Response({
-            'token': token.to_jwt(), 
+            'token': jwt, 
             'room_id': room_id,
             'role': requested_role,
             'name': name,
@@ -498,6 +475,7 @@ def get_room_token(request, room_id):
 @csrf_exempt
 @api_view(['POST', 'GET'])
 @permission_classes([AllowAny])
+@tracks_webhooks
 def webhook(request):
     """Handle LiveKit webhooks for participant and room events"""
     print("\n===== WEBHOOK EVENT RECEIVED =====")
@@ -548,6 +526,7 @@ def webhook(request):
         
         # Get the event type
         event_type = event_data.get('event')
+        webhook_event(event_type)
         print(f"[WEBHOOK] Event Type: {event_type}")
         print(f"[WEBHOOK] Data: {json.dumps(event_data, indent=2)}")
         
@@ -564,17 +543,11 @@ def webhook(request):
             print(f"\n[ROOM FINISHED] Room: {room_name}")
             print(f"[ROOM FINISHED] Details: {json.dumps(room_info, indent=2)}")
             
-            # Mark room as inactive in database
+            # Mark room as inactive, clear its participants and archive the session
             try:
                 room = Room.objects.get(room_id=room_name)
-                room.is_active = False
-                room.save()
-                
-                # Clear all participants for this room
-                Participant.objects.filter(room=room).delete()
-                print(f"[ROOM FINISHED] Removed all participants for room {room_name}")
-                
-                print(f"[ROOM FINISHED] Marked room {room_name} as inactive in database")
+                archive = close_room(room)
+                print(f"[ROOM FINISHED] Marked room {room_name} as inactive and archived {archive.participant_count} participants")
             except Room.DoesNotExist:
                 print(f"[ROOM FINISHED] Room {room_name} not found in database")
             
@@ -598,8 +571,8 @@ def webhook(request):
             print(f"  Permissions: {json.dumps(participant_permission, indent=2)}")
             print(f"  Full Participant Info: {json.dumps(participant_info, indent=2)}")
             
-            # Make sure participant is in database
-            if room_name and participant_identity:
+            # Make sure participant is in database, anonymous viewers were recorded when their token was made
+            if room_name and participant_identity and not participant_identity.startswith('anonymous-'):
                 try:
                     room = Room.objects.get(room_id=room_name)
                     
@@ -654,26 +627,20 @@ def webhook(request):
                         # Try multiple ways to find the participant
                         try:
                             # First try to find by identity (user id)
-                            if participant_identity:
+                            if participant_identity and not participant_identity.startswith('anonymous-'):
                                 try:
                                     user = User.objects.get(id=participant_identity)
-                                    participant_found = Participant.objects.filter(room=room, user=user).exists()
+                                    participant_found = leave_room(room, [user])
                                     if participant_found:
-                                        Participant.objects.filter(room=room, user=user).delete()
                                         print(f"[PARTICIPANT LEFT] Removed participant with ID {participant_identity} from database")
                                         
                                         # Check if this was the host
                                         if room.host == user:
                                             print(f"[PARTICIPANT LEFT] Host {participant_identity} left room {room_name}")
                                             
-                                            # Handle host leaving - mark room inactive and delete all participants
-                                            room.is_active = False
-                                            room.save()
-                                            print(f"[PARTICIPANT LEFT] Marked room {room_name} as inactive in database")
-                                            
-                                            # Delete all participants for this room
-                                            Participant.objects.filter(room=room).delete()
-                                            print(f"[PARTICIPANT LEFT] Removed all participants for room {room_name}")
+                                            # Handle host leaving - mark room inactive, delete all participants and archive
+                                            close_room(room)
+                                            print(f"[PARTICIPANT LEFT] Closed and archived room {room_name}")
                                             
                                             # Delete the LiveKit room
                                             try:
@@ -701,7 +668,7 @@ def webhook(request):
                                 
                                 if matching_users.exists():
                                     for user in matching_users:
-                                        deleted_count = Participant.objects.filter(room=room, user=user).delete()[0]
+                                        deleted_count = leave_room(room, [user])
                                         if deleted_count > 0:
                                             print(f"[PARTICIPANT LEFT] Removed participant with name {participant_name} from database")
                                         
@@ -709,14 +676,9 @@ def webhook(request):
                                         if room.host == user:
                                             print(f"[PARTICIPANT LEFT] Host {participant_name} left room {room_name}")
                                             
-                                            # Handle host leaving - mark room inactive and delete all participants
-                                            room.is_active = False
-                                            room.save()
-                                            print(f"[PARTICIPANT LEFT] Marked room {room_name} as inactive in database")
-                                            
-                                            # Delete all participants for this room
-                                            Participant.objects.filter(room=room).delete()
-                                            print(f"[PARTICIPANT LEFT] Removed all participants for room {room_name}")
+                                            # Handle host leaving - mark room inactive, delete all participants and archive
+                                            close_room(room)
+                                            print(f"[PARTICIPANT LEFT] Closed and archived room {room_name}")
                                             
                                             # Delete the LiveKit room
                                             try:
@@ -736,16 +698,11 @@ def webhook(request):
                             
                             # Fallback: try to find anonymous participants
                             if participant_identity and participant_identity.startswith('anonymous-'):
-                                # Find users with matching identity in username
-                                matching_users = User.objects.filter(username=participant_identity)
-                                
-                                if matching_users.exists():
-                                    for user in matching_users:
-                                        deleted_count = Participant.objects.filter(room=room, user=user).delete()[0]
-                                        if deleted_count > 0:
-                                            print(f"[PARTICIPANT LEFT] Removed anonymous participant {participant_identity} from database")
+                                deleted_count, _ = AnonymousViewer.objects.filter(room=room, identity=participant_identity).delete()
+                                if deleted_count > 0:
+                                    print(f"[PARTICIPANT LEFT] Removed anonymous viewer {participant_identity} from database")
                                 else:
-                                    print(f"[PARTICIPANT LEFT] No anonymous users found with identity {participant_identity}")
+                                    print(f"[PARTICIPANT LEFT] No anonymous viewer found with identity {participant_identity}")
                                     
                         except Exception as e:
                             print(f"[PARTICIPANT LEFT] Error removing participant: {str(e)}")
@@ -764,7 +721,7 @@ def webhook(request):
                     print(f"[PARTICIPANT LEFT] Room {room_name} has {remaining_count} remaining participants in LiveKit")
                     
                     # Ensure database count matches LiveKit count
-                    db_count = Participant.objects.filter(room=room).count()
+                    db_count = Participant.objects.filter(room=room).count() + AnonymousViewer.objects.filter(room=room).count()
                     print(f"[PARTICIPANT LEFT] Room {room_name} has {db_count} participants in database")
                     
                     # If counts don't match, sync them
@@ -773,14 +730,9 @@ def webhook(request):
                         
                         # Clear participants for this room and recreate from LiveKit data
                         if remaining_count == 0:
-                            # If no remaining participants, simple clear the database
-                            Participant.objects.filter(room=room).delete()
-                            print(f"[PARTICIPANT LEFT] Cleared all participants for empty room {room_name}")
-                            
-                            # If LiveKit shows no participants, mark room as inactive
-                            print(f"[PARTICIPANT LEFT] Room {room_name} is empty, marking as inactive")
-                            room.is_active = False
-                            room.save()
+                            # If LiveKit shows no participants, the session is over: clear the database and archive it
+                            print(f"[PARTICIPANT LEFT] Room {room_name} is empty, closing it")
+                            close_room(room)
                             
                             # delete the room from LiveKit
                             try:
@@ -903,19 +855,35 @@ def share_extract_in_room(request, room_id):
         
         #print(f"Received extract data: {request.data}")
         
-        # Create SharedExtract record
-        shared_extract = SharedExtract.objects.create(
-            room=room,
-            shared_by=user,
-            title=request.data.get('title', ''),
-            authors=request.data.get('authors', ''),
-            doi=request.data.get('doi', ''),
-            link=request.data.get('link', ''),
-            pdf_link=request.data.get('pdf_link', ''),
-            extract=request.data.get('extract', ''),
-            page_number=request.data.get('page_number', ''),
-            original_extract=paper_extract
-        )
+        if paper_extract:
+            # share by reference, the text is read from the user's own extract
+            shared_extract = SharedExtract.objects.create(
+                room=room,
+                shared_by=user,
+                paper_id=paper_extract.paper_id,
+                original_extract=paper_extract
+            )
+        else:
+            # Link to the canonical paper record
+            paper = get_or_create_paper(
+                request.data.get('doi'),
+                title=request.data.get('title', ''),
+                authors=request.data.get('authors', '')
+            )
+            
+            # Create SharedExtract record
+            shared_extract = SharedExtract.objects.create(
+                room=room,
+                shared_by=user,
+                paper=paper,
+                title=request.data.get('title', ''),
+                authors=request.data.get('authors', ''),
+                doi=request.data.get('doi', ''),
+                link=request.data.get('link', ''),
+                pdf_link=request.data.get('pdf_link', ''),
+                extract=request.data.get('extract', ''),
+                page_number=request.data.get('page_number', ''),
+            )
         
         #print(f"Created SharedExtract: {shared_extract.id}, PDF link: {shared_extract.pdf_link}")
         
@@ -923,15 +891,15 @@ def share_extract_in_room(request, room_id):
         return Response({
             'extract': {
                 'id': shared_extract.id,
-                'title': shared_extract.title,
-                'authors': shared_extract.authors,
-                'doi': shared_extract.doi,
-                'link': shared_extract.link,
-                'pdf_link': shared_extract.pdf_link,
-                'publication_link': shared_extract.link,
-                'extract': shared_extract.extract,
-                'page_number': shared_extract.page_number,
-                'shared_by': shared_extract.shared_by.username,
+                'title': shared_extract.content('title'),
+                'authors': shared_extract.content('authors'),
+                'doi': shared_extract.content('doi'),
+                'link': shared_extract.content('link'),
+                'pdf_link': shared_extract.content('pdf_link'),
+                'publication_link': shared_extract.content('link'),
+                'extract': shared_extract.content('extract'),
+                'page_number': shared_extract.content('page_number'),
+                'shared_by': user.username,
                 'shared_at': shared_extract.shared_at.isoformat()
             }
         }, status=status.HTTP_201_CREATED)
@@ -948,43 +916,116 @@ def share_extract_in_room(request, room_id):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
+# columns read for the shared extracts feed, shared_by and the referenced extract come from joins
+SHARED_EXTRACT_VALUES = (
+    'id', 'content_title', 'content_authors', 'content_doi', 'content_link', 'content_pdf_link',
+    'content_extract', 'content_page_number', 'shared_by__username', 'shared_at'
+)
+
+ROOM_EXTRACTS_MAX_LIMIT = 500
+
+def encode_feed_cursor(shared_at, extract_id):
+    """Readable (shared_at, id) position in a room's feed, e.g. 2025-05-01T10:00:00.123456Z,42"""
+    return f"{shared_at.isoformat().replace('+00:00', 'Z')},{extract_id}"
+
+def decode_feed_cursor(cursor):
+    # a '+' in an unencoded query string arrives as a space
+    shared_at, extract_id = cursor.replace(' ', '+').rsplit(',', 1)
+    parsed = parse_datetime(shared_at)
+    if parsed is None:
+        raise ValueError('bad cursor')
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed, int(extract_id)
+
+def serialize_shared_extract(row):
+    return {
+        'id': row['id'],
+        'title': row['content_title'],
+        'authors': row['content_authors'],
+        'doi': row['content_doi'],
+        'link': row['content_link'],
+        'pdf_link': row['content_pdf_link'],
+        'publication_link': row['content_link'],  # Use link as fallback
+        'extract': row['content_extract'],
+        'page_number': row['content_page_number'],
+        'shared_by': row['shared_by__username'],
+        'shared_at': row['shared_at'].isoformat()
+    }
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@replica_reads
 def get_room_extracts(request, room_id):
-    """Get all shared extracts for a specific room"""
+    """
+    Shared extracts for a room, oldest first.
+    
+    With no parameters every extract is returned. Polling clients pass
+    ?since=<shared_at,id> (the `latest` value of their previous response) to get
+    only extracts shared after it. ?limit=N returns the newest N, and
+    ?before=<shared_at,id> pages back through older history.
+    """
     try:
         # Get the room
-        room = Room.objects.get(room_id=room_id)
+        room = Room.objects.only('id').get(room_id=room_id)
         
-        # Get all shared extracts for this room
-        shared_extracts = SharedExtract.objects.filter(room=room).order_by('shared_at')
-        
-        # Format response
-        extracts_data = []
-        for extract in shared_extracts:
-            extracts_data.append({
-                'id': extract.id,
-                'title': extract.title,
-                'authors': extract.authors,
-                'doi': extract.doi,
-                'link': extract.link,
-                'pdf_link': extract.pdf_link,
-                'publication_link': extract.link,  # Use link as fallback
-                'extract': extract.extract,
-                'page_number': extract.page_number,
-                'shared_by': extract.shared_by.username,
-                'shared_at': extract.shared_at.isoformat()
-            })
+        since = request.GET.get('since')
+        before = request.GET.get('before')
+        try:
+            limit = request.GET.get('limit')
+            limit = min(max(int(limit), 1), ROOM_EXTRACTS_MAX_LIMIT) if limit else None
+            since = decode_feed_cursor(since) if since else None
+            before = decode_feed_cursor(before) if before else None
+        except ValueError:
+            return Response(
+                {'error': 'since and before must be <shared_at>,<id> cursors and limit an integer'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        #print(f"Room {room_id}: Found {len(extracts_data)} extracts")
-        #if extracts_data:
-        #    print(f"Sample extract PDF link: {extracts_data[0].get('pdf_link')}")
-        #    print(f"Sample extract publication link: {extracts_data[0].get('publication_link')}")
+        shared_extracts = SharedExtract.objects.filter(room=room).with_content().values(*SHARED_EXTRACT_VALUES)
+        
+        has_more = False
+        if since is not None:
+            # new items only, oldest first, capped so a client that fell far behind catches up in pages
+            limit = limit or ROOM_EXTRACTS_MAX_LIMIT
+            shared_at, extract_id = since
+            rows = list(
+                shared_extracts.filter(
+                    Q(shared_at__gt=shared_at) | Q(shared_at=shared_at, id__gt=extract_id)
+                ).order_by('shared_at', 'id')[:limit + 1]
+            )
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+        elif before is not None or limit is not None:
+            # history, read newest first from the cursor and returned in feed order
+            limit = limit or ROOM_EXTRACTS_MAX_LIMIT
+            if before is not None:
+                shared_at, extract_id = before
+                shared_extracts = shared_extracts.filter(
+                    Q(shared_at__lt=shared_at) | Q(shared_at=shared_at, id__lt=extract_id)
+                )
+            rows = list(shared_extracts.order_by('-shared_at', '-id')[:limit + 1])
+            has_more = len(rows) > limit
+            rows = rows[:limit][::-1]
+        else:
+            rows = list(shared_extracts.order_by('shared_at', 'id'))
         
-        return Response({
+        response = {
             'room_id': room_id,
-            'extracts': extracts_data
-        })
+            'extracts': [serialize_shared_extract(row) for row in rows]
+        }
+        # where to poll from next; history pages don't move it
+        if before is None:
+            response['latest'] = (
+                encode_feed_cursor(rows[-1]['shared_at'], rows[-1]['id']) if rows else request.GET.get('since')
+            )
+        if since is not None:
+            response['has_more'] = has_more
+        elif before is not None or limit is not None:
+            response['has_more'] = has_more
+            response['before'] = encode_feed_cursor(rows[0]['shared_at'], rows[0]['id']) if has_more else None
+        
+        return Response(response)
         
     except Room.DoesNotExist:
         return Response(
@@ -998,6 +1039,89 @@ def get_room_extracts(request, room_id):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def participant_heartbeat(request, room_id):
+    """
+    Called every few seconds by clients in a room. Buffered in memory and
+    written to Participant.last_active in batches, see livestream.presence.
+    """
+    info = room_info(room_id)
+    if info is None:
+        return Response({'error': 'Room not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    user = request.user
+    if user.is_authenticated:
+        heartbeat(info[0], user.id)
+    else:
+        # anonymous viewers prove who they are with the LiveKit token they were given
+        identity = anonymous_identity(str(request.data.get('token', '')), room_id)
+        if identity is None:
+            return Response({'error': 'A valid viewer token is required'}, status=status.HTTP_401_UNAUTHORIZED)
+        anonymous_heartbeat(identity)
+    return Response(status=status.HTTP_204_NO_CONTENT)
+
+def serialize_archive_summary(archive):
+    return {
+        'id': archive.id,
+        'room_id': archive.room_key,
+        'name': archive.name,
+        'started_at': archive.started_at.isoformat(),
+        'finished_at': archive.finished_at.isoformat(),
+        'participant_count': archive.participant_count,
+        'extract_count': archive.extract_count,
+    }
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def room_archives(request):
+    """Archived sessions of rooms the user hosted, newest first"""
+    archives = RoomArchive.objects.filter(host=request.user).defer('data')[:100]
+    return Response({'archives': [serialize_archive_summary(archive) for archive in archives]})
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def room_archive(request, room_id):
+    """
+    Full history of a finished session of a room, for its host and anyone who
+    attended. The latest session unless ?archive=<id> picks another.
+    """
+    archives = RoomArchive.objects.filter(room_key=room_id)
+    archive_id = request.query_params.get('archive')
+    if archive_id:
+        if not archive_id.isdigit():
+            return Response({'error': 'archive must be an archive id'}, status=status.HTTP_400_BAD_REQUEST)
+        archives = archives.filter(id=archive_id)
+    archive = archives.order_by('-finished_at').first()
+    if archive is None:
+        return Response({'error': 'No archive for this room'}, status=status.HTTP_404_NOT_FOUND)
+    
+    data = load_archive(archive)
+    attended = any(interval[0] == request.user.id for interval in data['attendance'])
+    if archive.host_id != request.user.id and not attended and not request.user.is_staff:
+        return Response({'error': 'Only the host and attendees can view this archive'}, status=status.HTTP_403_FORBIDDEN)
+    
+    users = data['users']
+    return Response(dict(
+        serialize_archive_summary(archive),
+        attendance=[
+            {'user_id': user_id, 'username': users.get(str(user_id)), 'role': role, 'joined': start, 'left': end}
+            for user_id, role, start, end in data['attendance']
+        ],
+        role_changes=[
+            {'at': at, 'user_id': user_id, 'username': users.get(str(user_id)), 'role': role}
+            for at, user_id, role in data['roles']
+        ],
+        extracts=[
+            {
+                'at': at, 'id': extract_id, 'shared_by': users.get(str(shared_by)), 'title': title,
+                'authors': authors, 'doi': doi, 'link': link, 'pdf_link': pdf_link,
+                'page_number': page_number, 'extract': extract
+            }
+            for at, extract_id, shared_by, title, authors, doi, link, pdf_link, page_number, extract in data['extracts']
+        ],
+    ))
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def update_participant_role(request, room_id, participant_id):
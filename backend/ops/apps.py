@@ -0,0 +1,9 @@
+# backend/ops/apps.py
+
+from django.apps import AppConfig
+
+
+class OpsConfig(AppConfig):
+    """Deployment tooling: benchmarks of the server and database setup, and the table of the shared cache"""
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'ops'
@@ -0,0 +1,62 @@
+# backend/ops/management/commands/bench_server.py
+
+import importlib.util
+from django.core.management.base import BaseCommand
+from papers.fixture_server import FixtureServer, FixtureStore
+from ops.server_benchmark import run_server_benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare gunicorn worker classes while searches wait on a slow SerpAPI, "
+        "by the latency of quick requests served alongside them"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2, help='Workers in every configuration')
+        parser.add_argument('--threads', type=int, default=4, help='Threads per gthread worker')
+        parser.add_argument('--search-clients', type=int, default=8, help='Clients sending uncached searches')
+        parser.add_argument('--poll-clients', type=int, default=8, help='Clients polling the room list')
+        parser.add_argument('--duration', type=float, default=15, help='Seconds of load per configuration')
+        parser.add_argument('--serpapi-latency', type=float, default=1.0, help='Seconds every SerpAPI call takes')
+
+    def handle(self, *args, **options):
+        workers, threads = str(options['workers']), str(options['threads'])
+        configs = [
+            ('sync', {'GUNICORN_WORKER_CLASS': 'sync', 'GUNICORN_WORKERS': workers}),
+            ('gthread', {'GUNICORN_WORKER_CLASS': 'gthread', 'GUNICORN_WORKERS': workers, 'GUNICORN_THREADS': threads}),
+        ]
+        if importlib.util.find_spec('uvicorn_worker'):
+            configs.append(('uvicorn', {'GUNICORN_WORKER_CLASS': 'uvicorn', 'GUNICORN_WORKERS': workers}))
+        else:
+            self.stdout.write("uvicorn skipped, uvicorn-worker is not installed")
+        # what the server runs with when nothing is set
+        configs.append(('gthread, defaults', {}))
+
+        # nothing recorded, every search gets a synthetic answer after the latency
+        server = FixtureServer(FixtureStore('/nonexistent'), latency={'serpapi': options['serpapi_latency']}).start()
+        try:
+            results = run_server_benchmark(
+                server, configs,
+                search_clients=options['search_clients'],
+                poll_clients=options['poll_clients'],
+                duration=options['duration'],
+            )
+        finally:
+            server.stop()
+
+        self.stdout.write(
+            f"{options['search_clients']} search clients (SerpAPI {options['serpapi_latency']}s), "
+            f"{options['poll_clients']} room list clients, {options['duration']:.0f}s each"
+        )
+        for name, summary in results:
+            if 'error' in summary:
+                self.stdout.write(self.style.ERROR(f"{name}: {summary['error']}"))
+                continue
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            for kind in ('search', 'poll'):
+                s = summary[kind]
+                self.stdout.write(
+                    f"  {kind:<7} {s['requests']:>6} requests {s['rate']:>7.1f}/s  {s['errors']:>4} errors  "
+                    f"p50 {s['p50']:7.1f} ms  p95 {s['p95']:7.1f} ms  p99 {s['p99']:7.1f} ms"
+                )
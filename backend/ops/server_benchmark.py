@@ -0,0 +1,203 @@
+# backend/ops/server_benchmark.py
+
+"""
+Compare gunicorn worker configurations under slow upstream calls.
+
+Each configuration gets its own gunicorn, started from gunicorn.conf.py with
+GUNICORN_* variables, on the configured database. Two kinds of clients run
+against it at the same time for a fixed duration:
+
+- search clients send unique searches, so every one waits on SerpAPI
+  (papers.fixture_server, with latency) the way a real cache miss does
+- poll clients fetch the room list, a quick DB-only request
+
+The poll latency shows whether slow searches starve everything else.
+
+Searches get a fresh session user. CrossRef is pointed at a route that
+answers 404 so no Paper rows are created, and the SerpAPI quota row is put
+back as it was afterwards. Run it against PostgreSQL: SQLite allows one
+writer at a time and concurrent searches fail with "database is locked".
+
+1 CPU, PostgreSQL 16, 8 search clients (SerpAPI 1s), 8 room list clients,
+2 workers unless noted:
+
+    config                     searches/s  room list/s  room list p50  p95
+    sync                              1.8          1.7        3961 ms  4469 ms
+    gthread, 4 threads                6.9         22.9         250 ms   740 ms
+    uvicorn                           4.7         43.8         174 ms   285 ms
+    gthread, defaults (3 x 4)         3.4        108.6          57 ms   120 ms
+"""
+
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+import numpy as np
+import requests
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY, get_user_model
+from django.contrib.sessions.backends.db import SessionStore
+from django.forms.models import model_to_dict
+from papers.models import ApiQuota
+from papers.views import SERPAPI_QUOTA
+
+User = get_user_model()
+
+SEARCH_PATH = '/api/papers/search/'
+POLL_PATH = '/api/livestream/rooms/'
+
+
+class ServerError(Exception):
+    pass
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_gunicorn(env, log_path, startup_timeout=30):
+    """Start gunicorn in the backend directory, return (process, base url) once it answers"""
+    port = free_port()
+    log = open(log_path, 'w')
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', f'--bind=127.0.0.1:{port}'],
+        cwd=settings.BASE_DIR, env=env, stdout=log, stderr=subprocess.STDOUT,
+    )
+    log.close()
+    url = f'http://127.0.0.1:{port}'
+    deadline = time.monotonic() + startup_timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            break
+        try:
+            if requests.get(f'{url}/health/live/', timeout=1).status_code == 200:
+                return process, url
+        except requests.RequestException:
+            time.sleep(0.2)
+    stop_gunicorn(process)
+    with open(log_path) as f:
+        raise ServerError(f"gunicorn did not start:\n{''.join(f.readlines()[-20:])}")
+
+
+def stop_gunicorn(process):
+    if process.poll() is None:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+def bench_session(user):
+    session = SessionStore()
+    session[SESSION_KEY] = str(user.pk)
+    session[BACKEND_SESSION_KEY] = 'django.contrib.auth.backends.ModelBackend'
+    session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+    session.create()
+    return session.session_key
+
+
+def client_loop(url, next_path, cookies, deadline, results):
+    http = requests.Session()
+    http.cookies.update(cookies)
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        try:
+            ok = http.get(url + next_path(), timeout=120).status_code == 200
+        except requests.RequestException:
+            ok = False
+        results.append((time.perf_counter() - started, ok))
+
+
+def summarize(results, duration):
+    latencies = np.array([seconds for seconds, ok in results]) if results else np.zeros(1)
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+    return {
+        'requests': len(results),
+        'errors': sum(1 for _, ok in results if not ok),
+        'rate': len(results) / duration,
+        'p50': p50,
+        'p95': p95,
+        'p99': p99,
+    }
+
+
+def run_load(url, session_key, search_clients, poll_clients, duration):
+    cookies = {settings.SESSION_COOKIE_NAME: session_key}
+    deadline = time.monotonic() + duration
+    searches, polls = [], []
+
+    def search_path():
+        return f'{SEARCH_PATH}?query=bench+server+{uuid.uuid4().hex}'
+
+    threads = [
+        threading.Thread(target=client_loop, args=(url, search_path, cookies, deadline, searches))
+        for _ in range(search_clients)
+    ] + [
+        threading.Thread(target=client_loop, args=(url, lambda: POLL_PATH, cookies, deadline, polls))
+        for _ in range(poll_clients)
+    ]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+    return {'search': summarize(searches, elapsed), 'poll': summarize(polls, elapsed)}
+
+
+def run_server_benchmark(fixture_server, configs, search_clients=8, poll_clients=8, duration=15):
+    """
+    Run the load against one gunicorn per config, a (name, GUNICORN_* overrides)
+    pair. Returns [(name, summary)] with summary as from run_load, or an error.
+    """
+    env = {
+        **os.environ,
+        'SERPAPI_URL': f'{fixture_server.url}/serpapi',
+        # no DOIs found, so searches don't create Paper rows
+        'CROSSREF_API_URL': f'{fixture_server.url}/none',
+        'UNPAYWALL_API_URL': f'{fixture_server.url}/unpaywall',
+        'SERPAPI_KEY': 'bench',
+        'SERPAPI_MONTHLY_QUOTA': str(10**9),
+        'SERPAPI_BURST': str(10**6),
+        'SERPAPI_RATE_PER_MINUTE': str(10**9),
+        'SERVER_TIMING_HEADER': 'False',
+    }
+    quota = ApiQuota.objects.filter(name=SERPAPI_QUOTA).first()
+    saved_quota = model_to_dict(quota, exclude=['id']) if quota else None
+    tag = uuid.uuid4().hex[:8]
+    user = User.objects.create(username=f'bench-server-{tag}', email=f'bench-server-{tag}@bench.local')
+    session_key = bench_session(user)
+
+    results = []
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            for name, overrides in configs:
+                # its own metrics directory, gunicorn.conf.py empties it on start
+                metrics_dir = os.path.join(directory, f'metrics-{len(results)}')
+                config_env = {**env, **overrides, 'PROMETHEUS_MULTIPROC_DIR': metrics_dir}
+                try:
+                    process, url = start_gunicorn(config_env, os.path.join(directory, f'gunicorn-{len(results)}.log'))
+                except ServerError as e:
+                    results.append((name, {'error': str(e)}))
+                    continue
+                try:
+                    results.append((name, run_load(url, session_key, search_clients, poll_clients, duration)))
+                finally:
+                    stop_gunicorn(process)
+    finally:
+        SessionStore(session_key).delete()
+        user.delete()
+        if saved_quota is None:
+            ApiQuota.objects.filter(name=SERPAPI_QUOTA).delete()
+        else:
+            ApiQuota.objects.filter(name=SERPAPI_QUOTA).update(**saved_quota)
+    return results
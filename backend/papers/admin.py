@@ -1,16 +1,17 @@
 # backend/papers/admin.py
 
 from django.contrib import admin
-from .models import PaperExtract
+from .models import Paper, PaperExtract, ApiQuota
 
 class PaperExtractAdmin(admin.ModelAdmin):
     list_display = ('title', 'user', 'doi', 'page_number', 'created_at')
     list_filter = ('created_at', 'user')
     search_fields = ('title', 'extract', 'doi', 'user__username', 'user__email')
     readonly_fields = ('created_at', 'updated_at')
+    raw_id_fields = ('paper',)
     fieldsets = (
         (None, {
-            'fields': ('user', 'title', 'authors', 'publication_info')
+            'fields': ('user', 'paper', 'title', 'authors', 'publication_info')
         }),
         ('Links', {
             'fields': ('doi', 'link', 'pdf_link', 'publication_link')
@@ -25,7 +26,20 @@ class PaperExtractAdmin(admin.ModelAdmin):
     
     def get_queryset(self, request):
         queryset = super().get_queryset(request)
-        queryset = queryset.select_related('user')
+        queryset = queryset.select_related('user', 'paper')
         return queryset
 
 admin.site.register(PaperExtract, PaperExtractAdmin)
+
+@admin.register(Paper)
+class PaperAdmin(admin.ModelAdmin):
+    list_display = ('doi', 'title', 'journal', 'year', 'is_oa', 'unpaywall_checked_at')
+    list_filter = ('is_oa', 'oa_status', 'year')
+    search_fields = ('doi', 'title', 'authors', 'journal')
+    readonly_fields = ('created_at', 'updated_at', 'crossref_checked_at', 'unpaywall_checked_at')
+
+
+@admin.register(ApiQuota)
+class ApiQuotaAdmin(admin.ModelAdmin):
+    list_display = ('name', 'tokens', 'period_start', 'period_used', 'period_rejected', 'updated_at')
+    readonly_fields = ('refilled_at', 'updated_at')
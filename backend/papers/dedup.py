@@ -0,0 +1,156 @@
+# backend/papers/dedup.py
+
+"""
+Near-duplicate detection for extract text with MinHash and LSH.
+
+Each extract gets a NUM_PERM value MinHash signature of its word shingles,
+stored on PaperExtract.minhash. The signature is cut into BANDS bands and each
+band is hashed into an ExtractLSHBucket row, so finding candidates for a new
+extract is one indexed lookup of BANDS (band, bucket) pairs no matter how big
+the table is. Candidates are confirmed by comparing signatures.
+"""
+
+import hashlib
+import re
+import zlib
+import numpy as np
+from django.conf import settings
+from django.db.models import Q
+from papers.models import ExtractLSHBucket, PaperExtract
+
+NUM_PERM = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+
+# fixed seed so signatures stay comparable across processes and deploys
+_rng = np.random.default_rng(20250501)
+_A = _rng.integers(1, 2**63, size=NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_B = _rng.integers(0, 2**63, size=NUM_PERM, dtype=np.uint64)
+
+
+def shingles(text):
+    """Hashes of overlapping SHINGLE_SIZE word windows"""
+    words = re.findall(r'\w+', (text or '').lower())
+    if len(words) < SHINGLE_SIZE:
+        windows = [' '.join(words)] if words else []
+    else:
+        windows = [' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)]
+    return np.fromiter((zlib.crc32(window.encode()) for window in set(windows)), dtype=np.uint64)
+
+
+def signature(text):
+    """MinHash signature as a uint32 array, None for empty text"""
+    hashes = shingles(text)
+    if hashes.size == 0:
+        return None
+    # multiply-shift hashing for every (shingle, permutation) pair at once, uint64 overflow is intended
+    with np.errstate(over='ignore'):
+        permuted = (hashes[:, None] * _A[None, :] + _B[None, :]) >> np.uint64(32)
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def signature_to_bytes(sig):
+    return sig.astype('<u4').tobytes()
+
+
+def signature_from_bytes(data):
+    return np.frombuffer(bytes(data), dtype='<u4')
+
+
+def band_buckets(sig):
+    """One signed 64 bit bucket id per band"""
+    buckets = []
+    for band in range(BANDS):
+        chunk = sig[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        digest = hashlib.blake2b(chunk.astype('<u4').tobytes(), digest_size=8).digest()
+        buckets.append(int.from_bytes(digest, 'little', signed=True))
+    return buckets
+
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of two signatures"""
+    return float(np.mean(sig_a == sig_b))
+
+
+def index_extracts(extracts):
+    """
+    Compute and store signatures and LSH buckets for saved extracts.
+    Replaces any buckets the extracts already had.
+    """
+    signed = []
+    buckets = []
+    for extract in extracts:
+        sig = signature(extract.extract)
+        # empty bytes mark text too short to sign, so batch jobs don't retry it
+        extract.minhash = signature_to_bytes(sig) if sig is not None else b''
+        signed.append(extract)
+        if sig is not None:
+            buckets.extend(
+                ExtractLSHBucket(extract_id=extract.id, band=band, bucket=bucket)
+                for band, bucket in enumerate(band_buckets(sig))
+            )
+
+    if signed:
+        PaperExtract.objects.bulk_update(signed, ['minhash'], batch_size=500)
+        ExtractLSHBucket.objects.filter(extract_id__in=[extract.id for extract in signed]).delete()
+        ExtractLSHBucket.objects.bulk_create(buckets, batch_size=1000)
+
+
+def find_near_duplicates(extract, threshold=None, same_user=True):
+    """Ids of extracts whose text is at least `threshold` similar to this one"""
+    if threshold is None:
+        threshold = settings.NEAR_DUPLICATE_THRESHOLD
+    if not extract.minhash:
+        return []
+    sig = signature_from_bytes(extract.minhash)
+
+    match = Q()
+    for band, bucket in enumerate(band_buckets(sig)):
+        match |= Q(band=band, bucket=bucket)
+    candidates = ExtractLSHBucket.objects.filter(match).exclude(extract_id=extract.id)
+    if same_user:
+        candidates = candidates.filter(extract__user_id=extract.user_id)
+
+    candidate_ids = set(candidates.values_list('extract_id', flat=True))
+    if not candidate_ids:
+        return []
+
+    duplicates = []
+    for candidate_id, minhash in PaperExtract.objects.filter(id__in=candidate_ids).values_list('id', 'minhash'):
+        if minhash and similarity(sig, signature_from_bytes(minhash)) >= threshold:
+            duplicates.append(candidate_id)
+    return sorted(duplicates)
+
+
+def cluster_signatures(ids, signatures, threshold):
+    """
+    Group extracts whose signatures are at least `threshold` similar.
+    ids is a list of extract ids and signatures the matching (n, NUM_PERM) array,
+    all of which already share an LSH bucket. Returns a list of id lists.
+    """
+    n = len(ids)
+    parent = list(range(n))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    # compare in blocks so a huge bucket doesn't build an n*n*NUM_PERM array at once
+    block = 256
+    for start in range(0, n, block):
+        rows = signatures[start:start + block]
+        similar = (rows[:, None, :] == signatures[None, :, :]).mean(axis=2) >= threshold
+        for offset, j in zip(*np.nonzero(similar)):
+            i = start + offset
+            if i < j:
+                root_i, root_j = find(i), find(j)
+                if root_i != root_j:
+                    parent[root_j] = root_i
+
+    clusters = {}
+    for i in range(n):
+        clusters.setdefault(find(i), []).append(ids[i])
+    return [members for members in clusters.values() if len(members) > 1]
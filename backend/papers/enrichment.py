@@ -0,0 +1,205 @@
+# backend/papers/enrichment.py
+
+"""
+CrossRef and Unpaywall enrichment backed by the Paper table.
+
+Every lookup reads the local Paper row first and only calls the external APIs
+when the DOI is unknown or the stored data is older than PAPER_REFRESH_DAYS.
+"""
+
+import threading
+import time
+from datetime import timedelta
+import requests
+from django.conf import settings
+from django.db import IntegrityError
+from django.utils import timezone
+from django_backend.instrumentation import external_call
+from papers.models import Paper
+
+DOI_PREFIXES = ('https://doi.org/', 'http://doi.org/', 'https://dx.doi.org/', 'http://dx.doi.org/', 'doi:')
+
+
+def normalize_doi(doi):
+    """Lowercase a DOI and strip any resolver prefix, returns None for blank values"""
+    if not doi:
+        return None
+    doi = doi.strip().lower()
+    for prefix in DOI_PREFIXES:
+        if doi.startswith(prefix):
+            doi = doi[len(prefix):]
+    return doi or None
+
+
+class RateLimiter:
+    """Spaces calls out to at most `rate` per second, shared by all threads using it"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate > 0 else 0
+        self.next_slot = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def stale_before():
+    """Rows enriched before this time should be refreshed"""
+    return timezone.now() - timedelta(days=settings.PAPER_REFRESH_DAYS)
+
+
+def is_stale(paper):
+    return paper.unpaywall_checked_at is None or paper.unpaywall_checked_at < stale_before()
+
+
+def get_or_create_paper(doi, title='', authors=''):
+    """Return the Paper for a DOI, creating it from what the caller knows if needed"""
+    doi = normalize_doi(doi)
+    if not doi:
+        return None
+
+    try:
+        paper, created = Paper.objects.get_or_create(
+            doi=doi,
+            defaults={'title': title[:500], 'authors': authors[:500]}
+        )
+    except IntegrityError:
+        # another request created it first
+        paper = Paper.objects.get(doi=doi)
+
+    # fill in blanks on rows created from partial data
+    if not paper.title and title:
+        paper.title = title[:500]
+        paper.authors = paper.authors or authors[:500]
+        paper.save(update_fields=['title', 'authors', 'updated_at'])
+    return paper
+
+
+def get_or_create_papers(entries):
+    """
+    Bulk get_or_create_paper. entries maps DOI -> (title, authors).
+    Returns {normalized_doi: Paper}, creating missing rows with a single insert.
+    """
+    wanted = {}
+    for doi, (title, authors) in entries.items():
+        doi = normalize_doi(doi)
+        if doi:
+            wanted.setdefault(doi, (title or '', authors or ''))
+    if not wanted:
+        return {}
+
+    papers = Paper.objects.in_bulk(wanted.keys(), field_name='doi')
+    missing = [
+        Paper(doi=doi, title=title[:500], authors=authors[:500])
+        for doi, (title, authors) in wanted.items() if doi not in papers
+    ]
+    if missing:
+        Paper.objects.bulk_create(missing, ignore_conflicts=True)
+        papers = Paper.objects.in_bulk(wanted.keys(), field_name='doi')
+    return papers
+
+
+def fetch_crossref_doi(title, session=None):
+    """Look up the DOI of the best CrossRef match for a title"""
+    http = session or requests
+    crossref_url = f"{settings.CROSSREF_API_URL}/works?query.title={requests.utils.quote(title)}&rows=1"
+    with external_call('crossref'):
+        crossref_response = http.get(crossref_url, timeout=10)
+
+    if crossref_response.status_code == 200:
+        data = crossref_response.json()
+        if data['message']['items'] and len(data['message']['items']) > 0:
+            return data['message']['items'][0].get('DOI')
+    return None
+
+
+def fetch_unpaywall(doi, session=None):
+    """Fetch the raw Unpaywall record for a DOI, None if it isn't known"""
+    http = session or requests
+    unpaywall_url = f"{settings.UNPAYWALL_API_URL}/v2/{doi}?email={settings.UNPAYWALL_EMAIL}"
+    with external_call('unpaywall'):
+        unpaywall_response = http.get(unpaywall_url, timeout=10)
+
+    if unpaywall_response.status_code == 200:
+        return unpaywall_response.json()
+    return None
+
+
+def apply_unpaywall(paper, unpaywall_data):
+    """Copy an Unpaywall record onto a Paper (without saving it)"""
+    paper.is_oa = bool(unpaywall_data.get('is_oa', False))
+    paper.oa_status = unpaywall_data.get('oa_status') or ''
+    paper.journal = (unpaywall_data.get('journal_name') or paper.journal)[:500]
+    paper.publisher = (unpaywall_data.get('publisher') or paper.publisher)[:500]
+    paper.year = unpaywall_data.get('year') or paper.year
+    if not paper.title and unpaywall_data.get('title'):
+        paper.title = unpaywall_data['title'][:500]
+
+    # try to get full text links
+    best_location = unpaywall_data.get('best_oa_location') or {}
+    paper.oa_url = best_location.get('url') or ''
+    paper.pdf_url = best_location.get('url_for_pdf') or ''
+    paper.unpaywall_checked_at = timezone.now()
+
+
+def unpaywall_info(paper):
+    """The unpaywall block returned to the frontend with search results"""
+    return {
+        'is_oa': paper.is_oa,
+        'oa_status': paper.oa_status or None,
+        'oa_url': paper.oa_url or None,
+        'pdf_url': paper.pdf_url or None,
+        'journal': paper.journal or None,
+        'year': paper.year,
+        'publisher': paper.publisher or None
+    }
+
+
+def enrich_paper(paper, session=None):
+    """Refresh a Paper from Unpaywall and save it, returns False if the lookup failed"""
+    unpaywall_data = fetch_unpaywall(paper.doi, session=session)
+    if unpaywall_data is None:
+        # remember the attempt so we don't retry on every request
+        paper.unpaywall_checked_at = timezone.now()
+        paper.save(update_fields=['unpaywall_checked_at', 'updated_at'])
+        return False
+
+    apply_unpaywall(paper, unpaywall_data)
+    paper.save()
+    return True
+
+
+def refresh_stale_papers(batch_size=100, limit=None, session=None):
+    """
+    Re-enrich papers whose Unpaywall data is missing or older than PAPER_REFRESH_DAYS,
+    oldest first, one batch at a time. Returns (checked, refreshed).
+    """
+    checked = refreshed = 0
+    cutoff = stale_before()
+
+    while limit is None or checked < limit:
+        size = batch_size if limit is None else min(batch_size, limit - checked)
+        batch = list(
+            Paper.objects.filter(unpaywall_checked_at__isnull=True).order_by('id')[:size]
+        ) or list(
+            Paper.objects.filter(unpaywall_checked_at__lt=cutoff).order_by('unpaywall_checked_at')[:size]
+        )
+        if not batch:
+            break
+
+        for paper in batch:
+            checked += 1
+            try:
+                if enrich_paper(paper, session=session):
+                    refreshed += 1
+            except Exception as e:
+                print(f"Error refreshing paper {paper.doi}: {e}")
+                paper.unpaywall_checked_at = timezone.now()
+                paper.save(update_fields=['unpaywall_checked_at', 'updated_at'])
+
+    return checked, refreshed
@@ -0,0 +1,109 @@
+# backend/papers/exporters.py
+
+"""
+Generators that serialize extract rows for streaming responses.
+
+Each generator takes an iterator of dicts (from .values().iterator()) and yields
+text, so a StreamingHttpResponse can start sending before the query finishes
+and memory use doesn't grow with the size of the library.
+"""
+
+import csv
+import json
+import re
+from rest_framework.utils.encoders import JSONEncoder
+
+EXTRACT_FIELDS = (
+    'id', 'title', 'authors', 'publication_info', 'doi', 'link', 'pdf_link',
+    'publication_link', 'extract', 'page_number', 'additional_info', 'created_at'
+)
+
+# content type and file extension for each export format
+EXPORT_FORMATS = {
+    'bibtex': ('application/x-bibtex; charset=utf-8', 'bib'),
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+
+YEAR = re.compile(r'\b(1[5-9]\d\d|20\d\d)\b')
+
+
+def buffered(chunks, size=65536):
+    """Group small writes into ~size character blocks, flushing the first one straight away"""
+    buffer = []
+    length = 0
+    first = True
+    for chunk in chunks:
+        buffer.append(chunk)
+        length += len(chunk)
+        if first or length >= size:
+            yield ''.join(buffer)
+            buffer = []
+            length = 0
+            first = False
+    if buffer:
+        yield ''.join(buffer)
+
+
+def stream_ndjson(rows):
+    for row in rows:
+        yield json.dumps(row, cls=JSONEncoder) + '\n'
+
+
+class _Echo:
+    """File-like object whose write() just returns the line, for csv.writer"""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(rows, fields=EXTRACT_FIELDS):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow([
+            row['created_at'].isoformat() if field == 'created_at' and row.get(field) else row.get(field)
+            for field in fields
+        ])
+
+
+def _bibtex_escape(value):
+    return (value or '').replace('\\', '\\\\').replace('{', '\\{').replace('}', '\\}')
+
+
+def _bibtex_key(row, year):
+    first_author = (row.get('authors') or '').split(',')[0].split()
+    surname = re.sub(r'\W', '', first_author[-1]) if first_author else 'extract'
+    return f"{surname.lower() or 'extract'}{year or ''}_{row['id']}"
+
+
+def stream_bibtex(rows):
+    yield '% Exported from the Discussion Platform\n\n'
+    for row in rows:
+        year = row.get('paper__year') or ''
+        if not year:
+            match = YEAR.search(row.get('publication_info') or '')
+            year = match.group(1) if match else ''
+
+        fields = [
+            ('title', row.get('title')),
+            ('author', ' and '.join(name.strip() for name in (row.get('authors') or '').split(',') if name.strip())),
+            ('year', str(year)),
+            ('journal', row.get('paper__journal')),
+            ('doi', row.get('doi')),
+            ('url', row.get('link') or row.get('publication_link')),
+            ('file', row.get('pdf_link')),
+            ('pages', row.get('page_number')),
+            ('abstract', row.get('extract')),
+            ('note', row.get('additional_info')),
+        ]
+        body = ',\n'.join(f'  {name} = {{{_bibtex_escape(value)}}}' for name, value in fields if value)
+        yield f"@article{{{_bibtex_key(row, year)},\n{body}\n}}\n\n"
+
+
+def stream_export(rows, export_format):
+    if export_format == 'bibtex':
+        return buffered(stream_bibtex(rows))
+    if export_format == 'csv':
+        return buffered(stream_csv(rows))
+    return buffered(stream_ndjson(rows))
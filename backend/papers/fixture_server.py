@@ -0,0 +1,280 @@
+# backend/papers/fixture_server.py
+
+"""
+Local HTTP server that stands in for SerpAPI, CrossRef and Unpaywall.
+
+Responses come from a fixture directory holding one JSON file per service,
+each mapping a request key to the recorded status and body:
+
+    serpapi.json    normalized query -> response
+    crossref.json   title            -> response
+    unpaywall.json  doi              -> response
+
+    {"<key>": {"status": 200, "body": {...}}, ...}
+
+With record=True a key that is not in the fixtures is fetched from the real
+API once and saved, which spends real quota, so record a set once and replay
+it after that. Otherwise an unrecorded key gets a synthetic response of the
+same shape, derived from a hash of the key so every run sees the same data.
+Synthetic search results draw their titles from a shared pool, so separate
+queries overlap the way real ones do and the DOI and Paper caches get hits.
+
+Every response can be delayed by a per-service latency (with jitter), and
+replaced by an injected error at error_rate. Calls, replays, synthetic
+answers and errors are counted per service.
+
+Routes, each a prefix to put in the matching *_URL setting:
+
+    /serpapi/search?q=...
+    /crossref/works?query.title=...
+    /unpaywall/v2/<doi>
+"""
+
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+import requests
+from django.conf import settings
+
+SERVICES = ('serpapi', 'crossref', 'unpaywall')
+
+UPSTREAM = {
+    'serpapi': 'https://serpapi.com/search',
+    'crossref': 'https://api.crossref.org/works',
+    'unpaywall': 'https://api.unpaywall.org/v2/',
+}
+
+# titles synthetic search results are drawn from
+TITLE_POOL_SIZE = 400
+# share of synthetic titles CrossRef finds a DOI for, and of those DOIs Unpaywall knows
+CROSSREF_FOUND_SHARE = 0.8
+UNPAYWALL_FOUND_SHARE = 0.9
+
+TOPICS = ('neural', 'protein', 'climate', 'graph', 'quantum', 'language', 'market', 'soil', 'vaccine', 'sensor')
+SUBJECTS = ('models', 'networks', 'dynamics', 'inference', 'signals', 'structures', 'policies', 'systems')
+
+
+def _hash(*parts):
+    return int(hashlib.md5('|'.join(str(part) for part in parts).encode()).hexdigest(), 16)
+
+
+def normalize_query(query):
+    return ' '.join(query.lower().split())
+
+
+def pool_title(n):
+    return f"{TOPICS[n % len(TOPICS)].title()} {SUBJECTS[(n // len(TOPICS)) % len(SUBJECTS)]} at scale: study {n}"
+
+
+def synthetic_serpapi(query):
+    results = []
+    for position in range(20):
+        n = _hash('serpapi', query, position) % TITLE_POOL_SIZE
+        results.append({
+            'position': position,
+            'title': pool_title(n),
+            'result_id': f"bench{n}",
+            'link': f"https://example.org/papers/{n}",
+            'snippet': f"Synthetic result {n} for {query}.",
+            'publication_info': {'summary': f"A Author, B Author - Journal {n % 17}, {1995 + n % 30}"},
+            'inline_links': {'cited_by': {'total': n * 3}},
+        })
+    return 200, {
+        'search_metadata': {'status': 'Success', 'id': f"bench-{_hash(query) % 10**8}"},
+        'search_parameters': {'engine': 'google_scholar', 'q': query},
+        'organic_results': results,
+    }
+
+
+def synthetic_crossref(title):
+    found = _hash('crossref', title) % 100 < CROSSREF_FOUND_SHARE * 100
+    items = [{'DOI': f"10.5555/bench.{_hash(title) % 10**6}", 'title': [title]}] if found else []
+    return 200, {'status': 'ok', 'message-type': 'work-list', 'message': {'items': items}}
+
+
+def synthetic_unpaywall(doi):
+    n = _hash('unpaywall', doi)
+    if n % 100 >= UNPAYWALL_FOUND_SHARE * 100:
+        return 404, {'HTTP_status_code': 404, 'error': True, 'message': f"'{doi}' is not a valid doi"}
+    is_oa = n % 3 != 0
+    location = {
+        'url': f"https://example.org/oa/{n % 10**6}",
+        'url_for_pdf': f"https://example.org/oa/{n % 10**6}.pdf",
+    } if is_oa else None
+    return 200, {
+        'doi': doi,
+        'is_oa': is_oa,
+        'oa_status': ('gold', 'green', 'hybrid', 'bronze')[n % 4] if is_oa else 'closed',
+        'journal_name': f"Journal {n % 17}",
+        'publisher': f"Publisher {n % 5}",
+        'year': 1995 + n % 30,
+        'title': '',
+        'best_oa_location': location,
+    }
+
+
+SYNTHETIC = {'serpapi': synthetic_serpapi, 'crossref': synthetic_crossref, 'unpaywall': synthetic_unpaywall}
+
+
+class FixtureStore:
+    """Recorded responses per service, loaded from and saved to a directory"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.responses = {}
+        self.dirty = set()
+        self._lock = threading.Lock()
+        for service in SERVICES:
+            try:
+                with open(self._path(service)) as f:
+                    self.responses[service] = json.load(f)
+            except FileNotFoundError:
+                self.responses[service] = {}
+
+    def _path(self, service):
+        return os.path.join(self.directory, f'{service}.json')
+
+    def get(self, service, key):
+        return self.responses[service].get(key)
+
+    def put(self, service, key, status, body):
+        with self._lock:
+            self.responses[service][key] = {'status': status, 'body': body}
+            self.dirty.add(service)
+
+    def save(self):
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock:
+            for service in self.dirty:
+                with open(self._path(service), 'w') as f:
+                    json.dump(self.responses[service], f, indent=1, sort_keys=True)
+            self.dirty.clear()
+
+
+def record(service, key):
+    """Fetch key from the real upstream API, for record mode"""
+    if service == 'serpapi':
+        response = requests.get(UPSTREAM[service], params={
+            'engine': 'google_scholar', 'q': key, 'api_key': settings.SERPAPI_KEY, 'num': 20
+        }, timeout=30)
+    elif service == 'crossref':
+        response = requests.get(UPSTREAM[service], params={'query.title': key, 'rows': 1}, timeout=30)
+    else:
+        response = requests.get(UPSTREAM[service] + key, params={'email': settings.UNPAYWALL_EMAIL}, timeout=30)
+    try:
+        body = response.json()
+    except ValueError:
+        body = {'error': response.text[:500]}
+    # never keep the api key serpapi echoes back
+    if service == 'serpapi' and isinstance(body, dict):
+        body.get('search_parameters', {}).pop('api_key', None)
+    return response.status_code, body
+
+
+class FixtureServer:
+    """
+    Threaded fixture server on 127.0.0.1. latency maps service -> seconds,
+    error_rate is the share of calls answered with an injected 500 or 429.
+    """
+
+    def __init__(self, store, latency=None, jitter=0.25, error_rate=0.0, record=False, seed=0):
+        self.store = store
+        self.latency = latency or {}
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.record = record
+        self.random = random.Random(seed)
+        self.stats = {service: dict.fromkeys(('calls', 'replayed', 'synthetic', 'recorded', 'errors'), 0)
+                      for service in SERVICES}
+        self._lock = threading.Lock()
+        self._httpd = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._httpd.daemon_threads = True
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+        if self.record:
+            self.store.save()
+
+    def snapshot(self):
+        with self._lock:
+            return {service: dict(counts) for service, counts in self.stats.items()}
+
+    def _count(self, service, outcome):
+        with self._lock:
+            self.stats[service]['calls'] += 1
+            self.stats[service][outcome] += 1
+
+    def respond(self, service, key):
+        """(status, body) for one upstream call, after the injected latency"""
+        with self._lock:
+            delay = self.latency.get(service, 0.0)
+            if delay and self.jitter:
+                delay *= 1 + self.random.uniform(-self.jitter, self.jitter)
+            failed = self.random.random() < self.error_rate
+        if delay:
+            time.sleep(delay)
+
+        if failed:
+            self._count(service, 'errors')
+            return self.random.choice([(500, {'error': 'Injected upstream error'}),
+                                       (429, {'error': 'Injected rate limit'})])
+
+        recorded = self.store.get(service, key)
+        if recorded is not None:
+            self._count(service, 'replayed')
+            return recorded['status'], recorded['body']
+        if self.record:
+            status, body = record(service, key)
+            self.store.put(service, key, status, body)
+            self._count(service, 'recorded')
+            return status, body
+        self._count(service, 'synthetic')
+        return SYNTHETIC[service](key)
+
+    def _handler(self):
+        fixture_server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                params = parse_qs(parts.query)
+                if parts.path == '/serpapi/search':
+                    service, key = 'serpapi', normalize_query(params.get('q', [''])[0])
+                elif parts.path == '/crossref/works':
+                    service, key = 'crossref', params.get('query.title', [''])[0]
+                elif parts.path.startswith('/unpaywall/v2/'):
+                    service, key = 'unpaywall', unquote(parts.path[len('/unpaywall/v2/'):]).lower()
+                else:
+                    self._send(404, {'error': 'Unknown fixture route'})
+                    return
+                self._send(*fixture_server.respond(service, key))
+
+            def _send(self, status, body):
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,382 @@
+# backend/papers/importers.py
+
+"""
+Streaming import of reference libraries (BibTeX, RIS, CSL-JSON) into PaperExtract.
+
+Each parser reads its input incrementally and yields one normalized entry dict
+at a time, so memory is bounded by the size of a single reference rather than
+the whole library. import_entries() deduplicates by DOI and normalized title
+and writes in bulk batches.
+"""
+
+import json
+import re
+from papers.dedup import index_extracts
+from papers.enrichment import get_or_create_papers, normalize_doi
+from papers.models import PaperExtract
+
+FORMATS = ('bibtex', 'ris', 'csl-json')
+
+EXTENSIONS = {
+    '.bib': 'bibtex',
+    '.bibtex': 'bibtex',
+    '.ris': 'ris',
+    '.json': 'csl-json',
+}
+
+
+class ImportFormatError(Exception):
+    """Raised when the input can't be parsed as the requested format"""
+
+
+def guess_format(filename):
+    for extension, file_format in EXTENSIONS.items():
+        if filename.lower().endswith(extension):
+            return file_format
+    return None
+
+
+def normalize_title(title):
+    """Lowercase and strip punctuation so near-identical titles compare equal"""
+    return ' '.join(re.findall(r'\w+', (title or '').lower()))
+
+
+def parse(lines, file_format):
+    """Dispatch to the parser for file_format. lines is any iterable of text lines."""
+    if file_format == 'bibtex':
+        return parse_bibtex(lines)
+    if file_format == 'ris':
+        return parse_ris(lines)
+    if file_format == 'csl-json':
+        return parse_csl_json(lines)
+    raise ImportFormatError(f"Unsupported format '{file_format}', expected one of {', '.join(FORMATS)}")
+
+
+def make_entry(title='', authors=(), year='', journal='', doi='', url='', pdf_url='',
+               abstract='', pages='', notes=''):
+    """The common entry shape every parser yields"""
+    # "Doe, Jane" -> "Jane Doe" so the comma separated author list stays unambiguous
+    authors = [' '.join(reversed(name.split(',', 1))).strip() if name.count(',') == 1 else name for name in authors]
+    publication_info = ', '.join(part for part in (', '.join(authors[:3]), journal, str(year or '')) if part)
+    return {
+        'title': title.strip(),
+        'authors': ', '.join(authors),
+        'publication_info': publication_info,
+        'doi': normalize_doi(doi),
+        'link': url.strip(),
+        'pdf_link': pdf_url.strip(),
+        'extract': abstract.strip(),
+        'page_number': pages.strip(),
+        'additional_info': notes.strip(),
+    }
+
+
+# RIS
+
+RIS_LINE = re.compile(r'^([A-Z][A-Z0-9])  -(?: (.*))?$')
+
+
+def parse_ris(lines):
+    record = None
+    last_tag = None
+    for line in lines:
+        line = line.rstrip('\r\n').lstrip('\ufeff')
+        match = RIS_LINE.match(line)
+        if not match:
+            # continuation of a long value
+            if record is not None and last_tag and line.strip():
+                record[last_tag][-1] += ' ' + line.strip()
+            continue
+
+        tag, value = match.group(1), (match.group(2) or '').strip()
+        if tag == 'TY':
+            record = {}
+        elif tag == 'ER':
+            if record is not None:
+                yield _ris_entry(record)
+            record = None
+        elif record is not None:
+            record.setdefault(tag, []).append(value)
+        last_tag = tag if record is not None and tag not in ('TY', 'ER') else None
+
+
+def _ris_entry(record):
+    def first(*tags):
+        for tag in tags:
+            if record.get(tag):
+                return record[tag][0]
+        return ''
+
+    authors = record.get('AU', []) or record.get('A1', [])
+    start, end = first('SP'), first('EP')
+    return make_entry(
+        title=first('TI', 'T1', 'CT'),
+        authors=authors,
+        year=first('PY', 'Y1', 'DA')[:4],
+        journal=first('JO', 'JF', 'T2', 'JA'),
+        doi=first('DO'),
+        url=first('UR'),
+        pdf_url=first('L1'),
+        abstract=first('AB', 'N2'),
+        pages=f'{start}-{end}' if start and end else start,
+        notes='\n'.join(record.get('N1', []) + record.get('KW', [])),
+    )
+
+
+# BibTeX
+
+BIBTEX_SKIP = ('comment', 'preamble', 'string')
+LATEX_COMMAND = re.compile(r'\\[a-zA-Z]+\s*')
+UNESCAPED_BRACE = re.compile(r'(?<!\\)[{}]')
+LATEX_ESCAPE = re.compile(r'\\(.)')
+BIBTEX_SPECIAL = re.compile(r'\\.|[{}"]')
+
+
+def parse_bibtex(lines):
+    """Collect one @entry{...} at a time by tracking brace depth across lines"""
+    buffer = []
+    depth = 0
+    in_entry = False
+    opened = False
+    for line in lines:
+        if not in_entry:
+            at = line.find('@')
+            if at == -1:
+                continue
+            line = line[at:]
+            in_entry = True
+
+        buffer.append(line)
+        opened = opened or '{' in line
+        depth += line.count('{') - line.count('\\{') - line.count('}') + line.count('\\}')
+        if opened and depth <= 0:
+            entry = _bibtex_entry(''.join(buffer))
+            if entry is not None:
+                yield entry
+            buffer = []
+            depth = 0
+            in_entry = False
+            opened = False
+
+
+def _bibtex_entry(text):
+    match = re.match(r'@\s*(\w+)\s*\{', text)
+    if not match or match.group(1).lower() in BIBTEX_SKIP:
+        return None
+
+    body = text[match.end():text.rfind('}')]
+    # skip the citation key
+    comma = body.find(',')
+    fields = _bibtex_fields(body[comma + 1:] if comma != -1 else '')
+
+    def clean(value):
+        value = LATEX_COMMAND.sub('', value)
+        value = UNESCAPED_BRACE.sub('', value).replace('~', ' ')
+        return ' '.join(LATEX_ESCAPE.sub(r'\1', value).split())
+
+    authors = [clean(name) for name in re.split(r'\s+and\s+', fields.get('author', '')) if name.strip()]
+    return make_entry(
+        title=clean(fields.get('title', '')),
+        authors=authors,
+        year=clean(fields.get('year', '')),
+        journal=clean(fields.get('journal', '') or fields.get('booktitle', '')),
+        doi=clean(fields.get('doi', '')),
+        url=clean(fields.get('url', '')),
+        pdf_url=clean(fields.get('file', '')) if fields.get('file', '').lower().endswith('.pdf') else '',
+        abstract=clean(fields.get('abstract', '')),
+        pages=clean(fields.get('pages', '')).replace('--', '-'),
+        notes=clean(fields.get('note', '') or fields.get('annote', '') or fields.get('keywords', '')),
+    )
+
+
+def _bibtex_fields(body):
+    """Parse name = {value} / "value" / bare pairs, honouring nested braces"""
+    fields = {}
+    i, n = 0, len(body)
+    while i < n:
+        eq = body.find('=', i)
+        if eq == -1:
+            break
+        name = body[i:eq].strip(' \t\r\n,').lower()
+        i = eq + 1
+        while i < n and body[i].isspace():
+            i += 1
+        if i >= n:
+            break
+
+        if body[i] in '{"':
+            quoted = body[i] == '"'
+            depth = 0 if quoted else 1
+            start = i + 1
+            j = n
+            # jump between the characters that matter instead of walking every one
+            for special in BIBTEX_SPECIAL.finditer(body, start):
+                char = special.group()
+                if char == '{':
+                    depth += 1
+                elif char == '}':
+                    depth -= 1
+                    if depth == 0 and not quoted:
+                        j = special.start()
+                        break
+                elif char == '"' and quoted and depth == 0:
+                    j = special.start()
+                    break
+            value = body[start:j]
+            i = j + 1
+        else:
+            end = body.find(',', i)
+            end = n if end == -1 else end
+            value = body[i:end].strip()
+            i = end
+
+        fields[name] = value
+        comma = body.find(',', i)
+        i = n if comma == -1 else comma + 1
+    return fields
+
+
+# CSL-JSON
+
+def parse_csl_json(lines, chunk_size=65536):
+    """Decode the top level array one item at a time with raw_decode"""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    started = False
+    source = iter(lines)
+    exhausted = False
+
+    while True:
+        # skip separators
+        stripped = buffer.lstrip().lstrip('\ufeff')
+        if not started:
+            if stripped.startswith('['):
+                stripped = stripped[1:]
+                started = True
+            elif stripped:
+                raise ImportFormatError('CSL-JSON must be a JSON array of items')
+        stripped = stripped.lstrip().lstrip(',').lstrip()
+        buffer = stripped
+
+        if started and buffer.startswith(']'):
+            return
+
+        if buffer and started:
+            try:
+                item, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                item = None
+            if item is not None:
+                buffer = buffer[end:]
+                if isinstance(item, dict):
+                    yield _csl_entry(item)
+                continue
+
+        if exhausted:
+            if buffer.strip():
+                raise ImportFormatError('Unexpected end of CSL-JSON input')
+            return
+
+        # need more input for the current item
+        read = []
+        size = 0
+        for line in source:
+            read.append(line)
+            size += len(line)
+            if size >= chunk_size:
+                break
+        else:
+            exhausted = True
+        buffer += ''.join(read)
+
+
+def _csl_entry(item):
+    authors = []
+    for person in item.get('author', []) or []:
+        name = ' '.join(part for part in (person.get('given', ''), person.get('family', '')) if part)
+        authors.append(name or person.get('literal', ''))
+
+    issued = (item.get('issued') or {}).get('date-parts') or [[]]
+    year = issued[0][0] if issued and issued[0] else ''
+    title = item.get('title', '')
+    journal = item.get('container-title', '')
+    return make_entry(
+        title=title[0] if isinstance(title, list) and title else str(title or ''),
+        authors=[author for author in authors if author],
+        year=year,
+        journal=journal[0] if isinstance(journal, list) and journal else str(journal or ''),
+        doi=item.get('DOI', ''),
+        url=item.get('URL', ''),
+        abstract=item.get('abstract', ''),
+        pages=str(item.get('page', '')),
+        notes=item.get('note', ''),
+    )
+
+
+# Writing
+
+LIMITS = {
+    'title': 500,
+    'authors': 500,
+    'publication_info': 500,
+    'doi': 100,
+    'link': 1000,
+    'pdf_link': 1000,
+    'page_number': 20,
+}
+
+
+def import_entries(user, entries, batch_size=1000):
+    """
+    Write parsed entries as PaperExtracts for user, skipping any whose DOI or
+    normalized title is already in the user's library or earlier in the file.
+    Returns counts of read, created, duplicate and invalid entries.
+    """
+    seen_dois = set()
+    seen_titles = set()
+    existing = PaperExtract.objects.filter(user=user).values_list('doi', 'title')
+    for doi, title in existing.iterator(chunk_size=5000):
+        if doi:
+            seen_dois.add(normalize_doi(doi))
+        seen_titles.add(normalize_title(title))
+
+    stats = {'read': 0, 'created': 0, 'duplicates': 0, 'invalid': 0}
+    batch = []
+    for entry in entries:
+        stats['read'] += 1
+        title_key = normalize_title(entry['title'])
+        if not title_key:
+            stats['invalid'] += 1
+            continue
+        if (entry['doi'] and entry['doi'] in seen_dois) or title_key in seen_titles:
+            stats['duplicates'] += 1
+            continue
+
+        seen_titles.add(title_key)
+        if entry['doi']:
+            seen_dois.add(entry['doi'])
+        for field, max_length in LIMITS.items():
+            if entry[field]:
+                entry[field] = entry[field][:max_length]
+        batch.append(entry)
+
+        if len(batch) >= batch_size:
+            stats['created'] += _write_batch(user, batch)
+            batch = []
+
+    if batch:
+        stats['created'] += _write_batch(user, batch)
+    return stats
+
+
+def _write_batch(user, batch):
+    papers = get_or_create_papers({
+        entry['doi']: (entry['title'], entry['authors']) for entry in batch if entry['doi']
+    })
+    extracts = [
+        PaperExtract(user=user, paper=papers.get(entry['doi']), **entry)
+        for entry in batch
+    ]
+    created = PaperExtract.objects.bulk_create(extracts, batch_size=len(extracts))
+    index_extracts(created)
+    return len(created)
@@ -0,0 +1,104 @@
+# backend/papers/management/commands/bench_search.py
+
+import contextlib
+import os
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from papers.fixture_server import SERVICES, FixtureServer, FixtureStore
+from papers.search_benchmark import benchmark_queries, run_search_benchmark
+
+
+def parse_latency(value):
+    """'serpapi=0.8,crossref=0.15' -> {'serpapi': 0.8, 'crossref': 0.15}, a bare number applies to all"""
+    try:
+        if '=' not in value:
+            return dict.fromkeys(SERVICES, float(value))
+        latency = {}
+        for part in value.split(','):
+            service, seconds = part.split('=')
+            if service.strip() not in SERVICES:
+                raise ValueError(service)
+            latency[service.strip()] = float(seconds)
+        return latency
+    except ValueError:
+        raise CommandError(f"Bad --latency {value!r}, expected seconds or e.g. serpapi=0.8,crossref=0.15,unpaywall=0.1")
+
+
+class Command(BaseCommand):
+    help = "Benchmark search_scholar and enrichment against recorded SerpAPI, CrossRef and Unpaywall responses"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--queries', type=int, default=30, help='Distinct searches per pass')
+        parser.add_argument('--passes', type=int, default=2, help='Passes over the same queries, later ones measure caching')
+        parser.add_argument('--clear-results-cache', action='store_true',
+                            help='Clear the cache between passes so later passes measure the Paper table alone')
+        parser.add_argument('--latency', default='0', help='Upstream latency in seconds, per service or for all')
+        parser.add_argument('--error-rate', type=float, default=0.0, help='Share of upstream calls that fail')
+        parser.add_argument('--seed', type=int, default=0, help='Seed for latency jitter and injected errors')
+        parser.add_argument('--fixtures', default=os.path.join(settings.BASE_DIR, 'papers', 'bench_fixtures'),
+                            help='Directory of recorded responses')
+        parser.add_argument('--record', action='store_true',
+                            help='Fetch unrecorded responses from the real APIs and save them (spends SerpAPI quota)')
+        parser.add_argument('--show-view-output', action='store_true', help="Keep the views' own print output")
+
+    def handle(self, *args, **options):
+        store = FixtureStore(options['fixtures'])
+        server = FixtureServer(
+            store,
+            latency=parse_latency(options['latency']),
+            error_rate=options['error_rate'],
+            record=options['record'],
+            seed=options['seed'],
+        ).start()
+        queries = benchmark_queries(store, options['queries'])
+
+        overrides = {
+            'SERPAPI_URL': f'{server.url}/serpapi',
+            'CROSSREF_API_URL': f'{server.url}/crossref',
+            'UNPAYWALL_API_URL': f'{server.url}/unpaywall',
+            'UNPAYWALL_EMAIL': settings.UNPAYWALL_EMAIL or 'bench@example.org',
+            # the quota is not what is being measured
+            'SERPAPI_MONTHLY_QUOTA': 10**9,
+            'SERPAPI_BURST': 10**6,
+            'SERPAPI_RATE_PER_MINUTE': 10**9,
+            # a private cache so earlier searches on this machine don't count as hits
+            'CACHES': {
+                'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'bench-search'},
+                'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'bench-search-shared'},
+            },
+        }
+        if not options['record']:
+            overrides['SERPAPI_KEY'] = 'bench'
+
+        try:
+            with override_settings(**overrides), open(os.devnull, 'w') as devnull:
+                quiet = contextlib.nullcontext() if options['show_view_output'] else contextlib.redirect_stdout(devnull)
+                with quiet:
+                    summaries = run_search_benchmark(
+                        server, queries, passes=options['passes'],
+                        clear_results_cache=options['clear_results_cache']
+                    )
+        finally:
+            server.stop()
+
+        for number, summary in enumerate(summaries, 1):
+            self.stdout.write(self.style.MIGRATE_HEADING(f"Pass {number}"))
+            self.stdout.write(
+                f"  {summary['searches']} searches, {summary['errors']} errors, "
+                f"p50 {summary['p50']:.1f} ms, p95 {summary['p95']:.1f} ms, p99 {summary['p99']:.1f} ms, "
+                f"mean {summary['mean']:.1f} ms, {summary['queries']:.1f} queries/search"
+            )
+            for service, counts in summary['upstream'].items():
+                self.stdout.write(
+                    f"  {service:<10} {counts['calls']:>5} calls ({counts['replayed']} replayed, "
+                    f"{counts['synthetic']} synthetic, {counts['recorded']} recorded, {counts['errors']} injected errors)"
+                )
+            rates = ', '.join(
+                f"{name} {rate:.0%}" if rate is not None else f"{name} -"
+                for name, rate in summary['hit_rates'].items()
+            )
+            self.stdout.write(f"  cache hit rates: {rates}")
+
+        if options['record']:
+            self.stdout.write(self.style.SUCCESS(f"Saved fixtures to {options['fixtures']}"))
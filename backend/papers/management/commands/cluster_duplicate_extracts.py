@@ -0,0 +1,113 @@
+# backend/papers/management/commands/cluster_duplicate_extracts.py
+
+import time
+from itertools import groupby, islice
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from papers.dedup import cluster_signatures, index_extracts, signature_from_bytes
+from papers.models import ExtractLSHBucket, PaperExtract
+
+
+class Command(BaseCommand):
+    help = "Sign extracts that have no MinHash yet and report clusters of near-duplicate extracts"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Extracts signed per batch')
+        parser.add_argument('--rebuild', action='store_true', help='Recompute every signature')
+        parser.add_argument('--threshold', type=float, default=None, help='Defaults to NEAR_DUPLICATE_THRESHOLD')
+        parser.add_argument('--cross-user', action='store_true', help="Also cluster across different users' libraries")
+        parser.add_argument('--show', type=int, default=10, help='Print the largest N clusters')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        signed = self.sign_extracts(options['chunk_size'], options['rebuild'])
+        self.stdout.write(f"Signed {signed} extracts in {time.monotonic() - started:.1f}s")
+
+        threshold = options['threshold'] or settings.NEAR_DUPLICATE_THRESHOLD
+        clusters = self.cluster(threshold, options['cross_user'])
+        clusters.sort(key=len, reverse=True)
+
+        duplicates = sum(len(cluster) - 1 for cluster in clusters)
+        self.stdout.write(self.style.SUCCESS(
+            f"Found {len(clusters)} clusters covering {duplicates} redundant extracts "
+            f"in {time.monotonic() - started:.1f}s"
+        ))
+
+        titles = dict(
+            PaperExtract.objects.filter(id__in=[cluster[0] for cluster in clusters[:options['show']]])
+            .values_list('id', 'title')
+        )
+        for cluster in clusters[:options['show']]:
+            self.stdout.write(f"  {len(cluster)} x '{titles.get(cluster[0], '')[:60]}': ids {cluster[:20]}")
+
+    def sign_extracts(self, chunk_size, rebuild):
+        queryset = PaperExtract.objects.only('id', 'extract').order_by('id')
+        if not rebuild:
+            queryset = queryset.filter(minhash__isnull=True)
+
+        rows = iter(queryset.iterator(chunk_size=chunk_size))
+        signed = 0
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                return signed
+            index_extracts(chunk)
+            signed += len(chunk)
+
+    def cluster(self, threshold, cross_user):
+        """Walk the bucket index in order, verify each shared bucket with NumPy and merge the results"""
+        buckets = (
+            ExtractLSHBucket.objects.order_by('band', 'bucket', 'extract__user_id')
+            .values_list('band', 'bucket', 'extract__user_id', 'extract_id')
+            .iterator(chunk_size=5000)
+        )
+        if cross_user:
+            key = lambda row: (row[0], row[1])
+        else:
+            key = lambda row: (row[0], row[1], row[2])
+
+        # candidate groups, each extract's groups are later merged with union-find
+        groups = [
+            sorted({row[3] for row in rows})
+            for _, rows in groupby(buckets, key=key)
+        ]
+        groups = [group for group in groups if len(group) > 1]
+        if not groups:
+            return []
+
+        candidate_ids = sorted({extract_id for group in groups for extract_id in group})
+        signatures = {}
+        for start in range(0, len(candidate_ids), 5000):
+            for extract_id, minhash in PaperExtract.objects.filter(
+                id__in=candidate_ids[start:start + 5000]
+            ).values_list('id', 'minhash'):
+                signatures[extract_id] = signature_from_bytes(minhash)
+
+        parent = {}
+
+        def find(i):
+            parent.setdefault(i, i)
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        seen = set()
+        for group in groups:
+            group_key = tuple(group)
+            if group_key in seen:
+                continue
+            seen.add(group_key)
+            matrix = np.stack([signatures[extract_id] for extract_id in group])
+            for cluster in cluster_signatures(group, matrix, threshold):
+                root = find(cluster[0])
+                for extract_id in cluster[1:]:
+                    other = find(extract_id)
+                    if other != root:
+                        parent[other] = root
+
+        clusters = {}
+        for extract_id in parent:
+            clusters.setdefault(find(extract_id), []).append(extract_id)
+        return [sorted(members) for members in clusters.values() if len(members) > 1]
@@ -0,0 +1,184 @@
+# backend/papers/management/commands/enrich_extracts.py
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+import requests
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from papers.enrichment import (
+    RateLimiter, apply_unpaywall, fetch_crossref_doi, fetch_unpaywall, is_stale, normalize_doi
+)
+from papers.models import Paper, PaperExtract
+from livestream.models import BY_REFERENCE, SharedExtract
+
+FIELDS = ('id', 'title', 'authors', 'doi', 'pdf_link', 'paper_id')
+
+
+class Command(BaseCommand):
+    help = "Backfill DOIs, Paper links and open access PDF links on saved and shared extracts"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500, help='Extracts processed per chunk')
+        parser.add_argument('--workers', type=int, default=8, help='Concurrent API requests')
+        parser.add_argument('--rate', type=float, default=5.0, help='Max API requests per second, across all workers')
+        parser.add_argument('--checkpoint', default='enrich_extracts.checkpoint.json',
+                            help='File recording the last processed id per table')
+        parser.add_argument('--restart', action='store_true', help='Ignore an existing checkpoint')
+
+    def handle(self, *args, **options):
+        self.limiter = RateLimiter(options['rate'])
+        self.local = threading.local()
+        self.checkpoint_path = options['checkpoint']
+        self.checkpoint = {} if options['restart'] else self.load_checkpoint()
+
+        # results of lookups already made during this run, shared by both tables
+        self.title_dois = {}
+        self.api_calls = 0
+
+        started = time.monotonic()
+        totals = {'rows': 0, 'updated': 0}
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            self.pool = pool
+            for label, model in (('paper_extracts', PaperExtract), ('shared_extracts', SharedExtract)):
+                rows, updated = self.process_table(label, model, options['chunk_size'], started)
+                totals['rows'] += rows
+                totals['updated'] += updated
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Done: {totals['rows']} extracts scanned, {totals['updated']} updated, "
+            f"{self.api_calls} API calls in {elapsed:.1f}s ({totals['rows'] / max(elapsed, 0.001):.1f} rows/s)"
+        ))
+
+    def load_checkpoint(self):
+        if os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path) as f:
+                checkpoint = json.load(f)
+            self.stdout.write(f"Resuming from checkpoint {checkpoint}")
+            return checkpoint
+        return {}
+
+    def save_checkpoint(self):
+        # write then rename so an interrupted run never leaves a half written file
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.checkpoint, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def session(self):
+        """One requests session per worker thread"""
+        if not hasattr(self.local, 'session'):
+            self.local.session = requests.Session()
+        return self.local.session
+
+    def call_api(self, fetch, arg):
+        """Rate limited lookup, returns (arg, result, ok) where ok is False on network errors"""
+        self.limiter.wait()
+        try:
+            return arg, fetch(arg, session=self.session()), True
+        except Exception as e:
+            self.stderr.write(f"Lookup failed for {arg!r}: {e}")
+            return arg, None, False
+
+    def process_table(self, label, model, chunk_size, started):
+        last_id = self.checkpoint.get(label, 0)
+        queryset = model.objects.filter(id__gt=last_id).only(*FIELDS).order_by('id')
+        if model is SharedExtract:
+            # rows shared by reference take their DOI and links from the PaperExtract, enriched above
+            queryset = queryset.exclude(BY_REFERENCE)
+        rows = iter(queryset.iterator(chunk_size=chunk_size))
+
+        scanned = updated = 0
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+
+            updated += self.process_chunk(model, chunk)
+            scanned += len(chunk)
+
+            self.checkpoint[label] = chunk[-1].id
+            self.save_checkpoint()
+
+            elapsed = time.monotonic() - started
+            self.stdout.write(
+                f"{label}: {scanned} scanned, {updated} updated, up to id {chunk[-1].id} "
+                f"({scanned / max(elapsed, 0.001):.1f} rows/s)"
+            )
+        return scanned, updated
+
+    def process_chunk(self, model, chunk):
+        # 1. DOIs for titles we have never looked up, one request per distinct title
+        missing_titles = {row.title for row in chunk if not row.doi and row.title} - self.title_dois.keys()
+        if missing_titles:
+            for paper in Paper.objects.filter(title__in=missing_titles).only('doi', 'title'):
+                self.title_dois.setdefault(paper.title, paper.doi)
+            missing_titles -= self.title_dois.keys()
+
+            self.api_calls += len(missing_titles)
+            for title, doi, ok in self.pool.map(lambda t: self.call_api(fetch_crossref_doi, t), missing_titles):
+                if ok:
+                    self.title_dois[title] = normalize_doi(doi)
+
+        # 2. one Paper per distinct DOI, refreshed from Unpaywall when stale
+        titles_by_doi = {}
+        for row in chunk:
+            doi = normalize_doi(row.doi) or self.title_dois.get(row.title)
+            if doi:
+                titles_by_doi.setdefault(doi, (row.title, row.authors))
+
+        papers = Paper.objects.in_bulk(titles_by_doi.keys(), field_name='doi')
+        new_papers = [
+            Paper(doi=doi, title=title[:500], authors=authors[:500])
+            for doi, (title, authors) in titles_by_doi.items() if doi not in papers
+        ]
+        if new_papers:
+            Paper.objects.bulk_create(new_papers, ignore_conflicts=True)
+            papers = Paper.objects.in_bulk(titles_by_doi.keys(), field_name='doi')
+
+        stale = [doi for doi, paper in papers.items() if is_stale(paper)]
+        self.api_calls += len(stale)
+        refreshed, unknown = [], []
+        for doi, unpaywall_data, ok in self.pool.map(lambda d: self.call_api(fetch_unpaywall, d), stale):
+            if unpaywall_data is not None:
+                apply_unpaywall(papers[doi], unpaywall_data)
+                refreshed.append(papers[doi])
+            elif ok:
+                unknown.append(doi)
+        if unknown:
+            # not in unpaywall, don't ask again until the row goes stale
+            Paper.objects.filter(doi__in=unknown).update(unpaywall_checked_at=timezone.now())
+        if refreshed:
+            Paper.objects.bulk_update(refreshed, [
+                'title', 'journal', 'publisher', 'year', 'is_oa', 'oa_status',
+                'oa_url', 'pdf_url', 'unpaywall_checked_at'
+            ], batch_size=500)
+
+        # 3. write DOIs, paper links and missing PDF links back onto the extracts
+        changed = []
+        for row in chunk:
+            doi = normalize_doi(row.doi) or self.title_dois.get(row.title)
+            paper = papers.get(doi) if doi else None
+            if paper is None:
+                continue
+
+            dirty = False
+            if not row.doi:
+                row.doi = paper.doi
+                dirty = True
+            if row.paper_id != paper.id:
+                row.paper_id = paper.id
+                dirty = True
+            if not row.pdf_link and paper.pdf_url:
+                row.pdf_link = paper.pdf_url
+                dirty = True
+            if dirty:
+                changed.append(row)
+
+        if changed:
+            model.objects.bulk_update(changed, ['doi', 'paper', 'pdf_link'], batch_size=500)
+        return len(changed)
@@ -0,0 +1,42 @@
+# backend/papers/management/commands/import_extracts.py
+
+import time
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from papers.importers import FORMATS, ImportFormatError, guess_format, import_entries, parse
+
+
+class Command(BaseCommand):
+    help = "Import a BibTeX, RIS or CSL-JSON library into a user's extracts"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Library file to import')
+        parser.add_argument('--user', required=True, help='Username or email of the owner')
+        parser.add_argument('--file-format', choices=FORMATS, help='Defaults to a guess from the file extension')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Extracts written per insert')
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            user = User.objects.filter(email=options['user']).first()
+            if user is None:
+                raise CommandError(f"User {options['user']} not found")
+
+        file_format = options['file_format'] or guess_format(options['path'])
+        if not file_format:
+            raise CommandError('Could not tell the file format, pass --file-format')
+
+        started = time.monotonic()
+        try:
+            with open(options['path'], encoding='utf-8', errors='replace') as f:
+                stats = import_entries(user, parse(f, file_format), batch_size=options['batch_size'])
+        except ImportFormatError as e:
+            raise CommandError(str(e))
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Read {stats['read']} entries: {stats['created']} created, {stats['duplicates']} duplicates, "
+            f"{stats['invalid']} invalid in {elapsed:.1f}s ({stats['read'] / max(elapsed, 0.001):.0f} entries/s)"
+        ))
@@ -0,0 +1,24 @@
+# backend/papers/management/commands/refresh_papers.py
+
+import time
+from django.core.management.base import BaseCommand
+from papers.enrichment import refresh_stale_papers
+
+
+class Command(BaseCommand):
+    help = "Re-enrich Paper rows whose Unpaywall data is missing or older than PAPER_REFRESH_DAYS"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='Papers loaded per batch')
+        parser.add_argument('--limit', type=int, default=None, help='Stop after this many papers')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        checked, refreshed = refresh_stale_papers(
+            batch_size=options['batch_size'],
+            limit=options['limit']
+        )
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Checked {checked} papers, refreshed {refreshed} in {elapsed:.1f}s"
+        ))
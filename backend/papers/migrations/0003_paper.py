@@ -0,0 +1,39 @@
+# Generated by Django 5.1 on 2026-10-19 06:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('papers', '0002_apiquota'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Paper',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('doi', models.CharField(max_length=100, unique=True)),
+                ('title', models.CharField(blank=True, db_index=True, max_length=500)),
+                ('authors', models.CharField(blank=True, max_length=500)),
+                ('journal', models.CharField(blank=True, max_length=500)),
+                ('publisher', models.CharField(blank=True, max_length=500)),
+                ('year', models.PositiveIntegerField(blank=True, null=True)),
+                ('is_oa', models.BooleanField(default=False)),
+                ('oa_status', models.CharField(blank=True, max_length=20)),
+                ('oa_url', models.URLField(blank=True, max_length=1000)),
+                ('pdf_url', models.URLField(blank=True, max_length=1000)),
+                ('crossref_checked_at', models.DateTimeField(blank=True, null=True)),
+                ('unpaywall_checked_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='paperextract',
+            name='paper',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='extracts', to='papers.paper'),
+        ),
+    ]
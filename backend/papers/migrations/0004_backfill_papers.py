@@ -0,0 +1,48 @@
+from django.db import migrations
+
+DOI_PREFIXES = ('https://doi.org/', 'http://doi.org/', 'https://dx.doi.org/', 'http://dx.doi.org/', 'doi:')
+
+
+def normalize_doi(doi):
+    doi = (doi or '').strip().lower()
+    for prefix in DOI_PREFIXES:
+        if doi.startswith(prefix):
+            doi = doi[len(prefix):]
+    return doi or None
+
+
+def backfill_papers(apps, schema_editor):
+    """Create one Paper per DOI found on existing extracts and link the extracts to it"""
+    Paper = apps.get_model('papers', 'Paper')
+    PaperExtract = apps.get_model('papers', 'PaperExtract')
+
+    extracts = PaperExtract.objects.exclude(doi__isnull=True).exclude(doi='').only('id', 'doi', 'title', 'authors')
+    papers = {}
+    for extract in extracts.iterator(chunk_size=2000):
+        doi = normalize_doi(extract.doi)
+        if doi and doi not in papers:
+            papers[doi] = Paper(doi=doi, title=extract.title[:500], authors=extract.authors[:500])
+
+    Paper.objects.bulk_create(papers.values(), batch_size=1000, ignore_conflicts=True)
+    paper_ids = dict(Paper.objects.values_list('doi', 'id'))
+
+    batch = []
+    for extract in extracts.iterator(chunk_size=2000):
+        extract.paper_id = paper_ids.get(normalize_doi(extract.doi))
+        batch.append(extract)
+        if len(batch) >= 1000:
+            PaperExtract.objects.bulk_update(batch, ['paper'])
+            batch = []
+    if batch:
+        PaperExtract.objects.bulk_update(batch, ['paper'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('papers', '0003_paper'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_papers, migrations.RunPython.noop),
+    ]
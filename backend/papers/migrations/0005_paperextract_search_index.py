@@ -0,0 +1,97 @@
+from django.db import migrations
+
+# Full-text search over extracts. Neither structure is a Django field, they are
+# maintained by the database itself and only read through papers/search.py.
+
+POSTGRES_FORWARD = [
+    """
+    ALTER TABLE papers_paperextract ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(authors, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(extract, '')), 'C') ||
+        setweight(to_tsvector('english', coalesce(additional_info, '')), 'D')
+    ) STORED
+    """,
+    "CREATE INDEX papers_paperextract_search_gin ON papers_paperextract USING GIN (search_vector)",
+]
+
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS papers_paperextract_search_gin",
+    "ALTER TABLE papers_paperextract DROP COLUMN IF EXISTS search_vector",
+]
+
+# External content FTS5 table kept in sync by triggers
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE papers_paperextract_fts USING fts5(
+        title, authors, extract, additional_info,
+        content='papers_paperextract', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER papers_paperextract_fts_insert AFTER INSERT ON papers_paperextract BEGIN
+        INSERT INTO papers_paperextract_fts(rowid, title, authors, extract, additional_info)
+        VALUES (new.id, new.title, new.authors, new.extract, new.additional_info);
+    END
+    """,
+    """
+    CREATE TRIGGER papers_paperextract_fts_delete AFTER DELETE ON papers_paperextract BEGIN
+        INSERT INTO papers_paperextract_fts(papers_paperextract_fts, rowid, title, authors, extract, additional_info)
+        VALUES ('delete', old.id, old.title, old.authors, old.extract, old.additional_info);
+    END
+    """,
+    """
+    CREATE TRIGGER papers_paperextract_fts_update AFTER UPDATE ON papers_paperextract BEGIN
+        INSERT INTO papers_paperextract_fts(papers_paperextract_fts, rowid, title, authors, extract, additional_info)
+        VALUES ('delete', old.id, old.title, old.authors, old.extract, old.additional_info);
+        INSERT INTO papers_paperextract_fts(rowid, title, authors, extract, additional_info)
+        VALUES (new.id, new.title, new.authors, new.extract, new.additional_info);
+    END
+    """,
+    "INSERT INTO papers_paperextract_fts(papers_paperextract_fts) VALUES ('rebuild')",
+]
+
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS papers_paperextract_fts_insert",
+    "DROP TRIGGER IF EXISTS papers_paperextract_fts_delete",
+    "DROP TRIGGER IF EXISTS papers_paperextract_fts_update",
+    "DROP TABLE IF EXISTS papers_paperextract_fts",
+]
+
+
+def run_statements(schema_editor, statements):
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        run_statements(schema_editor, POSTGRES_FORWARD)
+    elif vendor == 'sqlite':
+        try:
+            run_statements(schema_editor, SQLITE_FORWARD)
+        except Exception as e:
+            # sqlite built without fts5 - search falls back to plain filtering
+            print(f"Skipping FTS5 search index: {e}")
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        run_statements(schema_editor, POSTGRES_REVERSE)
+    elif vendor == 'sqlite':
+        run_statements(schema_editor, SQLITE_REVERSE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('papers', '0004_backfill_papers'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
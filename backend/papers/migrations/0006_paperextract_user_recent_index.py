@@ -0,0 +1,19 @@
+# Generated by Django 5.1 on 2026-10-19 06:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('papers', '0005_paperextract_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='paperextract',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='paperextract_user_recent'),
+        ),
+    ]
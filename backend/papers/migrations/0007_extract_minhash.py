@@ -0,0 +1,52 @@
+# Generated by Django 5.1 on 2026-10-19 06:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+SQLITE_UPDATE_TRIGGER = """
+    CREATE TRIGGER papers_paperextract_fts_update
+    AFTER UPDATE OF title, authors, extract, additional_info ON papers_paperextract BEGIN
+        INSERT INTO papers_paperextract_fts(papers_paperextract_fts, rowid, title, authors, extract, additional_info)
+        VALUES ('delete', old.id, old.title, old.authors, old.extract, old.additional_info);
+        INSERT INTO papers_paperextract_fts(rowid, title, authors, extract, additional_info)
+        VALUES (new.id, new.title, new.authors, new.extract, new.additional_info);
+    END
+"""
+
+
+def narrow_fts_update_trigger(apps, schema_editor):
+    """Writing minhash signatures shouldn't reindex the extract in FTS5"""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    if 'papers_paperextract_fts' not in schema_editor.connection.introspection.table_names():
+        return
+    schema_editor.execute("DROP TRIGGER IF EXISTS papers_paperextract_fts_update")
+    schema_editor.execute(SQLITE_UPDATE_TRIGGER)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('papers', '0006_paperextract_user_recent_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='paperextract',
+            name='minhash',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='ExtractLSHBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('band', models.PositiveSmallIntegerField()),
+                ('bucket', models.BigIntegerField()),
+                ('extract', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lsh_buckets', to='papers.paperextract')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['band', 'bucket'], name='extract_lsh_band_bucket')],
+            },
+        ),
+        migrations.RunPython(narrow_fts_update_trigger, migrations.RunPython.noop),
+    ]
@@ -5,8 +5,34 @@ from authentication.models import User
 
 # Create your models here.
 
+class Paper(models.Model):
+    """Canonical metadata for a paper, one row per DOI"""
+    doi = models.CharField(max_length=100, unique=True)
+    title = models.CharField(max_length=500, blank=True, db_index=True)
+    authors = models.CharField(max_length=500, blank=True)
+    journal = models.CharField(max_length=500, blank=True)
+    publisher = models.CharField(max_length=500, blank=True)
+    year = models.PositiveIntegerField(null=True, blank=True)
+    
+    # Unpaywall open access data
+    is_oa = models.BooleanField(default=False)
+    oa_status = models.CharField(max_length=20, blank=True)
+    oa_url = models.URLField(max_length=1000, blank=True)
+    pdf_url = models.URLField(max_length=1000, blank=True)
+    
+    # Enrichment timestamps, used to decide when a row needs refreshing
+    crossref_checked_at = models.DateTimeField(null=True, blank=True)
+    unpaywall_checked_at = models.DateTimeField(null=True, blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.doi} - {self.title}"
+
 class PaperExtract(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='paper_extracts')
+    paper = models.ForeignKey(Paper, null=True, blank=True, on_delete=models.SET_NULL, related_name='extracts')
     title = models.CharField(max_length=500)
     authors = models.CharField(max_length=500, blank=True)
     publication_info = models.CharField(max_length=500, blank=True)
@@ -20,9 +46,44 @@ class PaperExtract(models.Model):
     page_number = models.CharField(max_length=20, blank=True)
     additional_info = models.TextField(blank=True)
     
+    # MinHash signature of the extract text, see papers/dedup.py
+    minhash = models.BinaryField(null=True, blank=True, editable=False)
+    
     # Metadata fields
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # keyset pagination of a user's library, newest first
+            models.Index(fields=['user', '-created_at', '-id'], name='paperextract_user_recent'),
+        ]
+
+
+class ExtractLSHBucket(models.Model):
+    """One LSH band of an extract's MinHash signature, extracts sharing a bucket are duplicate candidates"""
+    extract = models.ForeignKey(PaperExtract, on_delete=models.CASCADE, related_name='lsh_buckets')
+    band = models.PositiveSmallIntegerField()
+    bucket = models.BigIntegerField()
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['band', 'bucket'], name='extract_lsh_band_bucket'),
+        ]
+
+class ApiQuota(models.Model):
+    """Token bucket state for an external API, shared by every worker through the database"""
+    name = models.CharField(max_length=50, unique=True)
+    tokens = models.FloatField(default=0)
+    refilled_at = models.DateTimeField()
+
+    # Usage for the current billing period (calendar month)
+    period_start = models.DateField()
+    period_used = models.PositiveIntegerField(default=0)
+    period_rejected = models.PositiveIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name}: {self.tokens:.2f} tokens, {self.period_used} used since {self.period_start}"
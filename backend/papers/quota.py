@@ -0,0 +1,157 @@
+# backend/papers/quota.py
+
+"""
+Account-wide token bucket for external APIs (SerpAPI).
+
+The bucket lives in the ApiQuota table so every gunicorn worker draws from the
+same budget. Callers that find the bucket empty are queued instead of being
+rejected straight away, up to a short max wait: each books the next token
+due, leaving the bucket in debt, and sleeps until its turn. Waiters are
+therefore served in the order they arrived, and a stream of new requests
+can't keep taking the tokens an earlier one is waiting for.
+
+There is deliberately no priority or reserve for interactive callers. Only
+search_scholar spends SerpAPI tokens, and only on a results cache miss, so
+every caller is an interactive search; the batch commands (enrich_extracts,
+refresh_papers) call CrossRef and Unpaywall and never touch this bucket. A
+reserve nothing else can draw from would only leave tokens idle.
+"""
+
+import time
+from dataclasses import dataclass
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from papers.models import ApiQuota
+
+class QuotaExceeded(Exception):
+    """Raised when a token could not be acquired within the allowed wait"""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+@dataclass(frozen=True)
+class QuotaPlan:
+    monthly_limit: int
+    burst: int
+    rate_per_second: float
+    max_wait: float
+
+
+def serpapi_plan():
+    """SerpAPI plan limits from settings"""
+    return QuotaPlan(
+        monthly_limit=settings.SERPAPI_MONTHLY_QUOTA,
+        burst=settings.SERPAPI_BURST,
+        rate_per_second=settings.SERPAPI_RATE_PER_MINUTE / 60.0,
+        max_wait=settings.SERPAPI_MAX_WAIT,
+    )
+
+
+def _get_bucket(name, plan, now):
+    bucket, created = ApiQuota.objects.select_for_update().get_or_create(
+        name=name,
+        defaults={
+            'tokens': plan.burst,
+            'refilled_at': now,
+            'period_start': now.date().replace(day=1),
+        }
+    )
+    return bucket
+
+
+def _refill(bucket, plan, now):
+    """Add the tokens earned since the last refill and roll the billing period over"""
+    elapsed = max(0.0, (now - bucket.refilled_at).total_seconds())
+    bucket.tokens = min(float(plan.burst), bucket.tokens + elapsed * plan.rate_per_second)
+    bucket.refilled_at = now
+
+    period_start = now.date().replace(day=1)
+    if bucket.period_start != period_start:
+        bucket.period_start = period_start
+        bucket.period_used = 0
+        bucket.period_rejected = 0
+
+
+def _try_acquire(name, plan, max_wait):
+    """
+    Book one token, the next one due when the bucket is empty. Returns
+    (granted, wait): granted with the seconds until the booked token is due,
+    or not granted with the seconds it would have taken, None when the
+    monthly quota is used up.
+    """
+    with transaction.atomic():
+        now = timezone.now()
+        bucket = _get_bucket(name, plan, now)
+        _refill(bucket, plan, now)
+
+        if bucket.period_used >= plan.monthly_limit:
+            bucket.save()
+            return False, None
+
+        if bucket.tokens >= 1:
+            wait = 0.0
+        elif plan.rate_per_second > 0:
+            # below zero the bucket counts the tokens already booked by callers still waiting
+            wait = (1 - bucket.tokens) / plan.rate_per_second
+        else:
+            bucket.save()
+            return False, None
+
+        if wait > max_wait:
+            bucket.save()
+            return False, wait
+
+        bucket.tokens -= 1
+        bucket.period_used += 1
+        bucket.save()
+        return True, wait
+
+
+def _record_rejection(name):
+    ApiQuota.objects.filter(name=name).update(period_rejected=F('period_rejected') + 1)
+
+
+def acquire(name, plan, max_wait=None):
+    """
+    Take a token, waiting at most max_wait seconds (the plan's by default)
+    for one to be due. Raises QuotaExceeded when the wait would be too long
+    or the monthly quota is gone.
+    """
+    if max_wait is None:
+        max_wait = plan.max_wait
+
+    granted, wait = _try_acquire(name, plan, max_wait)
+    if not granted:
+        _record_rejection(name)
+        if wait is None:
+            raise QuotaExceeded('Monthly search quota exhausted. Please try again later.', retry_after=None)
+        raise QuotaExceeded('Search is busy. Please wait a moment before trying again.', retry_after=wait)
+
+    if wait > 0:
+        time.sleep(wait)
+
+
+def quota_status(name, plan):
+    """Remaining-quota metrics for the given bucket, without consuming a token"""
+    with transaction.atomic():
+        now = timezone.now()
+        bucket = _get_bucket(name, plan, now)
+        _refill(bucket, plan, now)
+        bucket.save()
+
+    return {
+        'name': name,
+        # negative while callers wait for tokens they booked
+        'tokens_available': round(max(bucket.tokens, 0.0), 2),
+        'burst': plan.burst,
+        'rate_per_minute': plan.rate_per_second * 60,
+        'period_start': bucket.period_start.isoformat(),
+        'period_used': bucket.period_used,
+        'period_remaining': max(0, plan.monthly_limit - bucket.period_used),
+        'period_rejected': bucket.period_rejected,
+        'monthly_limit': plan.monthly_limit,
+    }
@@ -0,0 +1,282 @@
+# backend/papers/related.py
+
+"""
+Related-extract recommendations from hashed TF-IDF vectors.
+
+build_index() vectorizes every PaperExtract and SharedExtract into a
+DIMENSIONS wide float32 row (signed feature hashing of TF-IDF weighted words,
+L2 normalized) and stores them as a papers.vector_index base segment that
+every worker memory maps. related() scores a query text against each segment
+with a matrix-vector product and an argpartition top-k.
+
+update_index() writes rows saved since as a delta segment, merged in at query
+time, and rows newer than even that are vectorized directly per query.
+"""
+
+import os
+import re
+import zlib
+from itertools import islice
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+from papers import vector_index
+from papers.models import PaperExtract
+
+DIMENSIONS = 512
+IDF_BUCKETS = 2 ** 20
+MIN_WORD_LENGTH = 3
+
+KIND_EXTRACT = 0
+KIND_SHARED = 1
+KINDS = {KIND_EXTRACT: 'extract', KIND_SHARED: 'shared'}
+
+# per-row arrays stored in every segment
+COLUMNS = ('vectors', 'ids', 'kinds', 'owners')
+
+# incremental updates past this many delta segments rebuild from scratch instead
+MAX_DELTAS = 8
+
+# how many rows newer than the index are vectorized per query
+FRESH_LIMIT = 500
+
+STOPWORDS = frozenset(
+    'the and for are but not you all any can had her was one our out has have this that with from they '
+    'will would there their what which when were been into than then them these those such also more '
+    'most other some only over very its our may between both each after before while where about'.split()
+)
+
+EXTRACT_TEXT_FIELDS = ('title', 'authors', 'extract', 'additional_info')
+SHARED_TEXT_FIELDS = ('title', 'authors', 'extract')
+
+
+def index_dir():
+    return settings.RELATED_INDEX_DIR
+
+
+def word_hashes(text):
+    words = [
+        word for word in re.findall(r'\w+', (text or '').lower())
+        if len(word) >= MIN_WORD_LENGTH and word not in STOPWORDS and not word.isdigit()
+    ]
+    return np.fromiter((zlib.crc32(word.encode()) for word in words), dtype=np.uint32, count=len(words))
+
+
+def document_text(row):
+    """Text to vectorize for a row dict. Shared extract rows carry theirs as content_<field>."""
+    def field(name):
+        return row.get(name) or row.get(f'content_{name}') or ''
+    # titles count twice, they're the densest description of the passage
+    return ' '.join((field('title'), field('title'), field('authors'), field('extract'), field('additional_info')))
+
+
+def vectorize(texts, idf=None):
+    """(len(texts), DIMENSIONS) float32 matrix of unit length TF-IDF rows"""
+    matrix = np.zeros((len(texts), DIMENSIONS), dtype=np.float32)
+    for row, text in enumerate(texts):
+        hashes, counts = np.unique(word_hashes(text), return_counts=True)
+        if hashes.size == 0:
+            continue
+        weights = 1.0 + np.log(counts)
+        if idf is not None:
+            weights = weights * idf[hashes % IDF_BUCKETS]
+        # the top bit picks the sign so colliding words tend to cancel rather than add up
+        signs = np.where(hashes >> 31, -1.0, 1.0)
+        np.add.at(matrix[row], hashes % DIMENSIONS, signs * weights)
+        norm = np.linalg.norm(matrix[row])
+        if norm:
+            matrix[row] /= norm
+    return matrix
+
+
+def _shared_rows(queryset):
+    """Shared extract rows as dicts, with the text of those shared by reference joined in"""
+    return queryset.with_content().values('id', 'room_id', *[f'content_{field}' for field in SHARED_TEXT_FIELDS])
+
+
+def _corpus():
+    """(kind, queryset of dicts) pairs for everything that gets indexed"""
+    from livestream.models import SharedExtract
+    return [
+        (KIND_EXTRACT, PaperExtract.objects.order_by('id').values('id', 'user_id', *EXTRACT_TEXT_FIELDS)),
+        (KIND_SHARED, _shared_rows(SharedExtract.objects.order_by('id'))),
+    ]
+
+
+def _owner(kind, row):
+    # extracts are private to their user, shared extracts belong to their room
+    return row['user_id'] if kind == KIND_EXTRACT else row['room_id']
+
+
+def _chunks(rows, size):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _vectorize_chunks(queryset, kind, idf, chunk_size):
+    """Columns for every row of queryset, built chunk by chunk"""
+    parts = {column: [] for column in COLUMNS}
+    max_id = None
+    for chunk in _chunks(queryset.iterator(chunk_size=chunk_size), chunk_size):
+        parts['vectors'].append(vectorize([document_text(row) for row in chunk], idf))
+        parts['ids'].append(np.array([row['id'] for row in chunk], dtype=np.int64))
+        parts['kinds'].append(np.full(len(chunk), kind, dtype=np.int8))
+        parts['owners'].append(np.array([_owner(kind, row) for row in chunk], dtype=np.int64))
+        max_id = chunk[-1]['id']
+    return parts, max_id
+
+
+def _concatenate(parts):
+    empty = {
+        'vectors': np.zeros((0, DIMENSIONS), dtype=np.float32),
+        'ids': np.zeros(0, dtype=np.int64),
+        'kinds': np.zeros(0, dtype=np.int8),
+        'owners': np.zeros(0, dtype=np.int64),
+    }
+    return {column: np.concatenate(parts[column]) if parts[column] else empty[column] for column in COLUMNS}
+
+
+def build_index(chunk_size=2000):
+    """
+    Two passes over the corpus, document frequencies then vectors, written as a
+    new base segment and published in one manifest swap. Returns the manifest.
+    """
+    root = index_dir()
+    os.makedirs(root, exist_ok=True)
+
+    document_frequency = np.zeros(IDF_BUCKETS, dtype=np.int32)
+    count = 0
+    for kind, queryset in _corpus():
+        for chunk in _chunks(queryset.iterator(chunk_size=chunk_size), chunk_size):
+            for row in chunk:
+                document_frequency[np.unique(word_hashes(document_text(row)) % IDF_BUCKETS)] += 1
+            count += len(chunk)
+    idf = np.log((1.0 + count) / (1.0 + document_frequency)).astype(np.float32) + 1.0
+
+    parts = {column: [] for column in COLUMNS}
+    max_ids = {}
+    for kind, queryset in _corpus():
+        kind_parts, max_id = _vectorize_chunks(queryset, kind, idf, chunk_size)
+        for column in COLUMNS:
+            parts[column].extend(kind_parts[column])
+        max_ids[KINDS[kind]] = max_id or 0
+
+    columns = _concatenate(parts)
+    base = vector_index.write_segment(root, 'base', columns, extra={'idf': idf})
+
+    manifest = {
+        'dimensions': DIMENSIONS,
+        'columns': list(COLUMNS),
+        'shared': ['idf'],
+        'base': base,
+        'deltas': [],
+        'count': len(columns['ids']),
+        'max_ids': max_ids,
+        'built_at': timezone.now().isoformat(),
+    }
+    vector_index.publish(root, manifest)
+    return manifest
+
+
+def update_index(chunk_size=2000):
+    """
+    Write rows saved since the last build or update as a delta segment, using
+    the base segment's IDF weights. Returns the number of rows added.
+    """
+    index = load_index()
+    if index is None or len(index.manifest['deltas']) >= MAX_DELTAS:
+        before = len(index) if index is not None else 0
+        return build_index(chunk_size)['count'] - before
+
+    manifest = dict(index.manifest)
+    max_ids = dict(manifest['max_ids'])
+    parts = {column: [] for column in COLUMNS}
+    for kind, queryset in _corpus():
+        label = KINDS[kind]
+        kind_parts, max_id = _vectorize_chunks(queryset.filter(id__gt=max_ids[label]), kind, index.shared['idf'], chunk_size)
+        for column in COLUMNS:
+            parts[column].extend(kind_parts[column])
+        if max_id is not None:
+            max_ids[label] = max_id
+
+    columns = _concatenate(parts)
+    if not len(columns['ids']):
+        return 0
+
+    delta = vector_index.write_segment(index_dir(), 'delta', columns)
+    manifest.update(
+        deltas=manifest['deltas'] + [delta],
+        count=manifest['count'] + len(columns['ids']),
+        max_ids=max_ids,
+        updated_at=timezone.now().isoformat(),
+    )
+    vector_index.publish(index_dir(), manifest)
+    return len(columns['ids'])
+
+
+def load_index():
+    return vector_index.open_index(index_dir())
+
+
+def _fresh_rows(index, user):
+    """Rows saved after the index was built, newest first"""
+    from livestream.models import SharedExtract
+    max_ids = index.manifest['max_ids'] if index else {'extract': 0, 'shared': 0}
+    extracts = PaperExtract.objects.filter(user=user, id__gt=max_ids['extract']).order_by('-id')
+    shared = SharedExtract.objects.filter(id__gt=max_ids['shared']).order_by('-id')
+    return (
+        [(KIND_EXTRACT, row) for row in extracts.values('id', 'user_id', *EXTRACT_TEXT_FIELDS)[:FRESH_LIMIT]] +
+        [(KIND_SHARED, row) for row in _shared_rows(shared)[:FRESH_LIMIT]]
+    )
+
+
+def _top_k(scores, k):
+    k = min(k, scores.size)
+    if k == 0:
+        return np.array([], dtype=np.int64)
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+def related(user, text, k=10, scope='all', exclude=()):
+    """
+    Best matching (kind, id, score) tuples for text. scope is 'all', 'library'
+    (the user's own extracts) or 'shared' (extracts shared in any room).
+    exclude is a collection of (kind, id) pairs to leave out.
+    """
+    index = load_index()
+    idf = index.shared['idf'] if index else None
+    query = vectorize([text], idf)[0]
+    if not query.any():
+        return []
+
+    kinds_wanted = {'all': (KIND_EXTRACT, KIND_SHARED), 'library': (KIND_EXTRACT,), 'shared': (KIND_SHARED,)}[scope]
+    # ask for a few extra so excluded and since-deleted rows don't leave the list short
+    wanted = k + len(exclude) + 10
+    candidates = []
+
+    if index is not None:
+        def allowed(segment):
+            kinds = segment['kinds']
+            return np.isin(kinds, kinds_wanted) & ((kinds == KIND_SHARED) | (segment['owners'] == user.id))
+
+        for segment, row, score in index.top_k(query, wanted, allowed):
+            if score > 0:
+                candidates.append((int(segment['kinds'][row]), int(segment['ids'][row]), score))
+
+    fresh = [(kind, row) for kind, row in _fresh_rows(index, user) if kind in kinds_wanted]
+    if fresh:
+        scores = vectorize([document_text(row) for _, row in fresh], idf) @ query
+        for position in _top_k(scores, wanted):
+            if scores[position] > 0:
+                kind, row = fresh[position]
+                candidates.append((kind, row['id'], float(scores[position])))
+
+    excluded = set(exclude)
+    results = [candidate for candidate in candidates if candidate[:2] not in excluded]
+    results.sort(key=lambda candidate: candidate[2], reverse=True)
+    return results[:wanted]
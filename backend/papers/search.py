@@ -0,0 +1,132 @@
+# backend/papers/search.py
+
+"""
+Full-text search over a user's saved extracts.
+
+PostgreSQL uses the generated search_vector column and its GIN index, local
+SQLite uses the papers_paperextract_fts FTS5 table. Both are created by
+migration 0005. Anything else falls back to a plain icontains filter.
+"""
+
+import html
+import re
+from django.db import connection
+from django.db.models import Q
+from papers.models import PaperExtract
+
+# highlight delimiters that can't appear in user text, swapped for <mark> after escaping
+START_SEL = '\x02'
+STOP_SEL = '\x03'
+
+RESULT_FIELDS = (
+    'id', 'title', 'authors', 'publication_info', 'doi', 'link', 'pdf_link',
+    'publication_link', 'extract', 'page_number', 'additional_info', 'created_at'
+)
+
+_fts_table_exists = None
+
+
+def query_terms(query):
+    """Split a free text query into word tokens, ignoring any search syntax"""
+    return re.findall(r'\w+', query.lower())[:20]
+
+
+def mark(text):
+    """Escape a highlighted fragment and turn the delimiters into <mark> tags"""
+    if text is None:
+        return None
+    return html.escape(text).replace(START_SEL, '<mark>').replace(STOP_SEL, '</mark>')
+
+
+def search_extracts(user, query, limit=20, offset=0):
+    """
+    Ranked search across title, authors, extract and additional_info.
+    Every term is prefix matched and all terms must match.
+    Returns (rows, has_more) where rows are dicts with title/extract highlights.
+    """
+    terms = query_terms(query)
+    if not terms:
+        return [], False
+
+    if connection.vendor == 'postgresql':
+        rows = _search_postgres(user.id, terms, limit + 1, offset)
+    elif connection.vendor == 'sqlite' and _has_fts_table():
+        rows = _search_sqlite(user.id, terms, limit + 1, offset)
+    else:
+        rows = _search_fallback(user, terms, limit + 1, offset)
+
+    for row in rows:
+        row['title_highlight'] = mark(row['title_highlight'])
+        row['extract_highlight'] = mark(row['extract_highlight'])
+    return rows[:limit], len(rows) > limit
+
+
+def _fetch_dicts(sql, params):
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        columns = [col[0] for col in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def _select_list(alias):
+    return ', '.join(f'{alias}.{field}' for field in RESULT_FIELDS)
+
+
+def _search_postgres(user_id, terms, limit, offset):
+    tsquery = ' & '.join(f'{term}:*' for term in terms)
+    # rank and page inside the index scan, only build headlines for the returned page
+    sql = f"""
+        SELECT {_select_list('e')}, top.rank,
+               ts_headline('english', e.title, top.q,
+                           'StartSel={START_SEL}, StopSel={STOP_SEL}, HighlightAll=true') AS title_highlight,
+               ts_headline('english', e.extract, top.q,
+                           'StartSel={START_SEL}, StopSel={STOP_SEL}, MaxFragments=2, MaxWords=30, MinWords=10') AS extract_highlight
+        FROM (
+            SELECT p.id, ts_rank_cd(p.search_vector, q) AS rank, q
+            FROM papers_paperextract p, to_tsquery('english', %s) q
+            WHERE p.user_id = %s AND p.search_vector @@ q
+            ORDER BY rank DESC, p.id DESC
+            LIMIT %s OFFSET %s
+        ) top
+        JOIN papers_paperextract e ON e.id = top.id
+        ORDER BY top.rank DESC, e.id DESC
+    """
+    return _fetch_dicts(sql, [tsquery, user_id, limit, offset])
+
+
+def _search_sqlite(user_id, terms, limit, offset):
+    match = ' '.join(f'"{term}"*' for term in terms)
+    # bm25 weights follow the column order: title, authors, extract, additional_info
+    sql = f"""
+        SELECT {_select_list('e')}, bm25(papers_paperextract_fts, 10.0, 5.0, 1.0, 0.5) AS rank,
+               highlight(papers_paperextract_fts, 0, '{START_SEL}', '{STOP_SEL}') AS title_highlight,
+               snippet(papers_paperextract_fts, 2, '{START_SEL}', '{STOP_SEL}', '...', 32) AS extract_highlight
+        FROM papers_paperextract_fts
+        JOIN papers_paperextract e ON e.id = papers_paperextract_fts.rowid
+        WHERE papers_paperextract_fts MATCH %s AND e.user_id = %s
+        ORDER BY rank, e.id DESC
+        LIMIT %s OFFSET %s
+    """
+    return _fetch_dicts(sql, [match, user_id, limit, offset])
+
+
+def _search_fallback(user, terms, limit, offset):
+    queryset = PaperExtract.objects.filter(user=user)
+    for term in terms:
+        queryset = queryset.filter(
+            Q(title__icontains=term) | Q(authors__icontains=term) |
+            Q(extract__icontains=term) | Q(additional_info__icontains=term)
+        )
+    rows = list(queryset.values(*RESULT_FIELDS)[offset:offset + limit])
+    for row in rows:
+        row['rank'] = None
+        row['title_highlight'] = row['title']
+        row['extract_highlight'] = row['extract'][:300]
+    return rows
+
+
+def _has_fts_table():
+    global _fts_table_exists
+    if _fts_table_exists is None:
+        _fts_table_exists = 'papers_paperextract_fts' in connection.introspection.table_names()
+    return _fts_table_exists
@@ -0,0 +1,106 @@
+# backend/papers/search_benchmark.py
+
+"""
+End-to-end benchmark of search_scholar against papers.fixture_server.
+
+Each pass sends every query through the view as an authenticated user and
+records latency, DB queries and the upstream calls the fixture server saw.
+From those follow the cache hit rates:
+
+- search: searches answered without a SerpAPI call (results cache)
+- doi: titled results that needed no CrossRef call (Paper table, DOI cache)
+- unpaywall: results with a DOI that needed no Unpaywall call (fresh Paper rows)
+
+The whole run happens in a transaction that is rolled back at the end, so
+Paper rows and quota state created by the benchmark never persist.
+"""
+
+import time
+import uuid
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+from papers.fixture_server import SERVICES, TOPICS, SUBJECTS
+from papers.models import ApiQuota
+from papers.views import SERPAPI_QUOTA, search_scholar
+
+User = get_user_model()
+
+
+def benchmark_queries(store, count):
+    """Recorded queries first, then synthetic ones"""
+    queries = sorted(store.responses['serpapi'])[:count]
+    n = 0
+    while len(queries) < count:
+        queries.append(f"{TOPICS[n % len(TOPICS)]} {SUBJECTS[n % len(SUBJECTS)]} {n}")
+        n += 1
+    return queries
+
+
+def _rate(hits, total):
+    return hits / total if total else None
+
+
+def run_pass(server, user, queries):
+    factory = APIRequestFactory()
+    before = server.snapshot()
+    latencies, query_counts = [], []
+    errors = titled = with_doi = 0
+
+    for query in queries:
+        request = factory.get('/api/papers/search/', {'query': query})
+        force_authenticate(request, user=user)
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = search_scholar(request)
+            latencies.append(time.perf_counter() - started)
+        query_counts.append(len(captured))
+        if response.status_code != 200:
+            errors += 1
+            continue
+        results = response.data.get('organic_results', [])
+        titled += sum(1 for result in results if result.get('title'))
+        with_doi += sum(1 for result in results if result.get('doi'))
+
+    after = server.snapshot()
+    upstream = {
+        service: {key: after[service][key] - before[service][key] for key in after[service]}
+        for service in SERVICES
+    }
+    latencies = np.array(latencies)
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+    return {
+        'searches': len(queries),
+        'errors': errors,
+        'p50': p50,
+        'p95': p95,
+        'p99': p99,
+        'mean': latencies.mean() * 1000,
+        'queries': float(np.mean(query_counts)),
+        'upstream': upstream,
+        'hit_rates': {
+            'search': _rate(len(queries) - upstream['serpapi']['calls'], len(queries)),
+            # titles from searches served from the results cache are not looked up either
+            'doi': _rate(titled - upstream['crossref']['calls'], titled),
+            'unpaywall': _rate(with_doi - upstream['unpaywall']['calls'], with_doi),
+        },
+    }
+
+
+def run_search_benchmark(server, queries, passes=2, clear_results_cache=False):
+    """Run passes over queries and return one summary dict per pass, see run_pass"""
+    summaries = []
+    with transaction.atomic():
+        # a fresh bucket under the benchmark's quota settings
+        ApiQuota.objects.filter(name=SERPAPI_QUOTA).delete()
+        user = User.objects.create(username=f'bench-search-{uuid.uuid4().hex[:8]}', email='bench@search.local')
+        for number in range(passes):
+            if number and clear_results_cache:
+                for alias in ('default', 'shared'):
+                    caches[alias].clear()
+            summaries.append(run_pass(server, user, queries))
+        transaction.set_rollback(True)
+    return summaries
@@ -1,5 +1,159 @@
 # backend/papers/tests.py
 
-from django.test import TestCase
+import os
+import tempfile
+import time
+from unittest import mock
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.db import DatabaseError, connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+from papers import vector_index
+from papers.models import Paper, PaperExtract
+from papers.quota import QuotaExceeded, QuotaPlan, acquire
+from papers.views import bulk_delete_extracts, enrich_results_with_doi, get_user_extracts, search_scholar
 
-# Create your tests here.
+User = get_user_model()
+
+
+class VectorIndexCleanupTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = directory.name
+
+    def publish_base(self):
+        base = vector_index.write_segment(self.root, 'base', {'vectors': np.zeros((2, 4)), 'ids': np.arange(2)})
+        vector_index.publish(self.root, {'columns': ['vectors', 'ids'], 'base': base, 'deltas': []})
+        return base
+
+    def test_replaced_segment_gets_its_grace_period(self):
+        old = self.publish_base()
+        # written long ago, as the base of an index that only got deltas since
+        written = time.time() - 10 * vector_index.CLEANUP_GRACE_SECONDS
+        os.utime(os.path.join(self.root, old), (written, written))
+
+        self.publish_base()
+        self.assertTrue(os.path.isdir(os.path.join(self.root, old)))
+
+        later = time.time() + vector_index.CLEANUP_GRACE_SECONDS + 1
+        with mock.patch('papers.vector_index.time.time', return_value=later):
+            vector_index.cleanup(self.root, vector_index.read_manifest(self.root))
+        self.assertFalse(os.path.isdir(os.path.join(self.root, old)))
+
+        # removed segments stop being tracked at the next publish
+        self.publish_base()
+        self.assertNotIn(old, vector_index.read_manifest(self.root)['retired'])
+
+
+class QuotaQueueTests(TestCase):
+    plan = QuotaPlan(monthly_limit=100, burst=1, rate_per_second=1.0, max_wait=10)
+
+    @mock.patch('papers.quota.time.sleep')
+    def test_waiters_are_served_in_arrival_order(self, sleep):
+        for _ in range(3):
+            acquire('test', self.plan)
+        # the first gets the burst token, the others each book the next one due
+        waits = [call.args[0] for call in sleep.call_args_list]
+        self.assertEqual(len(waits), 2)
+        self.assertAlmostEqual(waits[0], 1.0, delta=0.1)
+        self.assertAlmostEqual(waits[1], 2.0, delta=0.1)
+
+    @mock.patch('papers.quota.time.sleep')
+    def test_too_long_a_wait_is_rejected(self, sleep):
+        acquire('test', self.plan)
+        acquire('test', self.plan, max_wait=1.5)
+        with self.assertRaises(QuotaExceeded) as raised:
+            acquire('test', self.plan, max_wait=1.5)
+        self.assertAlmostEqual(raised.exception.retry_after, 2.0, delta=0.1)
+
+
+@mock.patch('papers.views.fetch_crossref_doi', side_effect=lambda title: f'10.1000/{title.split()[-1]}')
+class DoiEnrichmentTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def enrich(self, count, prefix='paper'):
+        results = [{'title': f'{prefix} {i}'} for i in range(count)]
+        with CaptureQueriesContext(connection) as queries:
+            enrich_results_with_doi(results)
+        return results, len(queries)
+
+    def test_found_dois_are_cached(self, crossref):
+        results, _ = self.enrich(3)
+        self.assertEqual([result['doi'] for result in results], ['10.1000/0', '10.1000/1', '10.1000/2'])
+        # Papers saved under another title, so the title lookup can't find them
+        Paper.objects.update(title='')
+        crossref.reset_mock()
+        results, _ = self.enrich(3)
+        crossref.assert_not_called()
+        self.assertEqual(results[2]['doi'], '10.1000/2')
+
+    def test_queries_do_not_grow_with_results(self, crossref):
+        _, few = self.enrich(2, 'few')
+        _, many = self.enrich(20, 'many')
+        self.assertEqual(few, many)
+
+
+@override_settings(SERPAPI_KEY='test')
+class SearchResultsCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        caches['shared'].clear()
+        self.user = User.objects.create(username='searcher', email='searcher@example.com')
+
+    def search(self):
+        request = APIRequestFactory().get('/api/papers/search/', {'query': 'graph  Networks'})
+        force_authenticate(request, user=self.user)
+        return search_scholar(request)
+
+    @mock.patch('papers.views.requests.get')
+    def test_another_worker_reuses_the_results(self, get):
+        get.return_value = mock.Mock(status_code=200, json=lambda: {'search_metadata': {}})
+        self.assertEqual(self.search().status_code, 200)
+        # served by a worker whose own cache never saw the search
+        cache.clear()
+        self.assertEqual(self.search().status_code, 200)
+        get.assert_called_once()
+
+
+class ExtractListTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='reader', email='reader@example.com')
+        PaperExtract.objects.create(user=self.user, title='Kept', extract='text')
+
+    def list_extracts(self):
+        request = APIRequestFactory().get('/api/papers/extracts/')
+        force_authenticate(request, user=self.user)
+        return get_user_extracts(request)
+
+    def test_full_list_is_a_json_array(self):
+        response = self.list_extracts()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([extract['title'] for extract in response.data], ['Kept'])
+
+    def test_failed_query_is_an_error(self):
+        with mock.patch('django.db.models.query.ValuesIterable.__iter__', side_effect=DatabaseError('gone')):
+            response = self.list_extracts()
+        self.assertEqual(response.status_code, 500)
+
+
+class BulkDeleteTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='deleter', email='deleter@example.com')
+        self.extract = PaperExtract.objects.create(user=self.user, title='Kept', extract='text')
+
+    def delete(self, ids):
+        request = APIRequestFactory().post('/api/papers/extracts/bulk-delete/', {'ids': ids}, format='json')
+        force_authenticate(request, user=self.user)
+        return bulk_delete_extracts(request)
+
+    def test_booleans_are_not_ids(self):
+        for ids in ([True], [self.extract.id, False]):
+            self.assertEqual(self.delete(ids).status_code, 400)
+        self.assertTrue(PaperExtract.objects.filter(pk=self.extract.pk).exists())
+        self.assertEqual(self.delete([self.extract.id]).status_code, 200)
+        self.assertFalse(PaperExtract.objects.filter(pk=self.extract.pk).exists())
@@ -4,7 +4,15 @@ from . import views
 
 urlpatterns = [
     path('search/', views.search_scholar, name='search_scholar'),
+    path('search/quota/', views.search_quota, name='search_quota'),
     path('extracts/', views.get_user_extracts, name='get_user_extracts'),
+    path('extracts/search/', views.search_user_extracts, name='search_user_extracts'),
     path('extracts/save/', views.save_extract, name='save_extract'),
+    path('extracts/bulk/', views.bulk_save_extracts, name='bulk_save_extracts'),
+    path('extracts/export/<str:export_format>/', views.export_extracts, name='export_extracts'),
+    path('extracts/import/', views.import_extracts, name='import_extracts'),
+    path('extracts/bulk-delete/', views.bulk_delete_extracts, name='bulk_delete_extracts'),
     path('extracts/<int:extract_id>/', views.delete_extract, name='delete_extract'),
+    path('extracts/<int:extract_id>/related/', views.related_extracts, name='related_extracts'),
+    path('shared-extracts/<int:shared_id>/related/', views.related_shared_extracts, name='related_shared_extracts'),
 ]
\ No newline at end of file
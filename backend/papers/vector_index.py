@@ -0,0 +1,181 @@
+# backend/papers/vector_index.py
+
+"""
+On-disk vector index that every worker shares through memory mapping.
+
+An index is a directory holding manifest.json and a set of segment
+directories. Each segment stores one .npy file per column (a `vectors`
+matrix plus one value per row for every other column) and is never modified
+after it is written. The manifest lists the base segment and any delta
+segments appended since, and is replaced atomically with os.replace, so a
+reader sees either the old set of segments or the new one, never a mix.
+
+Workers open segments with np.load(mmap_mode='r'): the pages live in the OS
+page cache once, however many gunicorn workers read them, so RSS per worker
+stays flat as the corpus grows. Readers notice a new manifest by its mtime
+and reopen; segments that no manifest references are removed after a grace
+period so slow readers can finish with them. The grace period runs from
+when a manifest stopped listing the segment, kept under 'retired' in the
+manifest, since a base segment replaced by compaction may be far older.
+
+Only one process should write to an index at a time (the build command).
+"""
+
+import json
+import os
+import shutil
+import time
+import uuid
+import numpy as np
+
+MANIFEST = 'manifest.json'
+FORMAT_VERSION = 1
+
+# segments unreferenced for less than this are left for readers still using them
+CLEANUP_GRACE_SECONDS = 300
+
+
+def read_manifest(root):
+    try:
+        with open(os.path.join(root, MANIFEST)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def write_segment(root, prefix, columns, extra=None):
+    """
+    Write a new immutable segment from a dict of equal length arrays and
+    return its name. extra holds arrays of any shape stored alongside, listed
+    as 'shared' in the manifest. Written under a temporary name and renamed
+    into place.
+    """
+    lengths = {len(array) for array in columns.values()}
+    if len(lengths) != 1:
+        raise ValueError('Segment columns must all have the same length')
+
+    name = f"{prefix}-{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    tmp = os.path.join(root, f'.{name}.tmp')
+    os.makedirs(tmp)
+    for column, array in {**columns, **(extra or {})}.items():
+        np.save(os.path.join(tmp, f'{column}.npy'), np.ascontiguousarray(array))
+    os.rename(tmp, os.path.join(root, name))
+    return name
+
+
+def publish(root, manifest):
+    """Atomically make manifest the current one, then drop segments nothing uses any more"""
+    previous = read_manifest(root) or {}
+    now = time.time()
+    retired = dict(previous.get('retired', {}))
+    if previous:
+        for name in segments(previous):
+            retired.setdefault(name, now)
+    referenced = set(segments(manifest))
+    manifest = dict(manifest, format=FORMAT_VERSION, retired={
+        # segments cleanup already removed drop out here
+        name: since for name, since in retired.items()
+        if name not in referenced and os.path.isdir(os.path.join(root, name))
+    })
+    tmp = os.path.join(root, f'.{MANIFEST}.{os.getpid()}.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, os.path.join(root, MANIFEST))
+    cleanup(root, manifest)
+
+
+def segments(manifest):
+    return [manifest['base']] + list(manifest.get('deltas', []))
+
+
+def cleanup(root, manifest):
+    referenced = set(segments(manifest))
+    retired = manifest.get('retired', {})
+    cutoff = time.time() - CLEANUP_GRACE_SECONDS
+    for entry in os.scandir(root):
+        if not entry.is_dir() or entry.name in referenced:
+            continue
+        # anything no manifest ever listed, like a segment a failed build left behind, goes by when it was written
+        since = retired.get(entry.name, entry.stat().st_mtime)
+        if since < cutoff:
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+
+class Segment:
+    """Read-only view of one segment's columns, memory mapped"""
+
+    def __init__(self, path, columns):
+        self.name = os.path.basename(path)
+        self.columns = {
+            column: np.load(os.path.join(path, f'{column}.npy'), mmap_mode='r')
+            for column in columns
+        }
+
+    def __len__(self):
+        return len(self.columns['vectors'])
+
+    def __getitem__(self, column):
+        return self.columns[column]
+
+
+class VectorIndex:
+    """The segments listed by one manifest, plus any arrays stored beside them"""
+
+    def __init__(self, root, manifest):
+        self.root = root
+        self.manifest = manifest
+        columns = manifest['columns']
+        self.segments = [Segment(os.path.join(root, name), columns) for name in segments(manifest)]
+        self.shared = {
+            name: np.load(os.path.join(root, manifest['base'], f'{name}.npy'), mmap_mode='r')
+            for name in manifest.get('shared', [])
+        }
+
+    def __len__(self):
+        return sum(len(segment) for segment in self.segments)
+
+    def top_k(self, query, k, allowed=None):
+        """
+        Highest dot products with query across every segment, as
+        (segment, row, score) tuples best first. allowed(segment) may return a
+        boolean mask of rows that can be returned.
+        """
+        best = []
+        for segment in self.segments:
+            if not len(segment):
+                continue
+            scores = segment['vectors'] @ query
+            if allowed is not None:
+                scores = np.where(allowed(segment), scores, -np.inf)
+            count = min(k, scores.size)
+            top = np.argpartition(-scores, count - 1)[:count]
+            best.extend(
+                (segment, int(row), float(scores[row]))
+                for row in top if np.isfinite(scores[row])
+            )
+        best.sort(key=lambda item: item[2], reverse=True)
+        return best[:k]
+
+
+# per-process open indexes, keyed by root and reopened when the manifest changes
+_open = {}
+
+
+def open_index(root):
+    """The current VectorIndex for root, or None if nothing has been built yet"""
+    try:
+        version = os.stat(os.path.join(root, MANIFEST)).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    cached = _open.get(root)
+    if cached and cached[0] == version:
+        return cached[1]
+
+    manifest = read_manifest(root)
+    if manifest is None:
+        return None
+    index = VectorIndex(root, manifest)
+    _open[root] = (version, index)
+    return index
@@ -4,36 +4,63 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 import requests
 from django.conf import settings
-from django.core.cache import cache
-import time
+from django.core.cache import cache, caches
+import base64
+import binascii
+import hashlib
+import io
+import math
 import json
-from papers.models import PaperExtract
+from django.db import transaction
+from django.db.models import Q
+from django.http import StreamingHttpResponse
+from django.utils.dateparse import parse_datetime
+from django.utils import timezone
+from papers.models import Paper, PaperExtract
+from papers.enrichment import (
+    enrich_paper, fetch_crossref_doi, get_or_create_paper, get_or_create_papers, is_stale,
+    normalize_doi, unpaywall_info
+)
+from papers.search import search_extracts
+from papers.dedup import find_near_duplicates, index_extracts
+from papers.related import KIND_EXTRACT, KIND_SHARED, document_text, related
+from papers.exporters import EXTRACT_FIELDS, EXPORT_FORMATS, stream_export, stream_ndjson
+from papers.importers import ImportFormatError, guess_format, import_entries, parse
+from papers.quota import acquire, quota_status, serpapi_plan, QuotaExceeded
+from django_backend.instrumentation import external_call
+from django_backend.metrics import cache_lookup
+from django_backend.db_router import replica_reads
+
+SERPAPI_QUOTA = 'serpapi'
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def search_scholar(request):
-    """Search Google Scholar via SerpAPI with rate limiting"""
+    """Search Google Scholar via SerpAPI, queued behind the account-wide quota"""
     query = request.GET.get('query', '')
     
     if not query:
         return Response({'error': 'Query parameter is required'}, status=400)
     
-    # rate limiting - allow only one request per 5 seconds per user. Using free plan of serpapi
-    user_id = request.user.id
-    cache_key = f'scholar_search_{user_id}'
-    last_request_time = cache.get(cache_key)
+    # identical searches are served from the cache every worker shares and never touch the quota
+    results_cache_key = f"scholar_results_{hashlib.md5(' '.join(query.lower().split()).encode()).hexdigest()}"
+    cached_results = caches['shared'].get(results_cache_key)
+    cache_lookup('search', bool(cached_results))
+    if cached_results:
+        return Response(cached_results)
     
-    if last_request_time and (time.time() - last_request_time) < 5:
-        return Response({
-            'error': 'Rate limit exceeded. Please wait a moment before trying again.'
-        }, status=429)
+    # cache miss - wait in line for a serpapi token
+    try:
+        acquire(SERPAPI_QUOTA, serpapi_plan())
+    except QuotaExceeded as e:
+        response = Response({'error': str(e)}, status=429)
+        if e.retry_after is not None:
+            response['Retry-After'] = str(math.ceil(e.retry_after))
+        return response
     
     try:
-        # record request time
-        cache.set(cache_key, time.time(), 300)  # cache for 5 minutes
-        
         # call serpapi
-        api_url = "https://serpapi.com/search"
+        api_url = f"{settings.SERPAPI_URL}/search"
         params = {
             "engine": "google_scholar",
             "q": query,
@@ -41,7 +68,8 @@ def search_scholar(request):
             "num": 20  # number of results
         }
         
-        response = requests.get(api_url, params=params)
+        with external_call('serpapi'):
+            response = requests.get(api_url, params=params, timeout=settings.SERPAPI_TIMEOUT)
         
         if response.status_code != 200:
             error_data = response.json()
@@ -56,83 +84,100 @@ def search_scholar(request):
             enrich_results_with_doi(result_data['organic_results'])
             # also add unpaywall data when doi is available
             enrich_results_with_unpaywall(result_data['organic_results'])
+        
+        caches['shared'].set(results_cache_key, result_data, settings.SEARCH_CACHE_TTL)
             
         return Response(result_data)
     
     except Exception as e:
         return Response({'error': str(e)}, status=500)
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def search_quota(request):
+    """Remaining SerpAPI quota for the whole account"""
+    return Response(quota_status(SERPAPI_QUOTA, serpapi_plan()))
+
+# CrossRef title -> DOI answers kept in this worker's cache, titles without a DOI for less time
+DOI_CACHE_SECONDS = 60*60*24*7
+DOI_MISS_CACHE_SECONDS = 60*60*24
+
+def _doi_cache_key(title):
+    return f"doi_lookup_{hashlib.md5(title.encode()).hexdigest()}"
+
 def enrich_results_with_doi(results):
-    """Try to find DOIs for each result using CrossRef API"""
-    for result in results:
+    """
+    Find DOIs for each result: from the Paper table by title, then the DOI
+    cache, and CrossRef for titles neither knows. Paper rows for the DOIs
+    found are fetched or created together, a few queries per search.
+    """
+    titles = list({result['title'] for result in results if result.get('title')})
+    known = {}
+    for paper in Paper.objects.filter(title__in=titles).only('doi', 'title'):
+        known.setdefault(paper.title, paper.doi)
+    for title in known:
+        cache_lookup('doi', True)
+    
+    # '' marks a title CrossRef had no DOI for
+    keys = {title: _doi_cache_key(title) for title in titles if title not in known}
+    cached = cache.get_many(keys.values())
+    found = {}
+    looked_up = {}
+    for title, key in keys.items():
+        cache_lookup('doi', key in cached)
+        if key in cached:
+            if cached[key]:
+                found[title] = cached[key]
+            continue
+        
         try:
-            # cache key based on title to avoid repeated lookups
-            cache_key = f"doi_lookup_{hash(result['title'])}"
-            cached_doi = cache.get(cache_key)
-            
-            if cached_doi:
-                result['doi'] = cached_doi
-                continue
-                
             # use crossref api to find doi by title
-            title = result['title']
-            crossref_url = f"https://api.crossref.org/works?query.title={requests.utils.quote(title)}&rows=1"
-            crossref_response = requests.get(crossref_url)
-            
-            if crossref_response.status_code == 200:
-                data = crossref_response.json()
-                if data['message']['items'] and len(data['message']['items']) > 0:
-                    doi = data['message']['items'][0].get('DOI')
-                    if doi:
-                        result['doi'] = doi
-                        # cache the doi for future requests (1 week)
-                        cache.set(cache_key, doi, 60*60*24*7)
+            looked_up[title] = fetch_crossref_doi(title) or ''
         except Exception as e:
             print(f"Error enriching result with DOI: {e}")
             continue
+        if looked_up[title]:
+            found[title] = looked_up[title]
+    
+    if looked_up:
+        cache.set_many({keys[t]: doi for t, doi in looked_up.items() if doi}, DOI_CACHE_SECONDS)
+        cache.set_many({keys[t]: '' for t, doi in looked_up.items() if not doi}, DOI_MISS_CACHE_SECONDS)
+    
+    papers = get_or_create_papers({doi: (title, '') for title, doi in found.items()})
+    fetched = [normalize_doi(doi) for title, doi in found.items() if title in looked_up]
+    if fetched:
+        Paper.objects.filter(doi__in=fetched).update(crossref_checked_at=timezone.now())
+    
+    for result in results:
+        title = result.get('title')
+        if title in known:
+            result['doi'] = known[title]
+        elif title in found:
+            paper = papers.get(normalize_doi(found[title]))
+            if paper is not None:
+                result['doi'] = paper.doi
 
 def enrich_results_with_unpaywall(results):
-    """Add Unpaywall data for results that have DOIs"""
+    """Add Unpaywall data for results that have DOIs, refreshing stale Paper rows"""
+    dois = [normalize_doi(result['doi']) for result in results if result.get('doi')]
+    papers = Paper.objects.in_bulk(dois, field_name='doi')
+    
     for result in results:
         if 'doi' not in result:
             continue
             
         try:
-            # check cache first
-            cache_key = f"unpaywall_{result['doi']}"
-            cached_data = cache.get(cache_key)
+            doi = normalize_doi(result['doi'])
+            paper = papers.get(doi) or get_or_create_paper(doi, title=result.get('title', ''))
             
-            if cached_data:
-                result['unpaywall'] = cached_data
-                continue
-                
-            # call unpaywall api
-            unpaywall_url = f"https://api.unpaywall.org/v2/{result['doi']}?email={settings.UNPAYWALL_EMAIL}"
-            unpaywall_response = requests.get(unpaywall_url)
+            stale = is_stale(paper)
+            cache_lookup('unpaywall', not stale)
+            if stale:
+                enrich_paper(paper)
             
-            if unpaywall_response.status_code == 200:
-                unpaywall_data = unpaywall_response.json()
-                
-                # extract relevant data
-                unpaywall_info = {
-                    'is_oa': unpaywall_data.get('is_oa', False),
-                    'oa_status': unpaywall_data.get('oa_status'),
-                    'oa_url': None,
-                    'pdf_url': None,
-                    'journal': unpaywall_data.get('journal_name'),
-                    'year': unpaywall_data.get('year'),
-                    'publisher': unpaywall_data.get('publisher')
-                }
-                
-                # try to get full text links
-                if unpaywall_data.get('best_oa_location'):
-                    unpaywall_info['oa_url'] = unpaywall_data['best_oa_location'].get('url')
-                    unpaywall_info['pdf_url'] = unpaywall_data['best_oa_location'].get('url_for_pdf')
-                
-                result['unpaywall'] = unpaywall_info
-                
-                # cache for 1 day
-                cache.set(cache_key, unpaywall_info, 60*60*24)
+            # unpaywall always reports an oa_status for DOIs it knows about
+            if paper.oa_status:
+                result['unpaywall'] = unpaywall_info(paper)
                 
         except Exception as e:
             print(f"Error fetching Unpaywall data: {e}")
@@ -146,9 +191,13 @@ def save_extract(request):
         data = request.data
         user = request.user
         
+        # Link to the canonical paper when we know its DOI
+        paper = get_or_create_paper(data.get('doi'), title=data.get('title', ''), authors=data.get('authors', ''))
+        
         # Create new extract
         extract = PaperExtract.objects.create(
             user=user,
+            paper=paper,
             title=data.get('title', ''),
             authors=data.get('authors', ''),
             publication_info=data.get('publication_info', ''),
@@ -161,43 +210,356 @@ def save_extract(request):
             additional_info=data.get('additional_info', '')
         )
         
+        # flag passages the user has already saved
+        index_extracts([extract])
+        near_duplicates = find_near_duplicates(extract)
+        
         return Response({
             'id': extract.id,
-            'message': 'Extract saved successfully'
+            'message': 'Extract saved successfully',
+            'near_duplicates': near_duplicates
         }, status=201)
         
     except Exception as e:
         return Response({'error': str(e)}, status=500)
 
+# request fields copied onto a new PaperExtract, with their max lengths (None = TextField)
+EXTRACT_INPUT_FIELDS = {
+    'title': 500,
+    'authors': 500,
+    'publication_info': 500,
+    'doi': 100,
+    'link': 1000,
+    'pdf_link': 1000,
+    'publication_link': 1000,
+    'extract': None,
+    'page_number': 20,
+    'additional_info': None,
+}
+
+def validate_extract_data(item):
+    """Return a list of problems with one extract in a bulk request"""
+    if not isinstance(item, dict):
+        return ['Each extract must be an object']
+    
+    errors = []
+    for field in ('title', 'extract'):
+        if not str(item.get(field) or '').strip():
+            errors.append(f'{field} is required')
+    for field, max_length in EXTRACT_INPUT_FIELDS.items():
+        value = item.get(field)
+        if value is not None and not isinstance(value, str):
+            errors.append(f'{field} must be a string')
+        elif max_length and value and len(value) > max_length:
+            errors.append(f'{field} is longer than {max_length} characters')
+    return errors
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def bulk_save_extracts(request):
+    """Save many extracts in one request with a single insert"""
+    items = request.data.get('extracts') if isinstance(request.data, dict) else request.data
+    
+    if not isinstance(items, list) or not items:
+        return Response({'error': 'extracts must be a non-empty list'}, status=400)
+    if len(items) > settings.EXTRACT_BULK_MAX_ITEMS:
+        return Response({'error': f'At most {settings.EXTRACT_BULK_MAX_ITEMS} extracts per request'}, status=400)
+    
+    try:
+        # validate everything first, then write the valid items together
+        results = []
+        valid = []
+        for index, item in enumerate(items):
+            errors = validate_extract_data(item)
+            if errors:
+                results.append({'index': index, 'status': 'error', 'errors': errors})
+            else:
+                results.append({'index': index, 'status': 'created'})
+                valid.append((index, item))
+        
+        papers = get_or_create_papers({
+            item['doi']: (item.get('title'), item.get('authors'))
+            for index, item in valid if item.get('doi')
+        })
+        
+        extracts = [
+            PaperExtract(
+                user=request.user,
+                paper=papers.get(normalize_doi(item.get('doi'))),
+                doi=item.get('doi') or None,
+                **{field: item.get(field) or '' for field in EXTRACT_INPUT_FIELDS if field != 'doi'}
+            )
+            for index, item in valid
+        ]
+        
+        with transaction.atomic():
+            created = PaperExtract.objects.bulk_create(extracts, batch_size=500)
+            index_extracts(created)
+        
+        for (index, item), extract in zip(valid, created):
+            results[index]['id'] = extract.id
+        
+        return Response({
+            'created': len(created),
+            'failed': len(items) - len(created),
+            'results': results
+        }, status=201 if created else 400)
+        
+    except Exception as e:
+        return Response({'error': str(e)}, status=500)
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def bulk_delete_extracts(request):
+    """Delete many of the user's extracts in one transaction"""
+    ids = request.data.get('ids') if isinstance(request.data, dict) else None
+    
+    if not isinstance(ids, list) or not ids:
+        return Response({'error': 'ids must be a non-empty list'}, status=400)
+    if len(ids) > settings.EXTRACT_BULK_MAX_ITEMS:
+        return Response({'error': f'At most {settings.EXTRACT_BULK_MAX_ITEMS} ids per request'}, status=400)
+    # True and False are ints too, and would delete the extracts with ids 1 and 0
+    if not all(isinstance(extract_id, int) and not isinstance(extract_id, bool) for extract_id in ids):
+        return Response({'error': 'ids must be integers'}, status=400)
+    
+    try:
+        with transaction.atomic():
+            owned = PaperExtract.objects.filter(user=request.user, id__in=ids)
+            found = set(owned.values_list('id', flat=True))
+            owned.delete()
+        
+        results = [
+            {'id': extract_id, 'status': 'deleted' if extract_id in found else 'not_found'}
+            for extract_id in ids
+        ]
+        return Response({'deleted': len(found), 'results': results})
+        
+    except Exception as e:
+        return Response({'error': str(e)}, status=500)
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def import_extracts(request):
+    """Import a BibTeX, RIS or CSL-JSON library file as extracts"""
+    upload = request.FILES.get('file')
+    if not upload:
+        return Response({'error': 'Upload the library as a "file" form field'}, status=400)
+    
+    file_format = request.data.get('file_format') or guess_format(upload.name)
+    if not file_format:
+        return Response({'error': 'Could not tell the file format, set file_format to bibtex, ris or csl-json'}, status=400)
+    
+    try:
+        # read the upload line by line rather than loading it into memory
+        lines = io.TextIOWrapper(upload.file, encoding='utf-8', errors='replace')
+        stats = import_entries(request.user, parse(lines, file_format))
+        return Response(stats, status=201 if stats['created'] else 200)
+        
+    except ImportFormatError as e:
+        return Response({'error': str(e)}, status=400)
+    except Exception as e:
+        return Response({'error': str(e)}, status=500)
+
+def encode_cursor(created_at, extract_id):
+    """Opaque keyset cursor for the (-created_at, -id) ordering"""
+    raw = f"{created_at.isoformat()}|{extract_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor):
+    created_at, extract_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+    parsed = parse_datetime(created_at)
+    if parsed is None:
+        raise ValueError('bad cursor')
+    return parsed, int(extract_id)
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@replica_reads
 def get_user_extracts(request):
-    """Get all extracts for authenticated user"""
+    """
+    Get extracts for authenticated user, newest first.
+    
+    Without parameters the full list is returned as a JSON array.
+    ?limit=&cursor= returns one page plus next_cursor, ?fields=title,doi limits the
+    columns loaded and returned, ?stream=ndjson streams one extract per line.
+    """
     try:
-        extracts = PaperExtract.objects.filter(user=request.user)
-        
-        result = []
-        for extract in extracts:
-            result.append({
-                'id': extract.id,
-                'title': extract.title,
-                'authors': extract.authors,
-                'publication_info': extract.publication_info,
-                'doi': extract.doi,
-                'link': extract.link,
-                'pdf_link': extract.pdf_link,
-                'publication_link': extract.publication_link,
-                'extract': extract.extract,
-                'page_number': extract.page_number,
-                'additional_info': extract.additional_info,
-                'created_at': extract.created_at
-            })
+        fields = EXTRACT_FIELDS
+        if request.GET.get('fields'):
+            requested = [field.strip() for field in request.GET['fields'].split(',') if field.strip()]
+            unknown = [field for field in requested if field not in EXTRACT_FIELDS]
+            if unknown:
+                return Response({'error': f"Unknown fields: {', '.join(unknown)}"}, status=400)
+            # id and created_at are needed for the cursor
+            fields = tuple(dict.fromkeys(['id', 'created_at'] + requested))
+        
+        extracts = PaperExtract.objects.filter(user=request.user).order_by('-created_at', '-id')
+        
+        if request.GET.get('stream') == 'ndjson':
+            rows = extracts.values(*fields).iterator(chunk_size=500)
+            return StreamingHttpResponse(stream_ndjson(rows), content_type='application/x-ndjson')
+        
+        paginated = any(param in request.GET for param in ('limit', 'cursor', 'fields'))
+        if not paginated:
+            # legacy response shape, built before responding so a failed query is still a 500
+            return Response(list(extracts.values(*fields)))
+        
+        try:
+            limit = min(max(int(request.GET.get('limit', 50)), 1), 500)
+            if request.GET.get('cursor'):
+                created_at, extract_id = decode_cursor(request.GET['cursor'])
+                extracts = extracts.filter(
+                    Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=extract_id)
+                )
+        except (ValueError, UnicodeDecodeError, binascii.Error):
+            return Response({'error': 'Invalid limit or cursor'}, status=400)
+        
+        results = list(extracts.values(*fields)[:limit + 1])
+        next_cursor = None
+        if len(results) > limit:
+            results = results[:limit]
+            next_cursor = encode_cursor(results[-1]['created_at'], results[-1]['id'])
             
-        return Response(result)
+        return Response({'results': results, 'next_cursor': next_cursor})
+        
+    except Exception as e:
+        return Response({'error': str(e)}, status=500)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_extracts(request, export_format):
+    """Stream the user's whole library as BibTeX, CSV or NDJSON"""
+    if export_format not in EXPORT_FORMATS:
+        return Response({'error': f"Unknown export format, use one of {', '.join(EXPORT_FORMATS)}"}, status=400)
+    
+    content_type, extension = EXPORT_FORMATS[export_format]
+    fields = EXTRACT_FIELDS + (('paper__year', 'paper__journal') if export_format == 'bibtex' else ())
+    
+    # server-side cursor on postgres, rows are serialized as they arrive
+    rows = (
+        PaperExtract.objects.filter(user=request.user)
+        .order_by('-created_at', '-id')
+        .values(*fields)
+        .iterator(chunk_size=1000)
+    )
+    
+    response = StreamingHttpResponse(stream_export(rows, export_format), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="extracts.{extension}"'
+    return response
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def search_user_extracts(request):
+    """Ranked full-text search over the authenticated user's extracts"""
+    query = request.GET.get('q', '')
+    
+    if not query.strip():
+        return Response({'error': 'q parameter is required'}, status=400)
+    
+    try:
+        limit = min(max(int(request.GET.get('limit', 20)), 1), 100)
+        offset = max(int(request.GET.get('offset', 0)), 0)
+    except ValueError:
+        return Response({'error': 'limit and offset must be integers'}, status=400)
+    
+    try:
+        results, has_more = search_extracts(request.user, query, limit=limit, offset=offset)
+        return Response({
+            'query': query,
+            'results': results,
+            'has_more': has_more,
+            'next_offset': offset + limit if has_more else None
+        })
         
     except Exception as e:
         return Response({'error': str(e)}, status=500)
 
+RELATED_SCOPES = ('all', 'library', 'shared')
+
+def related_response(request, text, exclude):
+    """Shared body of the related endpoints: rank, then load the rows that still exist"""
+    from livestream.models import SharedExtract
+    
+    scope = request.GET.get('scope', 'all')
+    if scope not in RELATED_SCOPES:
+        return Response({'error': f"scope must be one of {', '.join(RELATED_SCOPES)}"}, status=400)
+    try:
+        k = min(max(int(request.GET.get('k', 10)), 1), 50)
+    except ValueError:
+        return Response({'error': 'k must be an integer'}, status=400)
+    
+    ranked = related(request.user, text, k=k, scope=scope, exclude=exclude)
+    
+    extract_ids = [item_id for kind, item_id, _ in ranked if kind == KIND_EXTRACT]
+    shared_ids = [item_id for kind, item_id, _ in ranked if kind == KIND_SHARED]
+    rows = {}
+    for row in PaperExtract.objects.filter(id__in=extract_ids, user=request.user).values(
+        'id', 'title', 'authors', 'doi', 'link', 'pdf_link', 'extract', 'page_number'
+    ):
+        rows[(KIND_EXTRACT, row['id'])] = dict(row, type='extract')
+    for row in SharedExtract.objects.filter(id__in=shared_ids).with_content().values(
+        'id', 'content_title', 'content_authors', 'content_doi', 'content_link', 'content_pdf_link',
+        'content_extract', 'content_page_number', 'room__room_id', 'shared_by__username', 'shared_at'
+    ):
+        rows[(KIND_SHARED, row['id'])] = {
+            'type': 'shared',
+            'id': row['id'],
+            'title': row['content_title'],
+            'authors': row['content_authors'],
+            'doi': row['content_doi'],
+            'link': row['content_link'],
+            'pdf_link': row['content_pdf_link'],
+            'extract': row['content_extract'],
+            'page_number': row['content_page_number'],
+            'room_id': row['room__room_id'],
+            'shared_by': row['shared_by__username'],
+            'shared_at': row['shared_at'].isoformat(),
+        }
+    
+    results = []
+    for kind, item_id, score in ranked:
+        # rows deleted since the index was built are simply skipped
+        if (kind, item_id) in rows:
+            results.append(dict(rows[(kind, item_id)], score=round(score, 4)))
+    return Response({'results': results[:k]})
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def related_extracts(request, extract_id):
+    """Extracts from the user's library and from rooms that are similar to one of their extracts"""
+    try:
+        extract = PaperExtract.objects.values('id', 'title', 'authors', 'extract', 'additional_info').get(
+            id=extract_id, user=request.user
+        )
+    except PaperExtract.DoesNotExist:
+        return Response({'error': 'Extract not found or not owned by user'}, status=404)
+    
+    try:
+        return related_response(request, document_text(extract), exclude={(KIND_EXTRACT, extract_id)})
+    except Exception as e:
+        return Response({'error': str(e)}, status=500)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def related_shared_extracts(request, shared_id):
+    """Suggestions for an extract shared in a room, e.g. to show the host what else to share"""
+    from livestream.models import SharedExtract
+    
+    try:
+        shared = SharedExtract.objects.with_content().values(
+            'id', 'content_title', 'content_authors', 'content_extract', 'original_extract_id'
+        ).get(id=shared_id)
+    except SharedExtract.DoesNotExist:
+        return Response({'error': 'Shared extract not found'}, status=404)
+    
+    exclude = {(KIND_SHARED, shared_id)}
+    if shared['original_extract_id']:
+        exclude.add((KIND_EXTRACT, shared['original_extract_id']))
+    try:
+        return related_response(request, document_text(shared), exclude=exclude)
+    except Exception as e:
+        return Response({'error': str(e)}, status=500)
+
 @api_view(['DELETE'])
 @permission_classes([IsAuthenticated])
 def delete_extract(request, extract_id):
@@ -857,6 +857,17 @@ export default function Page() {
 
   const [roleUpdateTrigger, setRoleUpdateTrigger] = useState(0);
   
+  // presence heartbeat while connected, the backend removes participants that stop sending it
+  useEffect(() => {
+    if (!token) return;
+    
+    const { sendHeartbeat } = useLivestreamStore.getState();
+    sendHeartbeat(roomId);
+    const heartbeatInterval = setInterval(() => sendHeartbeat(roomId), 15000);
+    
+    return () => clearInterval(heartbeatInterval);
+  }, [roomId, token]);
+  
   useEffect(() => {
     if (!token) return;
     
@@ -61,6 +61,8 @@ interface LivestreamState {
   currentSharedExtract: SharedExtract | null;
   sharedExtracts: SharedExtract[];
   isLoadingExtracts: boolean;
+  // feed position of the last poll, so the next one only asks for newer extracts
+  sharedExtractsCursor: { roomId: string; latest: string } | null;
   
   // Actions
   setCurrentRoom: (roomId: string | null) => void;
@@ -90,6 +92,7 @@ interface LivestreamState {
   fetchResearchInterests: () => Promise<string[]>;
   shareExtractInRoom: (roomId: string, extractData: any) => Promise<boolean>;
   fetchSharedExtracts: (roomId: string) => Promise<void>;
+  sendHeartbeat: (roomId: string) => Promise<void>;
 }
 
 // API endpoints - Using environment variables for deployment flexibility
@@ -107,6 +110,7 @@ const API_ENDPOINTS = {
     `${API_BASE}/rooms/${roomId}/participants/${participantId}/role/`,
   SHARE_EXTRACT: (roomId: string) => `${API_BASE}/rooms/${roomId}/share-extract/`,
   ROOM_EXTRACTS: (roomId: string) => `${API_BASE}/rooms/${roomId}/shared-extracts/`,
+  HEARTBEAT: (roomId: string) => `${API_BASE}/rooms/${roomId}/heartbeat/`,
 }
 
 export const useLivestreamStore = create<LivestreamState>()(
@@ -127,6 +131,7 @@ export const useLivestreamStore = create<LivestreamState>()(
       currentSharedExtract: null,
       sharedExtracts: [],
       isLoadingExtracts: false,
+      sharedExtractsCursor: null,
       
       // Actions to update state
       setCurrentRoom: (roomId) => {
@@ -187,7 +192,7 @@ export const useLivestreamStore = create<LivestreamState>()(
       },
       
       clearSharedExtracts: () => {
-        set({ sharedExtracts: [], currentSharedExtract: null });
+        set({ sharedExtracts: [], currentSharedExtract: null, sharedExtractsCursor: null });
       },
       
       setLoadingExtracts: (isLoading) => {
@@ -494,24 +499,33 @@ export const useLivestreamStore = create<LivestreamState>()(
       },
       
       fetchSharedExtracts: async (roomId) => {
-        const { setLoadingExtracts, setSharedExtracts } = get();
+        const { setLoadingExtracts, setSharedExtracts, sharedExtractsCursor } = get();
         setLoadingExtracts(true);
         
         try {
-          // call backend API to get all shared extracts for the room
-          const response = await fetch(API_ENDPOINTS.ROOM_EXTRACTS(roomId));
+          // after the first load of a room only ask for extracts shared since the last poll
+          const since = sharedExtractsCursor?.roomId === roomId ? sharedExtractsCursor.latest : null;
+          const url = since
+            ? `${API_ENDPOINTS.ROOM_EXTRACTS(roomId)}?since=${encodeURIComponent(since)}`
+            : API_ENDPOINTS.ROOM_EXTRACTS(roomId);
+          const response = await fetch(url);
           
           if (!response.ok) {
             throw new Error(`Failed to fetch shared extracts: ${response.status} ${response.statusText}`);
           }
           
           const data = await response.json();
+          const extracts: SharedExtract[] = Array.isArray(data.extracts) ? data.extracts : [];
           
-          if (data.extracts && Array.isArray(data.extracts)) {
-            setSharedExtracts(data.extracts);
+          if (since) {
+            if (extracts.length > 0) {
+              const known = new Set(get().sharedExtracts.map(e => e.id));
+              setSharedExtracts([...get().sharedExtracts, ...extracts.filter(e => !known.has(e.id))]);
+            }
           } else {
-            setSharedExtracts([]);
+            setSharedExtracts(extracts);
           }
+          set({ sharedExtractsCursor: data.latest ? { roomId, latest: data.latest } : null });
           
           // still broadcast the request to make sure local and server state are in sync
           const livekitRoom = (window as any).__lk_room;
@@ -532,12 +546,35 @@ export const useLivestreamStore = create<LivestreamState>()(
         } catch (error) {
           console.error('Error fetching shared extracts:', error);
           setSharedExtracts([]);
+          set({ sharedExtractsCursor: null });
           return [];
         } finally {
           setLoadingExtracts(false);
         }
       },
       
+      sendHeartbeat: async (roomId) => {
+        try {
+          const { token } = useAuthStore.getState();
+          const headers: Record<string, string> = { 'Content-Type': 'application/json' };
+          if (token) {
+            headers.Authorization = `Bearer ${token}`;
+          }
+          
+          // anonymous viewers send their LiveKit token, the backend checks its signature for their identity
+          const livekitToken = get().token;
+          if (!token && !livekitToken) return;
+          
+          await fetch(API_ENDPOINTS.HEARTBEAT(roomId), {
+            method: 'POST',
+            headers,
+            body: JSON.stringify(token ? {} : { token: livekitToken })
+          });
+        } catch (error) {
+          console.error('Error sending heartbeat:', error);
+        }
+      },
+      
       shareExtractInRoom: async (roomId, extractData) => {
         try {
           const { token } = useAuthStore.getState();